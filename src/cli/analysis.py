@@ -0,0 +1,106 @@
+import sys
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.cli import cache, client, history, profiling
+from src.cli.results import validade_analysis_response, print_comparison
+
+DEFAULT_WORKERS = 4
+
+
+def fetch_pre_config(id):
+    response = client.get(f"pre-configs/{id}")
+
+    if not 200 <= response.status_code <= 299:
+        return None
+
+    return response.json()
+
+
+def request_analysis(id, use_cache=True):
+    fingerprint = None
+
+    if use_cache:
+        pre_config = fetch_pre_config(id)
+
+        if pre_config is not None:
+            with profiling.phase("cache"):
+                fingerprint = cache.analysis_fingerprint(id, pre_config)
+                cached_response = cache.get_cached_analysis(id, fingerprint)
+
+            # Only fresh results go to the history, or polling would repeat them
+            if cached_response is not None:
+                return 200, cached_response
+
+    response = client.post("analysis", json={"pre_config_id": id})
+    response_json = response.json()
+
+    if response.status_code in (200, 201):
+        history.record_analysis(id, response_json)
+
+        if fingerprint is not None:
+            cache.store_analysis(id, fingerprint, response_json)
+
+    return response.status_code, response_json
+
+
+def parse_analysis(id, use_cache=True, output_format="text"):
+    status_code, response_json = request_analysis(id, use_cache)
+
+    with profiling.phase("render"):
+        validade_analysis_response(status_code, response_json, output_format)
+
+
+def fetch_pre_config_ids():
+    response = client.get("pre-configs")
+
+    if not 200 <= response.status_code <= 299:
+        return None
+
+    return [pre_config["_id"] for pre_config in response.json()]
+
+
+def run_analyses(ids, workers=DEFAULT_WORKERS, use_cache=True):
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(request_analysis, id, use_cache): id for id in ids}
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            id = futures[future]
+
+            try:
+                results[id] = future.result()
+                status = "ok" if results[id][0] in (200, 201) else "error"
+            except requests.exceptions.RequestException as error:
+                results[id] = (None, {"error": str(error)})
+                status = "error"
+
+            print(f"[{done}/{len(ids)}] {id} {status}", file=sys.stderr)
+
+    return [(id, *results[id]) for id in ids]
+
+
+def parse_analysis_many(
+    ids,
+    all_pre_configs=False,
+    workers=DEFAULT_WORKERS,
+    use_cache=True,
+    output_format="text",
+):
+    if all_pre_configs:
+        ids = fetch_pre_config_ids()
+
+        if ids is None:
+            print("Error: an error occurred while fetching your pre configurations")
+            return
+
+    ids = list(dict.fromkeys(ids))
+
+    if len(ids) == 0:
+        print("Error: no pre configuration to analyse")
+        return
+
+    analyses = run_analyses(ids, workers, use_cache)
+
+    with profiling.phase("render"):
+        print_comparison(analyses, output_format)
@@ -1,13 +1,14 @@
-import requests
-
-BASE_URL = "http://localhost:5000/"
+from src.cli import client, profiling
 
 
 def parse_available():
-    available_pre_configs = requests.get(
-        BASE_URL + "available-pre-configs", headers={"Accept": "application/json"}
-    ).json()
+    available_pre_configs = client.get("available-pre-configs").json()
+
+    with profiling.phase("render"):
+        print_available(available_pre_configs)
+
 
+def print_available(available_pre_configs):
     print(
         "\nThese are all items available in the MeasureSoftGram database in the following order:\
             \nCharacteristics -> Subcharacteristics -> Measures -> Necessary Metrics\
@@ -0,0 +1,137 @@
+"""
+Client-side load balancing over several MeasureSoftGram backends.
+
+Every request goes to the healthy backend with the fewest requests in
+flight, ties going to the least recently picked one. A backend failing EJECT_AFTER requests in a
+row, with a connection error or a 5xx status, is ejected for EJECT_SECONDS,
+doubled at each new ejection up to EJECT_MAX_SECONDS. When that time is
+over, a health check on HEALTH_ENDPOINT decides whether it is admitted
+again. When every backend is ejected, requests go to the one closest to the
+end of its ejection rather than failing outright.
+"""
+import itertools
+import sys
+import threading
+import time
+import requests
+
+EJECT_AFTER = 2
+
+EJECT_SECONDS = 5.0
+
+EJECT_MAX_SECONDS = 60.0
+
+HEALTH_ENDPOINT = "available-pre-configs"
+
+# (connect, read) timeouts in seconds of the health checks
+HEALTH_TIMEOUT = (2.0, 5.0)
+
+
+class Backend:
+    def __init__(self, url):
+        self.url = url
+        self.outstanding = 0
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = None
+        self.checking = False
+        self.picked = 0
+
+
+backends = []
+
+lock = threading.Lock()
+
+picks = itertools.count(1)
+
+
+def configure(urls):
+    backends[:] = [Backend(url) for url in urls]
+
+
+def is_balanced():
+    return len(backends) > 1
+
+
+def eject(backend, now):
+    backend.ejections += 1
+    seconds = min(EJECT_MAX_SECONDS, EJECT_SECONDS * 2 ** (backend.ejections - 1))
+    backend.ejected_until = now + seconds
+
+    print(
+        f"Warning: {backend.url} is failing, no requests go to it for {seconds:g}s",
+        file=sys.stderr,
+    )
+
+
+def check_health(backend):
+    try:
+        response = requests.get(backend.url + HEALTH_ENDPOINT, timeout=HEALTH_TIMEOUT)
+        healthy = response.status_code < 500
+    except requests.exceptions.RequestException:
+        healthy = False
+
+    with lock:
+        backend.checking = False
+
+        if healthy:
+            backend.ejected_until = None
+            backend.failures = 0
+        else:
+            eject(backend, time.monotonic())
+
+
+def acquire():
+    """Picks the backend of the next request and counts it as in flight"""
+
+    now = time.monotonic()
+
+    with lock:
+        due = [
+            backend
+            for backend in backends
+            if backend.ejected_until is not None
+            and backend.ejected_until <= now
+            and not backend.checking
+        ]
+
+        for backend in due:
+            backend.checking = True
+
+    for backend in due:
+        check_health(backend)
+
+    with lock:
+        candidates = [backend for backend in backends if backend.ejected_until is None]
+
+        if not candidates:
+            candidates = [min(backends, key=lambda backend: backend.ejected_until)]
+
+        backend = min(candidates, key=lambda backend: (backend.outstanding, backend.picked))
+        backend.outstanding += 1
+        backend.picked = next(picks)
+
+    return backend
+
+
+def release(backend, response=None, error=None):
+    """Counts the end of a request, ejecting the backend when it keeps failing"""
+
+    failed = isinstance(
+        error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    ) or (response is not None and response.status_code >= 500)
+
+    with lock:
+        backend.outstanding -= 1
+
+        if not failed:
+            backend.failures = 0
+
+            if backend.ejected_until is None:
+                backend.ejections = 0
+            return
+
+        backend.failures += 1
+
+        if backend.failures >= EJECT_AFTER and backend.ejected_until is None:
+            eject(backend, time.monotonic())
@@ -0,0 +1,133 @@
+"""
+Client-side cache of analysis results.
+
+An analysis only changes when its pre configuration or the metrics imported
+for it change, so every cached response is keyed by the pre config ID plus a
+fingerprint of the pre config document served by the backend and of the last
+metrics file imported through this CLI. Metrics imported from elsewhere, by CI
+or another host, change neither, so an entry is also only used for
+MAX_AGE_SECONDS (--cache-ttl) after the analysis it holds. Entries are evicted
+in least recently used order once the cache grows past CACHE_MAX_BYTES.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from src.cli.utils import get_data_dir, write_json_atomic, file_sha256
+
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+DEFAULT_MAX_AGE_SECONDS = 300.0
+
+MAX_AGE_SECONDS = DEFAULT_MAX_AGE_SECONDS
+
+IMPORTS_FILE_NAME = "imports.json"
+
+imports_lock = threading.Lock()
+
+
+def analysis_cache_dir():
+    return get_data_dir("cache", "analysis")
+
+
+def read_imports():
+    try:
+        with open(get_data_dir("cache") / IMPORTS_FILE_NAME, "r") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def record_import(pre_config_id, absolute_path):
+    try:
+        last_import = {
+            "file_sha256": file_sha256(absolute_path),
+            "imported_at": time.time(),
+        }
+
+        with imports_lock:
+            imports = read_imports()
+            imports[pre_config_id] = last_import
+
+            write_json_atomic(get_data_dir("cache") / IMPORTS_FILE_NAME, imports)
+    except OSError as error:
+        print(f"Warning: the import was not recorded in the cache: {error}", file=sys.stderr)
+
+
+def analysis_fingerprint(pre_config_id, pre_config):
+    last_import = read_imports().get(pre_config_id)
+
+    fingerprint_data = json.dumps(
+        {"pre_config": pre_config, "last_import": last_import}, sort_keys=True
+    )
+
+    return hashlib.sha256(fingerprint_data.encode("utf-8")).hexdigest()
+
+
+def cache_entry_path(pre_config_id, fingerprint):
+    key = hashlib.sha256(f"{pre_config_id}:{fingerprint}".encode("utf-8"))
+
+    return analysis_cache_dir() / f"{key.hexdigest()}.json"
+
+
+def get_cached_analysis(pre_config_id, fingerprint):
+    """The cached response, None on a miss or when the cache cannot be read"""
+
+    try:
+        entry_path = cache_entry_path(pre_config_id, fingerprint)
+
+        with open(entry_path, "r") as file:
+            entry = json.load(file)
+
+        if time.time() - entry.get("stored_at", 0) > MAX_AGE_SECONDS:
+            return None
+
+        # The modification time is the LRU clock
+        os.utime(entry_path)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    return entry["response"]
+
+
+def store_analysis(pre_config_id, fingerprint, response_json):
+    entry = {
+        "pre_config_id": pre_config_id,
+        "fingerprint": fingerprint,
+        "stored_at": time.time(),
+        "response": response_json,
+    }
+
+    try:
+        write_json_atomic(cache_entry_path(pre_config_id, fingerprint), entry)
+
+        evict(CACHE_MAX_BYTES)
+    except OSError as error:
+        print(f"Warning: the analysis was not cached: {error}", file=sys.stderr)
+
+
+def evict(max_bytes):
+    entries = []
+
+    for entry_path in analysis_cache_dir().glob("*.json"):
+        try:
+            stat = entry_path.stat()
+        except OSError:
+            continue
+
+        entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+    total_size = sum(size for _, size, _ in entries)
+
+    for _, size, entry_path in sorted(entries):
+        if total_size <= max_bytes:
+            break
+
+        try:
+            entry_path.unlink()
+        except OSError:
+            continue
+
+        total_size -= size
@@ -0,0 +1,84 @@
+"""
+Cooperative cancellation of the running command.
+
+The first SIGINT only sets the cancelled event: requests that were not sent
+yet are skipped by the client, requests in flight get GRACE_SECONDS to finish
+and the command exits with EXIT_CANCELLED. When the grace period runs out, or
+on a second SIGINT, the flush callbacks run and the process exits right away.
+"""
+import os
+import sys
+import threading
+from src.cli.exceptions import Cancelled
+
+EXIT_CANCELLED = 130
+
+GRACE_SECONDS = 10.0
+
+cancelled = threading.Event()
+
+flush_callbacks = []
+
+flush_lock = threading.Lock()
+
+deadline = None
+
+
+def raise_if_cancelled():
+    if cancelled.is_set():
+        raise Cancelled("The command was cancelled")
+
+
+def register_flush(callback):
+    with flush_lock:
+        flush_callbacks.append(callback)
+
+
+def unregister_flush(callback):
+    with flush_lock:
+        if callback in flush_callbacks:
+            flush_callbacks.remove(callback)
+
+
+def run_flush_callbacks():
+    with flush_lock:
+        callbacks = list(flush_callbacks)
+
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as error:
+            print(f"Error while saving the command state: {error}", file=sys.stderr)
+
+
+def force_exit():
+    run_flush_callbacks()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(EXIT_CANCELLED)
+
+
+def cancel():
+    """Cancels the command, forcing the exit when it is already cancelled"""
+
+    global deadline
+
+    if cancelled.is_set():
+        force_exit()
+        return
+
+    cancelled.set()
+
+    deadline = threading.Timer(GRACE_SECONDS, force_exit)
+    deadline.daemon = True
+    deadline.start()
+
+
+def reset():
+    if deadline is not None:
+        deadline.cancel()
+
+    cancelled.clear()
+
+    with flush_lock:
+        flush_callbacks.clear()
@@ -0,0 +1,58 @@
+"""
+On-disk checkpoints of resumable imports.
+
+A resumable import uploads the components of a metrics file in chunks and
+records every chunk acknowledged by the service. Checkpoints are keyed by the
+SHA-256 of the uploaded components plus the pre config ID, so the next run of
+the same import continues at the first unacknowledged chunk. A changed file,
+component filter or metric projection uploads other components, so it starts
+over.
+"""
+import hashlib
+import json
+import uuid
+from src.cli.utils import get_data_dir, write_json_atomic
+
+
+def checkpoint_path(components_hash, pre_config_id):
+    key = hashlib.sha256(f"{components_hash}:{pre_config_id}".encode("utf-8"))
+
+    return get_data_dir("checkpoints") / f"{key.hexdigest()}.json"
+
+
+def new_checkpoint(components_hash, pre_config_id, chunk_size, total):
+    return {
+        "components_sha256": components_hash,
+        "pre_config_id": pre_config_id,
+        "upload_id": uuid.uuid4().hex,
+        "chunk_size": chunk_size,
+        "total": total,
+        "acknowledged": 0,
+    }
+
+
+def load_checkpoint(components_hash, pre_config_id):
+    try:
+        with open(checkpoint_path(components_hash, pre_config_id), "r") as file:
+            checkpoint = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if checkpoint.get("components_sha256") != components_hash:
+        return None
+
+    return checkpoint
+
+
+def save_checkpoint(checkpoint):
+    write_json_atomic(
+        checkpoint_path(checkpoint["components_sha256"], checkpoint["pre_config_id"]),
+        checkpoint,
+    )
+
+
+def remove_checkpoint(checkpoint):
+    try:
+        checkpoint_path(checkpoint["components_sha256"], checkpoint["pre_config_id"]).unlink()
+    except FileNotFoundError:
+        pass
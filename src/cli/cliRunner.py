@@ -1,74 +1,92 @@
 import argparse
 import json
 import sys
-import requests
 import signal
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from src.cli import cache, cancellation, client, memory, metrics, mirror, profiling, watch
 from src.cli.show import parse_show
 from src.cli.list import parse_list
-from src.cli.exceptions import MeasureSoftGramCLIException
-from src.cli.jsonReader import file_reader, validate_metrics_post
-from src.cli.results import validade_analysis_response
+from src.cli.exceptions import MeasureSoftGramCLIException, Cancelled
+from src.cli.jsonReader import build_component_filter
+from src.cli.analysis import parse_analysis, parse_analysis_many, DEFAULT_WORKERS
+from src.cli.convert import parse_convert
+from src.cli.diff import parse_diff, DEFAULT_MEMORY_BUDGET
+from src.cli.history import parse_history
 from src.cli.create import validate_pre_config_post, pre_config_file_reader
 from src.cli.available import parse_available
-
-BASE_URL = "http://localhost:5000/"
+from src.cli.importer import parse_import, DEFAULT_CHUNK_SIZE, STREAM_FRAMINGS
+from src.cli.formatters import OUTPUT_FORMATS
+from src.cli.manifest import parse_batch
+from src.cli.sonar import DEFAULT_OUTPUT_DIR
+from src.cli.validate import FILE_KINDS, parse_validate
+from src.cli.generator import (
+    DISTRIBUTIONS,
+    parse_generate_sonar,
+    parse_generate_pre_config,
+)
 
 
 def sigint_handler(*_):
-    print("\n\nExiting MeasureSoftGram...")
-    sys.exit(0)
-
-
-def parse_analysis(id):
-    data = {"pre_config_id": id}
-    response = requests.post(BASE_URL + "analysis", json=data)
+    if cancellation.cancelled.is_set():
+        print("\n\nForcing the exit of MeasureSoftGram", flush=True)
+    else:
+        print("\n\nExiting MeasureSoftGram... (press Ctrl-C again to force it)")
 
-    validade_analysis_response(response.status_code, response.json())
+    cancellation.cancel()
 
 
-def parse_import(file_path, id, language_extension):
+def create_pre_config(file_path, available_pre_config):
     try:
-        components = file_reader(r"{}".format(file_path))
+        pre_config = pre_config_file_reader(
+            r"{}".format(file_path), available_pre_config
+        )
     except MeasureSoftGramCLIException as error:
-        print("Error: ", error)
-        return
+        return error, None
 
-    payload = {
-        "pre_config_id": id,
-        "components": components,
-        "language_extension": language_extension,
-    }
+    response = client.post("pre-configs", json=pre_config)
 
-    response = requests.post(BASE_URL + "import-metrics", json=payload)
+    if response.status_code == 201:
+        mirror.store_pre_config(json.loads(response.text))
 
-    validate_metrics_post(response.status_code, json.loads(response.text))
+    return None, response
 
 
-def parse_create(file_path):
-    available_pre_config = requests.get(
-        BASE_URL + "available-pre-configs", headers={"Accept": "application/json"}
-    ).json()
+def parse_create(file_paths, workers=DEFAULT_WORKERS):
+    """
+    Creates the pre configs of the files concurrently. The catalog of
+    available pre configs is fetched once, while the files are read and
+    validated, and only waited for when they are checked against it.
+    """
 
-    try:
-        pre_config = pre_config_file_reader(
-            r"{}".format(file_path), available_pre_config
+    with ThreadPoolExecutor(max_workers=max(1, workers) + 1) as executor:
+        available_pre_config = executor.submit(
+            lambda: client.get("available-pre-configs").json()
         )
-    except MeasureSoftGramCLIException as error:
-        print("Error: ", error)
-        return
+        futures = [
+            executor.submit(create_pre_config, file_path, available_pre_config)
+            for file_path in file_paths
+        ]
+
+        # Results are printed in the order of the files, waiting for each in turn
+        for file_path, future in zip(file_paths, futures):
+            error, response = future.result()
 
-    response = requests.post(BASE_URL + "/pre-configs", json=pre_config)
+            if len(file_paths) > 1:
+                print(f"\n{file_path}:")
 
-    saved_pre_config = json.loads(response.text)
+            if error is not None:
+                print("Error: ", error)
+                continue
 
-    validate_pre_config_post(response.status_code, saved_pre_config)
+            validate_pre_config_post(response.status_code, json.loads(response.text))
+
+        # A failed fetch still fails the command when no file got to use it
+        available_pre_config.result()
 
 
 def parse_change_name(pre_config_id, new_name):
-    response = requests.patch(
-        BASE_URL + f"pre-configs/{pre_config_id}", json={"name": new_name}
-    )
+    response = client.patch(f"pre-configs/{pre_config_id}", json={"name": new_name})
 
     response_data = response.json()
 
@@ -76,16 +94,315 @@ def parse_change_name(pre_config_id, new_name):
         print(
             f'Your Pre Configuration name was succesfully changed to "{response_data["name"]}"'
         )
+        mirror.store_pre_config(response_data)
     else:
         print(
             f"There was an ERROR while changing your Pre Configuration name:  {response_data['error']}"
         )
 
 
+def add_format_argument(parser):
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=OUTPUT_FORMATS,
+        default="text",
+        help="Output format, text is meant for humans and the others for tools",
+    )
+
+
+def add_online_argument(parser):
+    parser.add_argument(
+        "--online",
+        action="store_true",
+        help="Ask the service even when the local mirror was synced",
+    )
+
+
+def add_component_filter_arguments(parser):
+    parser.add_argument(
+        "--include-qualifier",
+        dest="include_qualifiers",
+        action="append",
+        metavar="QUALIFIER",
+        help="Only import components with this Sonar qualifier (e.g. FIL)",
+    )
+
+    parser.add_argument(
+        "--exclude-qualifier",
+        dest="exclude_qualifiers",
+        action="append",
+        metavar="QUALIFIER",
+        help="Skip components with this Sonar qualifier (e.g. UTS)",
+    )
+
+    parser.add_argument(
+        "--language",
+        dest="languages",
+        action="append",
+        metavar="LANGUAGE",
+        help="Only import components of this language",
+    )
+
+    parser.add_argument(
+        "--include-path",
+        dest="include_paths",
+        action="append",
+        metavar="PATTERN",
+        help='Only import components whose path matches this glob, or regex with "re:"',
+    )
+
+    parser.add_argument(
+        "--exclude-path",
+        dest="exclude_paths",
+        action="append",
+        metavar="PATTERN",
+        help='Skip components whose path matches this glob, or regex with "re:"',
+    )
+
+
+def component_filter_from_args(args):
+    return build_component_filter(
+        args.include_qualifiers,
+        args.exclude_qualifiers,
+        args.languages,
+        args.include_paths,
+        args.exclude_paths,
+    )
+
+
+def run_import(args):
+    if args.watch:
+        watch.parse_watch(
+            args.path,
+            args.id,
+            args.language_extension,
+            args.interval,
+            args.settle,
+            args.workers,
+            args.all_metrics,
+            component_filter_from_args(args),
+        )
+    else:
+        parse_import(
+            args.path,
+            args.id,
+            args.language_extension,
+            args.resume,
+            args.chunk_size,
+            args.all_metrics,
+            component_filter_from_args(args),
+            args.framing,
+        )
+
+
+def run_validate(args):
+    valid = parse_validate(
+        args.paths, args.kind, args.available, args.workers, args.output_format
+    )
+
+    if not valid:
+        sys.exit(1)
+
+
+def run_analysis(args):
+    cache.MAX_AGE_SECONDS = args.cache_ttl
+
+    if len(args.ids) == 1 and not args.all_pre_configs:
+        parse_analysis(args.ids[0], args.use_cache, args.output_format)
+    else:
+        parse_analysis_many(
+            args.ids,
+            args.all_pre_configs,
+            args.workers,
+            args.use_cache,
+            args.output_format,
+        )
+
+
+def add_generate_parser(subparsers):
+    parser_generate = subparsers.add_parser(
+        "generate", help="Generate synthetic Sonar metrics or pre configuration files"
+    )
+
+    generate_subparsers = parser_generate.add_subparsers(dest="kind", required=True)
+
+    parser_generate_sonar = generate_subparsers.add_parser(
+        "sonar", help="Generate a Sonar component_tree JSON file"
+    )
+
+    parser_generate_sonar.add_argument(
+        "output",
+        type=lambda p: Path(p).absolute(),
+        help="Path of the generated JSON file",
+    )
+
+    parser_generate_sonar.add_argument(
+        "--components",
+        type=int,
+        default=1000,
+        help="Number of components",
+    )
+
+    parser_generate_sonar.add_argument(
+        "--distribution",
+        choices=DISTRIBUTIONS,
+        default="uniform",
+        help="Distribution of the metric values",
+    )
+
+    parser_generate_sonar.add_argument(
+        "--invalid-rate",
+        type=float,
+        default=0.0,
+        help="Probability of a metric value being invalid (0 to 1)",
+    )
+
+    parser_generate_sonar.add_argument(
+        "--language",
+        type=str,
+        default="py",
+        help="The source code language extension of the components",
+    )
+
+    parser_generate_sonar.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed of the random values, for reproducible files",
+    )
+
+    parser_generate_sonar.set_defaults(
+        handler=lambda args: parse_generate_sonar(
+            args.output,
+            args.components,
+            args.distribution,
+            args.invalid_rate,
+            args.language,
+            args.seed,
+        )
+    )
+
+    parser_generate_pre_config = generate_subparsers.add_parser(
+        "pre-config", help="Generate a valid pre configuration JSON file"
+    )
+
+    parser_generate_pre_config.add_argument(
+        "output",
+        type=lambda p: Path(p).absolute(),
+        help="Path of the generated JSON file",
+    )
+
+    parser_generate_pre_config.add_argument(
+        "--breadth",
+        type=int,
+        nargs=3,
+        default=[2, 2, 3],
+        metavar=("CHARACTERISTICS", "SUBCHARACTERISTICS", "MEASURES"),
+        help="Number of items in each level of the pre configuration",
+    )
+
+    parser_generate_pre_config.add_argument(
+        "--available-output",
+        type=lambda p: Path(p).absolute(),
+        default=None,
+        help="Also write the matching available-pre-configs catalog to this path",
+    )
+
+    parser_generate_pre_config.set_defaults(
+        handler=lambda args: parse_generate_pre_config(
+            args.output, args.breadth, args.available_output
+        )
+    )
+
+
 def setup():
     parser = argparse.ArgumentParser(
         description="Command line interface for measuresoftgram"
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the wall and CPU time spent in each phase to stderr at exit",
+    )
+
+    parser.add_argument(
+        "--profile-output",
+        type=lambda p: Path(p).absolute(),
+        default=None,
+        help="Also save cProfile statistics of the command to this pstats file",
+    )
+
+    parser.add_argument(
+        "--memory-report",
+        type=lambda p: Path(p).absolute(),
+        default=None,
+        help="Trace the memory of each phase and write a JSON report to this file",
+    )
+
+    parser.add_argument(
+        "--metrics-out",
+        type=lambda p: Path(p).absolute(),
+        default=None,
+        help="Write latency histograms and byte counters of every request to this file",
+    )
+
+    parser.add_argument(
+        "--metrics-format",
+        choices=metrics.METRICS_FORMATS,
+        default="json",
+        help="Format of the --metrics-out file",
+    )
+
+    parser.add_argument(
+        "--backend",
+        dest="backends",
+        action="append",
+        metavar="URL",
+        help="URL of a MeasureSoftGram backend, repeat it to spread requests over several"
+        " (default: MEASURESOFTGRAM_URL, separated by commas)",
+    )
+
+    parser.add_argument(
+        "--timeout",
+        dest="timeouts",
+        type=client.parse_timeout,
+        action="append",
+        metavar="[ENDPOINT=]SECONDS",
+        help="Read timeout of every request, or of one endpoint (e.g. analysis=300)",
+    )
+
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=None,
+        help=f"Retries of failed requests (default: {client.RETRIES})",
+    )
+
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Send a second copy of slow idempotent requests after this delay",
+    )
+
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        metavar="REQUESTS",
+        help="Most requests per second sent to each server",
+    )
+
+    parser.add_argument(
+        "--grace-period",
+        type=float,
+        default=cancellation.GRACE_SECONDS,
+        metavar="SECONDS",
+        help="Time given to requests in flight to finish after Ctrl-C",
+    )
+
     subparsers = parser.add_subparsers(dest="command", help="sub-command help")
 
     parser_import = subparsers.add_parser("import", help="Import a metrics file")
@@ -109,28 +426,147 @@ def setup():
         help="The source code language extension",
     )
 
+    upload_mode = parser_import.add_mutually_exclusive_group()
+
+    upload_mode.add_argument(
+        "--resume",
+        action="store_true",
+        help="Upload in chunks and continue an interrupted import where it stopped",
+    )
+
+    upload_mode.add_argument(
+        "--stream",
+        dest="framing",
+        nargs="?",
+        const="json",
+        default=None,
+        choices=STREAM_FRAMINGS,
+        help="Stream the components from the file in a chunked request body",
+    )
+
+    parser_import.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Components per chunk of a resumable import",
+    )
+
+    parser_import.add_argument(
+        "--all-metrics",
+        action="store_true",
+        help="Upload every metric instead of only the ones the pre configuration needs",
+    )
+
+    upload_mode.add_argument(
+        "--watch",
+        action="store_true",
+        help="Treat path as a directory and import every new JSON file dropped in it",
+    )
+
+    parser_import.add_argument(
+        "--interval",
+        type=float,
+        default=watch.DEFAULT_INTERVAL,
+        metavar="SECONDS",
+        help="Seconds between the scans of the watched directory",
+    )
+
+    parser_import.add_argument(
+        "--settle",
+        type=float,
+        default=watch.DEFAULT_SETTLE,
+        metavar="SECONDS",
+        help="Seconds a watched file must stay unchanged before it is imported",
+    )
+
+    parser_import.add_argument(
+        "--workers",
+        type=int,
+        default=watch.DEFAULT_WORKERS,
+        help="Maximum number of watched files imported at the same time",
+    )
+
+    add_component_filter_arguments(parser_import)
+
+    parser_import.set_defaults(handler=run_import)
+
     parser_create = subparsers.add_parser(
         "create",
         help="Create a new model pre configuration from a JSON file",
     )
 
-    subparsers.add_parser(
+    parser_available = subparsers.add_parser(
         "available",
         help="Shows all characteristics, sub-characteristics and measures available in measuresoftgram",
     )
 
+    parser_available.set_defaults(handler=lambda args: parse_available())
+
     parser_create.add_argument(
-        "path",
+        "paths",
+        nargs="+",
         type=lambda p: Path(p).absolute(),
-        default=Path(__file__).absolute().parent / "data",
-        help="Path to the JSON file",
+        help="Paths to the JSON files, several files are created concurrently",
     )
 
+    parser_create.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Maximum number of pre configurations created at the same time",
+    )
+
+    parser_create.set_defaults(handler=lambda args: parse_create(args.paths, args.workers))
+
     parser_analysis = subparsers.add_parser("analysis", help="Get analysis result")
     parser_analysis.add_argument(
-        "id",
+        "ids",
+        nargs="*",
+        help="Pre config IDs. Several IDs are analysed concurrently and compared",
+    )
+
+    parser_analysis.add_argument(
+        "--all",
+        dest="all_pre_configs",
+        action="store_true",
+        help="Analyse every pre configuration saved in MeasureSoftGram",
+    )
+
+    parser_analysis.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Maximum number of analyses running at the same time",
+    )
+
+    parser_analysis.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Always request a new analysis instead of using a cached result",
+    )
+
+    parser_analysis.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=cache.DEFAULT_MAX_AGE_SECONDS,
+        metavar="SECONDS",
+        help="Longest time a cached result is used, since metrics imported by other hosts"
+        " do not invalidate it (default: %(default)s)",
+    )
+
+    add_format_argument(parser_analysis)
+
+    parser_analysis.set_defaults(handler=run_analysis)
+
+    parser_list = subparsers.add_parser("list", help="List all pre configurations")
+
+    add_online_argument(parser_list)
+    add_format_argument(parser_list)
+
+    parser_list.set_defaults(
+        handler=lambda args: parse_list(args.output_format, args.online)
     )
-    subparsers.add_parser("list", help="List all pre configurations")
 
     parser_show = subparsers.add_parser(
         "show", help="Show all information of a pre configuration"
@@ -142,6 +578,28 @@ def setup():
         help="Pre config ID",
     )
 
+    add_online_argument(parser_show)
+    add_format_argument(parser_show)
+
+    parser_show.set_defaults(
+        handler=lambda args: parse_show(
+            args.pre_config_id, args.output_format, args.online
+        )
+    )
+
+    parser_sync = subparsers.add_parser(
+        "sync",
+        help="Update the local mirror of pre configurations used by list and show",
+    )
+
+    parser_sync.add_argument(
+        "--full",
+        action="store_true",
+        help="Download every pre configuration again, dropping the deleted ones",
+    )
+
+    parser_sync.set_defaults(handler=lambda args: mirror.parse_sync(args.full))
+
     change_name = subparsers.add_parser(
         "change-name", help="Change pre configuration name"
     )
@@ -158,26 +616,209 @@ def setup():
         help="New pre configuration name",
     )
 
+    change_name.set_defaults(
+        handler=lambda args: parse_change_name(args.pre_config_id, args.new_name)
+    )
+
+    parser_batch = subparsers.add_parser(
+        "batch", help="Fetch and import every entry of a JSON or YAML manifest"
+    )
+
+    parser_batch.add_argument(
+        "manifest",
+        type=lambda p: Path(p).absolute(),
+        help="Path to the manifest",
+    )
+
+    parser_batch.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Maximum number of entries running at the same time",
+    )
+
+    parser_batch.add_argument(
+        "--output-dir",
+        type=lambda p: Path(p).absolute(),
+        default=DEFAULT_OUTPUT_DIR,
+        help="Directory of the metrics files fetched from SonarCloud",
+    )
+
+    parser_batch.add_argument(
+        "--force",
+        action="store_true",
+        help="Run again the entries that succeeded in previous runs",
+    )
+
+    parser_batch.set_defaults(
+        handler=lambda args: parse_batch(
+            args.manifest, args.workers, args.output_dir, args.force
+        )
+    )
+
+    parser_validate = subparsers.add_parser(
+        "validate",
+        help="Validate metrics and pre configuration files without the service",
+    )
+
+    parser_validate.add_argument(
+        "paths",
+        nargs="+",
+        type=lambda p: Path(p).absolute(),
+        help="Files, or directories whose JSON files are all validated",
+    )
+
+    parser_validate.add_argument(
+        "--kind",
+        choices=FILE_KINDS,
+        default="auto",
+        help="Kind of the files, auto detects it from their keys",
+    )
+
+    parser_validate.add_argument(
+        "--available",
+        type=lambda p: Path(p).absolute(),
+        default=None,
+        help="Also check pre configurations against this available-pre-configs file",
+    )
+
+    parser_validate.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes (default: one per CPU core)",
+    )
+
+    add_format_argument(parser_validate)
+
+    parser_validate.set_defaults(handler=run_validate)
+
+    parser_history = subparsers.add_parser(
+        "history",
+        help="Show the SQC and characteristics of past analyses, kept locally",
+    )
+
+    parser_history.add_argument(
+        "ids",
+        nargs="*",
+        help="Pre config IDs (default: all)",
+    )
+
+    parser_history.add_argument(
+        "--characteristic",
+        dest="characteristics",
+        action="append",
+        help="Show only this characteristic besides the SQC, can be repeated",
+    )
+
+    parser_history.add_argument(
+        "--since",
+        default=None,
+        help="Start of the time range, as an ISO date like 2022-05-01 or 2022-05-01T10:00",
+    )
+
+    parser_history.add_argument(
+        "--until",
+        default=None,
+        help="End of the time range, as an ISO date, a date alone includes the whole day",
+    )
+
+    add_format_argument(parser_history)
+
+    parser_history.set_defaults(
+        handler=lambda args: parse_history(
+            args.ids, args.characteristics, args.since, args.until, args.output_format
+        )
+    )
+
+    parser_convert = subparsers.add_parser(
+        "convert",
+        help="Convert a Sonar JSON file to a compact snapshot, or a snapshot back to JSON",
+    )
+
+    parser_convert.add_argument(
+        "input_path",
+        type=lambda p: Path(p).absolute(),
+        help="Path to the Sonar JSON file, or to the .msgsnap snapshot",
+    )
+
+    parser_convert.add_argument(
+        "-o",
+        "--output",
+        dest="output_path",
+        type=lambda p: Path(p).absolute(),
+        default=None,
+        help="Path of the converted file (default: the input path with the other extension)",
+    )
+
+    parser_convert.set_defaults(
+        handler=lambda args: parse_convert(args.input_path, args.output_path)
+    )
+
+    parser_diff = subparsers.add_parser(
+        "diff",
+        help="Show the components and metrics changed between two Sonar JSON files",
+    )
+
+    parser_diff.add_argument(
+        "old_path",
+        type=lambda p: Path(p).absolute(),
+        help="Path to the older Sonar JSON file",
+    )
+
+    parser_diff.add_argument(
+        "new_path",
+        type=lambda p: Path(p).absolute(),
+        help="Path to the newer Sonar JSON file",
+    )
+
+    parser_diff.add_argument(
+        "--memory-budget",
+        type=float,
+        default=DEFAULT_MEMORY_BUDGET / (1024 * 1024),
+        help="Memory in MB for the join, larger files are partitioned on disk (default: %(default)s)",
+    )
+
+    add_format_argument(parser_diff)
+
+    parser_diff.set_defaults(
+        handler=lambda args: parse_diff(
+            args.old_path,
+            args.new_path,
+            int(args.memory_budget * 1024 * 1024),
+            args.output_format,
+        )
+    )
+
+    add_generate_parser(subparsers)
+
     args = parser.parse_args()
 
     # if args is empty show help
-    if not sys.argv[1:]:
+    if not sys.argv[1:] or getattr(args, "handler", None) is None:
         parser.print_help()
         return
-    elif args.command == "import":
-        parse_import(args.path, args.id, args.language_extension)
-    elif args.command == "create":
-        parse_create(args.path)
-    elif args.command == "analysis":
-        parse_analysis(args.id)
-    elif args.command == "available":
-        parse_available()
-    elif args.command == "list":
-        parse_list()
-    elif args.command == "show":
-        parse_show(args.pre_config_id)
-    elif args.command == "change-name":
-        parse_change_name(args.pre_config_id, args.new_name)
+
+    client.configure(
+        dict(args.timeouts or []),
+        args.retries,
+        args.hedge_after,
+        args.rate_limit,
+        args.backends,
+    )
+    cancellation.GRACE_SECONDS = args.grace_period
+
+    try:
+        with metrics.collect_command(args.metrics_out, args.metrics_format):
+            with memory.collect_command(args.memory_report), profiling.profile_command(
+                args.profile or args.profile_output is not None, args.profile_output
+            ):
+                args.handler(args)
+    except Cancelled:
+        pass
+
+    if cancellation.cancelled.is_set():
+        sys.exit(cancellation.EXIT_CANCELLED)
 
 
 def main():
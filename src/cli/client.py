@@ -0,0 +1,247 @@
+import queue
+import random
+import threading
+import time
+import requests
+import urllib3
+from urllib.parse import urlsplit
+from src.cli import backends, cancellation, metrics, profiling
+from src.cli.utils import get_base_urls, normalize_base_url
+
+BASE_URL = get_base_urls()[0]
+
+backends.configure(get_base_urls())
+
+JSON_HEADERS = {"Accept": "application/json"}
+
+# (connect, read) timeouts in seconds of each endpoint
+TIMEOUTS = {
+    "default": (5.0, 30.0),
+    "import-metrics": (5.0, 300.0),
+    "analysis": (5.0, 120.0),
+}
+
+RETRIES = 3
+
+BACKOFF_BASE = 0.25
+
+BACKOFF_CAP = 8.0
+
+# Seconds to wait before sending a second copy of an idempotent request,
+# None disables hedged requests
+HEDGE_AFTER = None
+
+# Requests per second sent to each host, None is unlimited
+RATE_LIMIT = None
+
+# Time when each host may get its next request
+next_request_times = {}
+
+rate_limit_lock = threading.Lock()
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Statuses that guarantee the request was not processed, so even
+# non-idempotent requests can be sent again
+NOT_PROCESSED_STATUS = {429, 503}
+
+
+def configure(
+    timeouts=None, retries=None, hedge_after=None, rate_limit=None, base_urls=None
+):
+    global BASE_URL, RETRIES, HEDGE_AFTER, RATE_LIMIT
+
+    if base_urls:
+        base_urls = [normalize_base_url(url) for url in base_urls]
+        BASE_URL = base_urls[0]
+        backends.configure(base_urls)
+
+    if timeouts:
+        TIMEOUTS.update(timeouts)
+
+    if retries is not None:
+        RETRIES = retries
+
+    if hedge_after is not None:
+        HEDGE_AFTER = hedge_after
+
+    if rate_limit is not None:
+        RATE_LIMIT = rate_limit
+
+
+def parse_timeout(value):
+    """Parses the --timeout option, either SECONDS or ENDPOINT=SECONDS"""
+
+    endpoint, _, seconds = value.rpartition("=")
+
+    return endpoint or "default", (TIMEOUTS["default"][0], float(seconds))
+
+
+def timeout_for(endpoint):
+    return TIMEOUTS.get(metrics.endpoint_label(endpoint), TIMEOUTS["default"])
+
+
+def wait_rate_limit(url):
+    """Spaces the requests to the host of url by 1 / RATE_LIMIT seconds"""
+
+    if not RATE_LIMIT:
+        return
+
+    host = urlsplit(url).netloc
+
+    with rate_limit_lock:
+        now = time.monotonic()
+        send_at = max(now, next_request_times.get(host, now))
+        next_request_times[host] = send_at + 1 / RATE_LIMIT
+
+    if cancellation.cancelled.wait(send_at - now):
+        cancellation.raise_if_cancelled()
+
+
+def backoff_delay(attempt, response=None):
+    retry_after = None
+
+    if response is not None:
+        retry_after = getattr(response, "headers", {}).get("Retry-After")
+
+    if retry_after is not None and retry_after.isdigit():
+        return min(BACKOFF_CAP, float(retry_after))
+
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def request_was_not_sent(error):
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+def should_retry(idempotent, response=None, error=None):
+    if error is not None:
+        if isinstance(error, requests.exceptions.ConnectionError) or isinstance(
+            error, requests.exceptions.Timeout
+        ):
+            return idempotent or request_was_not_sent(error)
+
+        return False
+
+    if idempotent:
+        return response.status_code in RETRYABLE_STATUS
+
+    return response.status_code in NOT_PROCESSED_STATUS
+
+
+def send(method, url, **kwargs):
+    # Streamed bodies are passed as a function, so each attempt gets a new one
+    if callable(kwargs.get("data")):
+        kwargs["data"] = kwargs["data"]()
+
+    return getattr(requests, method)(url, **kwargs)
+
+
+def send_hedged(method, url, hedge_after, **kwargs):
+    """
+    Sends the request and, when it takes longer than hedge_after seconds, a
+    second copy of it. The first successful response wins.
+    """
+
+    results = queue.Queue()
+
+    def run():
+        try:
+            results.put((send(method, url, **kwargs), None))
+        except requests.exceptions.RequestException as error:
+            results.put((None, error))
+
+    threading.Thread(target=run, daemon=True).start()
+
+    try:
+        response, error = results.get(timeout=hedge_after)
+    except queue.Empty:
+        threading.Thread(target=run, daemon=True).start()
+        response, error = results.get()
+
+        if error is not None:
+            response, error = results.get()
+
+    if error is not None:
+        raise error
+
+    return response
+
+
+def request(method, endpoint, idempotent=None, **kwargs):
+    """
+    Sends a request to the MeasureSoftGram service, with timeouts and retries
+    with jittered exponential backoff. Requests are idempotent by default
+    only for GET, the others are retried only when they were not processed.
+    Nothing is sent once the command is cancelled.
+    """
+
+    idempotent = method == "get" if idempotent is None else idempotent
+    kwargs.setdefault("timeout", timeout_for(endpoint))
+    start = time.perf_counter()
+    attempt = 0
+
+    while True:
+        cancellation.raise_if_cancelled()
+        response, error = None, None
+
+        # Each attempt picks a backend again, so retries avoid a failing one
+        backend = backends.acquire() if backends.is_balanced() else None
+        url = (BASE_URL if backend is None else backend.url) + endpoint.lstrip("/")
+
+        try:
+            wait_rate_limit(url)
+
+            with profiling.phase("network"):
+                try:
+                    if idempotent and HEDGE_AFTER is not None:
+                        response = send_hedged(method, url, HEDGE_AFTER, **kwargs)
+                    else:
+                        response = send(method, url, **kwargs)
+                except requests.exceptions.RequestException as request_error:
+                    error = request_error
+        finally:
+            if backend is not None:
+                backends.release(backend, response, error)
+
+        if attempt < RETRIES and should_retry(idempotent, response, error):
+            cancellation.cancelled.wait(backoff_delay(attempt, response))
+            attempt += 1
+            continue
+
+        metrics.record_request(
+            method,
+            endpoint,
+            response,
+            time.perf_counter() - start,
+            retries=attempt,
+            error=error,
+        )
+
+        if error is not None:
+            raise error
+
+        return response
+
+
+def get(endpoint, **kwargs):
+    kwargs.setdefault("headers", JSON_HEADERS)
+
+    return request("get", endpoint, **kwargs)
+
+
+def post(endpoint, **kwargs):
+    return request("post", endpoint, **kwargs)
+
+
+def patch(endpoint, **kwargs):
+    return request("patch", endpoint, **kwargs)
+
+
+def options(endpoint, **kwargs):
+    return request("options", endpoint, idempotent=True, **kwargs)
@@ -0,0 +1,61 @@
+import json
+import os
+import time
+from src.cli import exceptions, profiling
+from src.cli.jsonReader import (
+    check_file_extension,
+    check_metrics_values,
+    check_sonar_format,
+    open_json_file,
+)
+from src.cli.snapshot import SNAPSHOT_EXTENSION, is_snapshot, load_snapshot, write_snapshot
+
+
+def convert_file(input_path, output_path):
+    """Converts a Sonar JSON file to a snapshot, or a snapshot back to JSON"""
+
+    if is_snapshot(input_path):
+        json_data, _ = load_snapshot(input_path)
+
+        with profiling.phase("json_encode"), open(output_path, "w") as file:
+            json.dump(json_data, file)
+        return
+
+    # Only valid files are converted, so snapshots always pass the checks
+    check_file_extension(input_path)
+
+    with profiling.phase("open_json_file"):
+        json_data = open_json_file(input_path)
+
+    with profiling.phase("check_sonar_format"):
+        check_sonar_format(json_data)
+
+    with profiling.phase("check_metrics_values"):
+        check_metrics_values(json_data)
+
+    write_snapshot(json_data, output_path)
+
+
+def default_output_path(input_path):
+    extension = "json" if is_snapshot(input_path) else SNAPSHOT_EXTENSION
+
+    return input_path.with_suffix(f".{extension}")
+
+
+def parse_convert(input_path, output_path=None):
+    if output_path is None:
+        output_path = default_output_path(input_path)
+
+    start = time.perf_counter()
+
+    try:
+        convert_file(r"{}".format(input_path), r"{}".format(output_path))
+    except exceptions.MeasureSoftGramCLIException as error:
+        print("Error: ", error)
+        return
+
+    print(
+        f"{input_path} ({os.path.getsize(input_path)} bytes) converted to "
+        + f"{output_path} ({os.path.getsize(output_path)} bytes)"
+        + " in {:.2f}s".format(time.perf_counter() - start)
+    )
@@ -1,5 +1,77 @@
-from src.cli import exceptions
+from concurrent.futures import Future
+from src.cli import exceptions, profiling
 from src.cli.jsonReader import check_file_extension, open_json_file
+from src.cli.schema import compiled_validator
+
+# Pre config format checked by validate_pre_config, with the checks and
+# messages of validate_file_characteristics, validate_file_sub_characteristics
+# and validate_file_measures
+PRE_CONFIG_SCHEMA = {
+    "root": "characteristics",
+    "levels": [
+        {
+            "children": "subcharacteristics",
+            "missing_name": ("UnableToReadFile", "Expected characteristic name field."),
+            "missing_weight": (
+                "InvalidWeight",
+                "{} characteristic does not have weight field defined.",
+            ),
+            "invalid_weight": (
+                "InvalidWeight",
+                "{} does not have weight value inside parameters (0 to 100).",
+            ),
+            "missing_children": (
+                "UnableToReadFile",
+                "{} does not have subcharacteristics field defined.",
+            ),
+            "empty_children": (
+                "UnableToReadFile",
+                "{} needs to have at least one subcharacteristic defined.",
+            ),
+            "weights_sum": (
+                "UnableToReadFile",
+                "The sum of characteristics weights of is not 100",
+            ),
+        },
+        {
+            "children": "measures",
+            "missing_name": ("UnableToReadFile", "Expected sub-characteristic name field."),
+            "missing_weight": (
+                "InvalidWeight",
+                '"{}" subcharacteristic does not have weight field defined.',
+            ),
+            "invalid_weight": (
+                "InvalidWeight",
+                '"{}" subcharacteristics does not have weight value inside parameters (0 to 100).',
+            ),
+            "missing_children": (
+                "UnableToReadFile",
+                '"{}" subcharacteristic does not have measures field defined.',
+            ),
+            "empty_children": (
+                "UnableToReadFile",
+                '"{}" subcharacteristic needs to have at least one measure defined.',
+            ),
+            "weights_sum": (
+                "InvalidWeight",
+                "The sum of subcharacteristics weights is not 100",
+            ),
+        },
+        {
+            "children": None,
+            "missing_name": ("UnableToReadFile", "Expected measure name field."),
+            "missing_weight": (
+                "InvalidWeight",
+                "{} measure does not have weight field defined.",
+            ),
+            "invalid_weight": (
+                "InvalidWeight",
+                "{} measure does not have weight value inside parameters (0 to 100).",
+            ),
+            "weights_sum": ("InvalidWeight", "The sum of measures weights is not 100"),
+        },
+    ],
+}
 
 
 def pre_config_file_reader(absolute_path, available_pre_configs):
@@ -8,21 +80,29 @@ def pre_config_file_reader(absolute_path, available_pre_configs):
         core_format = available_pre_configs
         check_file_extension(absolute_path)
 
-        pre_config_json_file = open_json_file(absolute_path)
+        with profiling.phase("open_json_file"):
+            pre_config_json_file = open_json_file(absolute_path)
 
         pre_config_file_name = pre_config_json_file.get("pre_config_name", None)
 
-        validate_file_characteristics(pre_config_json_file)
-        validate_file_sub_characteristics(pre_config_json_file)
-        validate_file_measures(pre_config_json_file)
+        with profiling.phase("validate_pre_config"):
+            validate_pre_config(pre_config_json_file)
 
         file_characteristics = read_file_characteristics(pre_config_json_file)
         file_sub_characteristics = read_file_sub_characteristics(pre_config_json_file)
         file_measures = read_file_measures(pre_config_json_file)
 
-        validate_core_available(
-            core_format, file_characteristics, file_sub_characteristics
-        )
+        # The catalog may still be fetched while the file is read and validated
+        if isinstance(core_format, Future):
+            with profiling.phase("wait_available"):
+                core_format = core_format.result()
+
+        # Without the catalog only the file itself is validated
+        if core_format is not None:
+            with profiling.phase("validate_core_available"):
+                validate_core_available(
+                    core_format, file_characteristics, file_sub_characteristics
+                )
 
         pre_config = {
             "name": pre_config_file_name,
@@ -130,6 +210,13 @@ def ordenate_measures(measures):
 
     return measures
 
+
+def validate_pre_config(pre_config_json_file):
+    """Runs the checks of PRE_CONFIG_SCHEMA, compiled once and cached on disk"""
+
+    return compiled_validator(PRE_CONFIG_SCHEMA)(pre_config_json_file)
+
+
 def validate_file_characteristics(pre_config_json_file):
 
     sum_of_characteristics_weights = 0
@@ -0,0 +1,195 @@
+"""
+Diff of the components and metrics of two Sonar JSON files.
+
+Components are joined by key with a partitioned hash join: when the two
+files do not fit in the memory budget, both are streamed once into partition
+files on disk by a hash of the key, and each pair of partitions is then loaded
+into dicts whose rows are written in key order as they are produced. Only one
+pair of partitions is in memory at a time.
+"""
+import json
+import math
+import os
+import sys
+import tempfile
+import zlib
+from src.cli import exceptions, profiling
+from src.cli.formatters import write_rows
+from src.cli.jsonReader import check_file_extension, iter_components, json_file_errors
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# Bytes of memory used by a loaded component per byte of the JSON file
+MEMORY_PER_FILE_BYTE = 8
+
+DIFF_FIELDNAMES = ["status", "key", "metric", "old", "new", "delta"]
+
+
+def component_measures(component):
+    return {measure["metric"]: measure.get("value") for measure in component["measures"]}
+
+
+def iter_keyed_components(absolute_path):
+    """Streams (key, {metric: value}) of each component of the file"""
+
+    check_file_extension(absolute_path)
+
+    try:
+        with json_file_errors():
+            for component in iter_components(absolute_path, {}):
+                yield component["key"], component_measures(component)
+    except (KeyError, TypeError):
+        raise exceptions.InvalidMetricsJsonFile(
+            "Failed to read the components. Please check if the file is a valid Sonar JSON"
+        )
+
+
+def file_size(absolute_path):
+    check_file_extension(absolute_path)
+
+    with json_file_errors():
+        return os.path.getsize(absolute_path)
+
+
+def partitions_for(absolute_paths, memory_budget):
+    size = sum(file_size(absolute_path) for absolute_path in absolute_paths)
+
+    return max(1, math.ceil(size * MEMORY_PER_FILE_BYTE / memory_budget))
+
+
+def partition_of(key, partitions):
+    return zlib.crc32(key.encode("utf-8")) % partitions
+
+
+def write_partitions(keyed_components, directory, name, partitions):
+    paths = [os.path.join(directory, f"{name}-{index}.jsonl") for index in range(partitions)]
+    files = [open(path, "w") for path in paths]
+
+    try:
+        for key, measures in keyed_components:
+            files[partition_of(key, partitions)].write(json.dumps([key, measures]) + "\n")
+    finally:
+        for file in files:
+            file.close()
+
+    return paths
+
+
+def read_partition(path):
+    with open(path, "r") as file:
+        for line in file:
+            key, measures = json.loads(line)
+            yield key, measures
+
+
+def metric_delta(old_value, new_value):
+    try:
+        return float(new_value) - float(old_value)
+    except (TypeError, ValueError):
+        return ""
+
+
+def diff_measures(key, old_measures, new_measures):
+    for metric in sorted(old_measures.keys() | new_measures.keys()):
+        old_value = old_measures.get(metric)
+        new_value = new_measures.get(metric)
+
+        if old_value != new_value:
+            yield {
+                "status": "changed",
+                "key": key,
+                "metric": metric,
+                "old": "" if old_value is None else old_value,
+                "new": "" if new_value is None else new_value,
+                "delta": metric_delta(old_value, new_value),
+            }
+
+
+def component_row(status, key):
+    return {"status": status, "key": key, "metric": "", "old": "", "new": "", "delta": ""}
+
+
+def diff_partition(old_components, new_components):
+    """Streams the rows of one partition, sorted by key"""
+
+    old = dict(old_components)
+    new = dict(new_components)
+
+    for key in sorted(old.keys() | new.keys()):
+        if key not in old:
+            yield component_row("added", key)
+        elif key not in new:
+            yield component_row("removed", key)
+        elif old[key] != new[key]:
+            yield from diff_measures(key, old[key], new[key])
+
+
+def diff_files(old_path, new_path, memory_budget=DEFAULT_MEMORY_BUDGET):
+    partitions = partitions_for([old_path, new_path], memory_budget)
+
+    if partitions == 1:
+        with profiling.phase("diff_join"):
+            yield from diff_partition(
+                iter_keyed_components(old_path), iter_keyed_components(new_path)
+            )
+        return
+
+    with tempfile.TemporaryDirectory(prefix="measuresoftgram-diff-") as directory:
+        with profiling.phase("diff_partition"):
+            old_paths = write_partitions(
+                iter_keyed_components(old_path), directory, "old", partitions
+            )
+            new_paths = write_partitions(
+                iter_keyed_components(new_path), directory, "new", partitions
+            )
+
+        for old_partition, new_partition in zip(old_paths, new_paths):
+            with profiling.phase("diff_join"):
+                yield from diff_partition(
+                    read_partition(old_partition), read_partition(new_partition)
+                )
+
+
+def format_row(row):
+    if row["status"] == "added":
+        return f"+ {row['key']}"
+
+    if row["status"] == "removed":
+        return f"- {row['key']}"
+
+    delta = "" if row["delta"] == "" else " ({:+g})".format(row["delta"])
+
+    return f"~ {row['key']} {row['metric']}: {row['old']} -> {row['new']}{delta}"
+
+
+def parse_diff(
+    old_path, new_path, memory_budget=DEFAULT_MEMORY_BUDGET, output_format="text"
+):
+    counts = {"added": 0, "removed": 0, "changed": set()}
+
+    def counted(rows):
+        for row in rows:
+            if row["status"] == "changed":
+                counts["changed"].add(row["key"])
+            else:
+                counts[row["status"]] += 1
+
+            yield row
+
+    rows = counted(diff_files(r"{}".format(old_path), r"{}".format(new_path), memory_budget))
+
+    try:
+        if output_format == "text":
+            for row in rows:
+                print(format_row(row))
+        else:
+            write_rows(rows, output_format, DIFF_FIELDNAMES)
+    except exceptions.MeasureSoftGramCLIException as error:
+        print("Error: ", error)
+        return
+
+    print(
+        f"\n{counts['added']} added, {counts['removed']} removed, "
+        + f"{len(counts['changed'])} changed components",
+        file=sys.stderr if output_format != "text" else sys.stdout,
+    )
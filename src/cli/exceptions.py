@@ -44,3 +44,27 @@ class InvalidMeasuresoftgramFormat(MeasureSoftGramCLIException):
     """Raised when a invalid format file is provided to the MeasureSoftGram"""
 
     pass
+
+
+class Cancelled(MeasureSoftGramCLIException):
+    """Raised when the command is cancelled before some work starts"""
+
+    pass
+
+
+class MissingMetrics(MeasureSoftGramCLIException):
+    """Raised when the metrics file lacks metrics needed by the pre config"""
+
+    pass
+
+
+class InvalidManifest(MeasureSoftGramCLIException):
+    """Raised when an import manifest is invalid"""
+
+    pass
+
+
+class ServiceUnavailable(MeasureSoftGramCLIException):
+    """Raised when the service fails for a reason that may go away, like a 5xx"""
+
+    pass
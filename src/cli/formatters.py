@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+import sys
+
+OUTPUT_FORMATS = ["text", "json", "jsonl", "csv"]
+
+
+def render(rows, output_format, fieldnames, document=None):
+    """
+    Renders the rows into a single string, so it can be written at once.
+    The json format writes the document when one is given, rows otherwise.
+    """
+
+    buffer = io.StringIO()
+
+    if output_format == "json":
+        json.dump(rows if document is None else document, buffer)
+        buffer.write("\n")
+    elif output_format == "jsonl":
+        for row in rows:
+            buffer.write(json.dumps(row))
+            buffer.write("\n")
+    elif output_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    return buffer.getvalue()
+
+
+def write_output(text):
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def write_rows(rows, output_format, fieldnames, stream=None):
+    """Writes the rows as they come, for outputs too large to render at once"""
+
+    stream = sys.stdout if stream is None else stream
+
+    if output_format == "json":
+        stream.write("[")
+
+        for index, row in enumerate(rows):
+            stream.write(("," if index else "") + json.dumps(row))
+
+        stream.write("]\n")
+    elif output_format == "jsonl":
+        for row in rows:
+            stream.write(json.dumps(row))
+            stream.write("\n")
+    elif output_format == "csv":
+        writer = csv.DictWriter(stream, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+
+        for row in rows:
+            writer.writerow(row)
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    stream.flush()
@@ -0,0 +1,280 @@
+import json
+import random
+from src.cli import exceptions
+from src.cli.jsonReader import METRICS_SONAR
+
+DISTRIBUTIONS = ["uniform", "normal", "constant"]
+
+INVALID_VALUES = [None, "NaN", "", "not a number"]
+
+# (minimum, maximum, is integer) of each Sonar metric
+METRICS_RANGES = {
+    "files": (1, 50, True),
+    "functions": (0, 200, True),
+    "complexity": (0, 500, True),
+    "comment_lines_density": (0, 100, False),
+    "duplicated_lines_density": (0, 100, False),
+    "coverage": (0, 100, False),
+    "ncloc": (1, 5000, True),
+    "tests": (0, 300, True),
+    "test_errors": (0, 10, True),
+    "test_failures": (0, 10, True),
+    "test_execution_time": (0, 60000, True),
+    "security_rating": (1, 5, False),
+}
+
+# Multiples of 1/64 are exact in floating point, so the weights of a level
+# always add up to exactly 100
+WEIGHT_UNITS = 64
+
+
+def split_weights(count):
+    total_units = 100 * WEIGHT_UNITS
+
+    if not 0 < count <= total_units:
+        raise exceptions.InvalidWeight(
+            f"It is not possible to split the weights of {count} items"
+        )
+
+    units, remainder = divmod(total_units, count)
+
+    return [(units + (index < remainder)) / WEIGHT_UNITS for index in range(count)]
+
+
+def metric_value(rng, metric, distribution):
+    minimum, maximum, is_integer = METRICS_RANGES[metric]
+
+    if distribution == "constant":
+        value = minimum
+    elif distribution == "normal":
+        mean = (minimum + maximum) / 2
+        value = min(maximum, max(minimum, rng.gauss(mean, (maximum - minimum) / 6)))
+    else:
+        value = rng.uniform(minimum, maximum)
+
+    if is_integer:
+        return str(int(round(value)))
+
+    return str(round(value, 1))
+
+
+def sonar_component(rng, project, index, language, distribution, invalid_rate):
+    if index % 10 == 0:
+        qualifier, path = "DIR", f"src/module_{index // 10}"
+    elif index % 5 == 0:
+        qualifier, path = "UTS", f"tests/module_{index // 10}/test_{index}.{language}"
+    else:
+        qualifier, path = "FIL", f"src/module_{index // 10}/file_{index}.{language}"
+
+    measures = []
+
+    for metric in METRICS_SONAR:
+        if invalid_rate and rng.random() < invalid_rate:
+            value = rng.choice(INVALID_VALUES)
+        else:
+            value = metric_value(rng, metric, distribution)
+
+        measures.append({"metric": metric, "value": value, "bestValue": False})
+
+    component = {
+        "id": f"{project}-{index}",
+        "key": f"{project}:{path}",
+        "name": path.split("/")[-1],
+        "qualifier": qualifier,
+        "path": path,
+        "measures": measures,
+    }
+
+    if qualifier != "DIR":
+        component["language"] = language
+
+    return component
+
+
+def generate_sonar_file(
+    output_path,
+    components_count,
+    distribution="uniform",
+    invalid_rate=0.0,
+    language="py",
+    project="project",
+    seed=None,
+):
+    """
+    Writes a Sonar component_tree JSON file one component at a time, so the
+    size of the generated file is not limited by the available memory.
+    """
+
+    rng = random.Random(seed)
+
+    header = {
+        "paging": {
+            "pageIndex": 1,
+            "pageSize": components_count,
+            "total": components_count,
+        },
+        "baseComponent": {
+            "id": project,
+            "key": project,
+            "name": project,
+            "qualifier": "TRK",
+            "measures": [],
+        },
+    }
+
+    with open(output_path, "w") as file:
+        file.write(json.dumps(header)[:-1])
+        file.write(', "components": [')
+
+        for index in range(components_count):
+            if index > 0:
+                file.write(", ")
+
+            file.write(
+                json.dumps(
+                    sonar_component(
+                        rng, project, index, language, distribution, invalid_rate
+                    )
+                )
+            )
+
+        file.write("]}")
+
+
+def level_names(breadth):
+    for c in range(breadth[0]):
+        characteristic = f"characteristic_{c}"
+        subcharacteristics = [f"subcharacteristic_{c}_{s}" for s in range(breadth[1])]
+        measures = {
+            subcharacteristic: [f"measure_{c}_{s}_{m}" for m in range(breadth[2])]
+            for s, subcharacteristic in enumerate(subcharacteristics)
+        }
+
+        yield characteristic, subcharacteristics, measures
+
+
+def generate_pre_config_file(output_path, breadth, name="generated-pre-config"):
+    """
+    Writes a valid pre configuration with breadth[0] characteristics, each one
+    with breadth[1] subcharacteristics with breadth[2] measures.
+    """
+
+    weights = [split_weights(count) for count in breadth]
+
+    with open(output_path, "w") as file:
+        file.write(f'{{"pre_config_name": {json.dumps(name)}, "characteristics": [')
+
+        for c, (characteristic, subcharacteristics, measures) in enumerate(
+            level_names(breadth)
+        ):
+            subcharacteristics_data = [
+                {
+                    "name": subcharacteristic,
+                    "weight": weights[1][s],
+                    "measures": [
+                        {"name": measure, "weight": weights[2][m]}
+                        for m, measure in enumerate(measures[subcharacteristic])
+                    ],
+                }
+                for s, subcharacteristic in enumerate(subcharacteristics)
+            ]
+
+            if c > 0:
+                file.write(", ")
+
+            file.write(
+                json.dumps(
+                    {
+                        "name": characteristic,
+                        "weight": weights[0][c],
+                        "subcharacteristics": subcharacteristics_data,
+                    }
+                )
+            )
+
+        file.write("]}")
+
+
+def write_json_object_items(file, items):
+    file.write("{")
+
+    for index, (key, value) in enumerate(items):
+        if index > 0:
+            file.write(", ")
+
+        file.write(f"{json.dumps(key)}: {json.dumps(value)}")
+
+    file.write("}")
+
+
+def generate_available_file(output_path, breadth):
+    """
+    Writes the available-pre-configs catalog matching the pre configurations
+    generated with the same breadth.
+    """
+
+    def characteristics():
+        for characteristic, subcharacteristics, _ in level_names(breadth):
+            yield characteristic, {
+                "name": characteristic,
+                "subcharacteristics": subcharacteristics,
+            }
+
+    def subcharacteristics():
+        for characteristic, _, measures in level_names(breadth):
+            for subcharacteristic, subcharacteristic_measures in measures.items():
+                yield subcharacteristic, {
+                    "name": subcharacteristic,
+                    "measures": subcharacteristic_measures,
+                    "characteristics": [characteristic],
+                }
+
+    def measures():
+        for characteristic, _, measures in level_names(breadth):
+            for subcharacteristic, subcharacteristic_measures in measures.items():
+                for measure in subcharacteristic_measures:
+                    metric = sum(map(ord, measure)) % len(METRICS_SONAR)
+
+                    yield measure, {
+                        "name": measure,
+                        "subcharacteristics": [subcharacteristic],
+                        "characteristics": [characteristic],
+                        "metrics": [METRICS_SONAR[metric]],
+                    }
+
+    with open(output_path, "w") as file:
+        file.write('{"characteristics": ')
+        write_json_object_items(file, characteristics())
+        file.write(', "subcharacteristics": ')
+        write_json_object_items(file, subcharacteristics())
+        file.write(', "measures": ')
+        write_json_object_items(file, measures())
+        file.write("}")
+
+
+def parse_generate_sonar(
+    output_path, components_count, distribution, invalid_rate, language, seed
+):
+    generate_sonar_file(
+        output_path,
+        components_count,
+        distribution,
+        invalid_rate,
+        language,
+        seed=seed,
+    )
+
+    print(f"Generated Sonar file saved to {output_path}")
+
+
+def parse_generate_pre_config(output_path, breadth, available_output_path):
+    try:
+        generate_pre_config_file(output_path, breadth)
+
+        if available_output_path:
+            generate_available_file(available_output_path, breadth)
+    except exceptions.MeasureSoftGramCLIException as error:
+        print("Error: ", error)
+        return
+
+    print(f"Generated pre configuration saved to {output_path}")
@@ -0,0 +1,212 @@
+"""
+Local history of analysis results.
+
+Every successful analysis answered by the service, not by the cache, is stored
+in a SQLite database in the data dir, one row per pre config, time and name,
+where the name is "sqc" or a characteristic. The indexes cover the lookups of
+the history command by pre config, by characteristic and by time alone, so a
+time range is answered from the index without reading the other rows.
+"""
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from src.cli import profiling
+from src.cli.formatters import write_rows
+from src.cli.utils import get_data_dir, pretty_date_str
+
+DATABASE_FILE_NAME = "history.sqlite3"
+
+SQC = "sqc"
+
+HISTORY_FIELDNAMES = ["pre_config_id", "analysed_at", "name", "value"]
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        pre_config_id TEXT NOT NULL,
+        analysed_at INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        value REAL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS results_by_pre_config
+    ON results (pre_config_id, name, analysed_at, value)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS results_by_name
+    ON results (name, analysed_at, pre_config_id, value)
+    """,
+    "CREATE INDEX IF NOT EXISTS results_by_time ON results (analysed_at)",
+]
+
+history_lock = threading.Lock()
+
+
+def connect():
+    connection = sqlite3.connect(get_data_dir() / DATABASE_FILE_NAME, timeout=10)
+
+    for statement in SCHEMA:
+        connection.execute(statement)
+
+    return connection
+
+
+def result_rows(pre_config_id, response_json, analysed_at):
+    result_values = response_json["analysis"]
+
+    rows = [(pre_config_id, analysed_at, SQC, result_values["sqc"]["sqc"])]
+    rows.extend(
+        (pre_config_id, analysed_at, characteristic, value)
+        for characteristic, value in result_values["characteristics"].items()
+    )
+
+    return rows
+
+
+def record_analysis(pre_config_id, response_json, analysed_at=None):
+    """Stores the SQC and characteristics of an analysis, warning on failure"""
+
+    if analysed_at is None:
+        analysed_at = int(time.time() * 1000)
+
+    try:
+        rows = result_rows(pre_config_id, response_json, analysed_at)
+
+        with history_lock, profiling.phase("history"):
+            connection = connect()
+
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO results VALUES (?, ?, ?, ?)", rows
+                    )
+            finally:
+                connection.close()
+    except (sqlite3.Error, OSError, KeyError, TypeError) as error:
+        print(f"Warning: the analysis was not saved in the history: {error}", file=sys.stderr)
+
+
+def parse_time(value, end_of_day=False):
+    """
+    Milliseconds since the epoch of an ISO date, local time when naive. A date
+    without a time is its first millisecond, or its last with end_of_day.
+    """
+
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+    if end_of_day:
+        return parse_time((day + timedelta(days=1)).isoformat()) - 1
+
+    return int(datetime(day.year, day.month, day.day).timestamp() * 1000)
+
+
+def history_query(ids, characteristics, since, until):
+    conditions = ["analysed_at BETWEEN ? AND ?"]
+    parameters = [since, until]
+
+    if ids:
+        conditions.append(f"pre_config_id IN ({', '.join('?' * len(ids))})")
+        parameters.extend(ids)
+
+    if characteristics:
+        names = [SQC, *characteristics]
+        conditions.append(f"name IN ({', '.join('?' * len(names))})")
+        parameters.extend(names)
+
+    query = (
+        "SELECT pre_config_id, analysed_at, name, value FROM results WHERE "
+        + " AND ".join(conditions)
+        + " ORDER BY pre_config_id, analysed_at, name"
+    )
+
+    return query, parameters
+
+
+def query_history(ids=None, characteristics=None, since=None, until=None):
+    """Rows of the history in the time range, in milliseconds since the epoch"""
+
+    query, parameters = history_query(
+        ids,
+        characteristics,
+        0 if since is None else since,
+        sys.maxsize if until is None else until,
+    )
+
+    connection = connect()
+
+    try:
+        return connection.execute(query, parameters).fetchall()
+    finally:
+        connection.close()
+
+
+def iso_time(analysed_at):
+    return datetime.fromtimestamp(analysed_at / 1000, tz=timezone.utc).isoformat()
+
+
+def print_history(rows):
+    """One line per analysis, with the SQC and characteristics as columns"""
+
+    names = sorted({name for _, _, name, _ in rows if name != SQC})
+    analyses = {}
+
+    for pre_config_id, analysed_at, name, value in rows:
+        analyses.setdefault((pre_config_id, analysed_at), {})[name] = value
+
+    row_format = "{:<30} {:<20} {:<10}" + " {:<18}" * len(names)
+
+    print(row_format.format("ID", "Date", "SQC", *names))
+
+    for (pre_config_id, analysed_at), values in analyses.items():
+        print(
+            row_format.format(
+                pre_config_id,
+                pretty_date_str(iso_time(analysed_at)),
+                *[
+                    "-" if values.get(name) is None else "{:.4f}".format(values[name])
+                    for name in [SQC, *names]
+                ],
+            )
+        )
+
+
+def parse_history(
+    ids=None, characteristics=None, since=None, until=None, output_format="text"
+):
+    try:
+        since = None if since is None else parse_time(since)
+        until = None if until is None else parse_time(until, end_of_day=True)
+    except ValueError as error:
+        print(f"Error: invalid date. {error}")
+        return
+
+    with profiling.phase("history_query"):
+        rows = query_history(ids, characteristics, since, until)
+
+    if len(rows) == 0:
+        print("There are no analyses in the history for this query")
+        return
+
+    if output_format == "text":
+        print_history(rows)
+        return
+
+    write_rows(
+        (
+            {
+                "pre_config_id": pre_config_id,
+                "analysed_at": iso_time(analysed_at),
+                "name": name,
+                "value": value,
+            }
+            for pre_config_id, analysed_at, name, value in rows
+        ),
+        output_format,
+        HISTORY_FIELDNAMES,
+    )
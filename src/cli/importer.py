@@ -0,0 +1,385 @@
+import hashlib
+import json
+import math
+import sys
+import requests
+from src.cli import client, profiling
+from src.cli.cache import record_import
+from src.cli.checkpoint import (
+    new_checkpoint,
+    load_checkpoint,
+    save_checkpoint,
+    remove_checkpoint,
+)
+from src.cli.exceptions import (
+    MeasureSoftGramCLIException,
+    Cancelled,
+    MissingMetrics,
+    ServiceUnavailable,
+)
+from src.cli.jsonReader import (
+    file_reader,
+    iter_valid_components,
+    validate_metrics_post,
+)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+JSON_CONTENT_TYPE = {"Content-Type": "application/json"}
+
+STREAM_FRAMINGS = ["json", "ndjson"]
+
+STREAM_CONTENT_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Fields of each component used by the service, the others are not uploaded
+COMPONENT_FIELDS = ["key", "name", "qualifier", "path", "language"]
+
+
+def fetch_required_metrics(id):
+    """Metrics needed by the measures of the pre config, resolved by the catalog"""
+
+    response = client.get(f"pre-configs/{id}")
+
+    if response.status_code == 429 or response.status_code >= 500:
+        raise ServiceUnavailable(
+            f"The service failed to return the pre config: HTTP {response.status_code}"
+        )
+
+    if not 200 <= response.status_code <= 299:
+        raise MeasureSoftGramCLIException(response.json()["error"])
+
+    measures = response.json()["measures"]
+    available = client.get("available-pre-configs").json()
+
+    return {
+        metric
+        for measure in measures
+        for metric in available["measures"][measure]["metrics"]
+    }
+
+
+def project_component(component, required_metrics):
+    """Keeps only the required metrics and the fields used by the service"""
+
+    projected = {
+        field: component[field] for field in COMPONENT_FIELDS if field in component
+    }
+    projected["measures"] = [
+        {"metric": measure["metric"], "value": measure["value"]}
+        for measure in component["measures"]
+        if measure["metric"] in required_metrics
+    ]
+
+    return projected
+
+
+def check_missing_metrics(required_metrics, found_metrics):
+    missing_metrics = required_metrics - found_metrics
+
+    if missing_metrics:
+        raise MissingMetrics(
+            "The metrics in this file are not the expected in the pre config. "
+            + f"Missing metrics: {', '.join(sorted(missing_metrics))}"
+        )
+
+
+def project_components(components, required_metrics):
+    projected = [project_component(c, required_metrics) for c in components]
+
+    check_missing_metrics(
+        required_metrics,
+        {measure["metric"] for c in projected for measure in c["measures"]},
+    )
+
+    return projected
+
+
+def stream_body(id, language_extension, components, framing="json"):
+    """
+    Request body of an import, built from the components as they are read
+    and yielded in pieces of about STREAM_CHUNK_SIZE bytes
+    """
+
+    header = {"pre_config_id": id, "language_extension": language_extension}
+
+    if framing == "ndjson":
+        opening, separator, closing = json.dumps(header) + "\n", "\n", "\n"
+    else:
+        opening = json.dumps(header)[:-1] + ', "components": ['
+        separator, closing = ", ", "]}"
+
+    pieces, size = [opening], len(opening)
+
+    for index, component in enumerate(components):
+        piece = (separator if index else "") + json.dumps(component)
+        pieces.append(piece)
+        size += len(piece)
+
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(pieces).encode("utf-8")
+            pieces, size = [], 0
+
+    pieces.append(closing)
+
+    yield "".join(pieces).encode("utf-8")
+
+
+def stream_import(
+    file_path,
+    id,
+    language_extension,
+    framing="json",
+    all_metrics=False,
+    component_filter=None,
+):
+    """
+    Uploads the components straight from the file in a chunked request. The
+    file is validated in a first pass, so nothing is sent when it is invalid.
+    """
+
+    absolute_path = r"{}".format(file_path)
+
+    try:
+        found_metrics = set()
+
+        with profiling.phase("validate_stream"):
+            for component in iter_valid_components(absolute_path, component_filter):
+                found_metrics.update(m["metric"] for m in component["measures"])
+
+        required_metrics = None if all_metrics else fetch_required_metrics(id)
+
+        if required_metrics is not None:
+            check_missing_metrics(required_metrics, found_metrics)
+    except MeasureSoftGramCLIException as error:
+        print("Error: ", error)
+        return
+
+    def body():
+        components = iter_valid_components(absolute_path, component_filter)
+
+        if required_metrics is not None:
+            components = (project_component(c, required_metrics) for c in components)
+
+        return stream_body(id, language_extension, components, framing)
+
+    response = client.post(
+        "import-metrics",
+        data=body,
+        headers={"Content-Type": STREAM_CONTENT_TYPES[framing]},
+    )
+
+    validate_metrics_post(response.status_code, json.loads(response.text))
+
+    if 200 <= response.status_code <= 299:
+        record_import(id, file_path)
+
+
+def read_components(file_path, id, all_metrics=False, component_filter=None):
+    components = file_reader(r"{}".format(file_path), component_filter)
+
+    if not all_metrics:
+        required_metrics = fetch_required_metrics(id)
+
+        with profiling.phase("project_metrics"):
+            components = project_components(components, required_metrics)
+
+    return components
+
+
+def upload_components(file_path, id, language_extension, components):
+    payload = {
+        "pre_config_id": id,
+        "components": components,
+        "language_extension": language_extension,
+    }
+
+    with profiling.phase("json_encode"):
+        body = json.dumps(payload).encode("utf-8")
+
+    response = client.post("import-metrics", data=body, headers=JSON_CONTENT_TYPE)
+    response_data = json.loads(response.text)
+
+    if 200 <= response.status_code <= 299:
+        record_import(id, file_path)
+
+    return response.status_code, response_data
+
+
+def import_file(
+    file_path, id, language_extension, all_metrics=False, component_filter=None
+):
+    """Imports a metrics file without printing, for commands importing many"""
+
+    components = read_components(file_path, id, all_metrics, component_filter)
+
+    return upload_components(file_path, id, language_extension, components)
+
+
+def parse_import(
+    file_path,
+    id,
+    language_extension,
+    resume=False,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    all_metrics=False,
+    component_filter=None,
+    framing=None,
+):
+    if framing is not None:
+        stream_import(
+            file_path, id, language_extension, framing, all_metrics, component_filter
+        )
+        return
+
+    try:
+        components = read_components(file_path, id, all_metrics, component_filter)
+    except MeasureSoftGramCLIException as error:
+        print("Error: ", error)
+        return
+
+    if resume:
+        if supports_chunked_imports():
+            upload_chunks(file_path, id, language_extension, components, chunk_size)
+            return
+
+        print("The service does not support resumable imports, uploading the file at once")
+
+    status_code, response_data = upload_components(
+        file_path, id, language_extension, components
+    )
+
+    validate_metrics_post(status_code, response_data)
+
+
+def supports_chunked_imports():
+    """
+    Whether the service advertises chunked imports. A service without them
+    would save the first chunk as a complete import, so anything other than
+    a confirmation counts as no support.
+    """
+
+    try:
+        response = client.options("import-metrics")
+        response_data = response.json()
+    except (requests.exceptions.RequestException, ValueError):
+        return False
+
+    return (
+        200 <= response.status_code <= 299
+        and isinstance(response_data, dict)
+        and response_data.get("chunked_imports") is True
+    )
+
+
+def send_chunk(checkpoint, components, language_extension):
+    index = checkpoint["acknowledged"]
+    chunk_size = checkpoint["chunk_size"]
+
+    payload = {
+        "pre_config_id": checkpoint["pre_config_id"],
+        "components": components[index * chunk_size:(index + 1) * chunk_size],
+        "language_extension": language_extension,
+        "chunk": {
+            "upload_id": checkpoint["upload_id"],
+            "index": index,
+            "total": checkpoint["total"],
+        },
+    }
+
+    with profiling.phase("json_encode"):
+        body = json.dumps(payload).encode("utf-8")
+
+    # The service keeps chunks by index, so sending one again is harmless
+    return client.post(
+        "import-metrics", idempotent=True, data=body, headers=JSON_CONTENT_TYPE
+    )
+
+
+def components_sha256(components, language_extension):
+    """Digest of what a resumable import uploads, the key of its checkpoint"""
+
+    digest = hashlib.sha256(language_extension.encode("utf-8"))
+
+    for component in components:
+        digest.update(json.dumps(component, sort_keys=True).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def upload_chunks(file_path, id, language_extension, components, chunk_size):
+    """
+    Uploads the components in chunks, starting at the first chunk not
+    acknowledged by a previous run of the same import
+    """
+
+    components_hash = components_sha256(components, language_extension)
+    checkpoint = load_checkpoint(components_hash, id)
+
+    if checkpoint is None:
+        total = math.ceil(len(components) / chunk_size)
+        checkpoint = new_checkpoint(components_hash, id, chunk_size, total)
+    else:
+        print(
+            f"Resuming the import at chunk {checkpoint['acknowledged'] + 1}"
+            + f" of {checkpoint['total']}"
+        )
+
+    while True:
+        index = checkpoint["acknowledged"]
+
+        try:
+            response = send_chunk(checkpoint, components, language_extension)
+        except Cancelled:
+            print(f"\nThe import was cancelled at chunk {index + 1}")
+            print("Run the same command with --resume to continue it")
+            raise
+        except requests.exceptions.RequestException as error:
+            print(f"\nError: the import stopped at chunk {index + 1}: {error}")
+            print("Run the same command with --resume to continue it")
+            return
+
+        response_data = json.loads(response.text)
+
+        if response.status_code == 202:
+            checkpoint["acknowledged"] = index + 1
+            save_checkpoint(checkpoint)
+            print(f"[{index + 1}/{checkpoint['total']}] chunk uploaded", file=sys.stderr)
+            continue
+
+        if response.status_code == 404 and "chunk" in response_data and index > 0:
+            print("The service discarded the uploaded chunks, starting over")
+            remove_checkpoint(checkpoint)
+            total = math.ceil(len(components) / chunk_size)
+            checkpoint = new_checkpoint(components_hash, id, chunk_size, total)
+            continue
+
+        # A service without chunked imports saves the chunk as the whole import
+        if 200 <= response.status_code <= 299 and index < checkpoint["total"] - 1:
+            remove_checkpoint(checkpoint)
+            print(
+                "\nError: the service does not support resumable imports, it saved"
+                + f" chunk {index + 1} of {checkpoint['total']} as a complete import"
+            )
+            print("Run the import again without --resume")
+            return
+
+        break
+
+    finish_chunks(file_path, id, checkpoint, response, response_data)
+
+
+def finish_chunks(file_path, id, checkpoint, response, response_data):
+    """Reports the response ending a resumable import, keeping the checkpoint of a retryable one"""
+
+    if response.status_code == 429 or response.status_code >= 500:
+        print(f"\nError: the import stopped at chunk {checkpoint['acknowledged'] + 1}")
+        print("Run the same command with --resume to continue it")
+        return
+
+    remove_checkpoint(checkpoint)
+    validate_metrics_post(response.status_code, response_data)
+
+    if 200 <= response.status_code <= 299:
+        record_import(id, file_path)
@@ -1,7 +1,26 @@
-from src.cli import exceptions
+from src.cli import exceptions, profiling
+from src.cli.snapshot import is_snapshot, load_snapshot
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
 import json
 import math
-
+import re
+
+
+METRICS_SONAR = [
+    "files",
+    "functions",
+    "complexity",
+    "comment_lines_density",
+    "duplicated_lines_density",
+    "coverage",
+    "ncloc",
+    "tests",
+    "test_errors",
+    "test_failures",
+    "test_execution_time",
+    "security_rating",
+]
 
 REQUIRED_SONAR_JSON_KEYS = ["paging", "baseComponent", "components"]
 
@@ -13,23 +32,61 @@ REQUIRED_SONAR_BASE_COMPONENT_KEYS = [
     "measures",
 ]
 
+READ_SIZE = 1024 * 1024
+
+# Largest single JSON value read by iter_components, protects the memory
+# when a file is truncated or malformed
+MAX_VALUE_SIZE = 64 * 1024 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def file_reader(absolute_path, component_filter=None):
+    if is_snapshot(absolute_path):
+        return snapshot_reader(absolute_path, component_filter)
 
-def file_reader(absolute_path):
     check_file_extension(absolute_path)
 
-    json_data = open_json_file(absolute_path)
+    with profiling.phase("open_json_file"):
+        if component_filter is None:
+            json_data = open_json_file(absolute_path)
+        else:
+            json_data = open_filtered_json_file(absolute_path, component_filter)
 
-    check_sonar_format(json_data)
+    with profiling.phase("check_sonar_format"):
+        check_sonar_format(json_data)
 
-    check_metrics_values(json_data)
+    with profiling.phase("check_metrics_values"):
+        check_metrics_values(json_data)
 
     return json_data["components"]
 
 
-def open_json_file(absolute_path):
+def snapshot_reader(absolute_path, component_filter=None):
+    """file_reader for the snapshots written by the convert command"""
+
+    json_data, values_valid = load_snapshot(absolute_path)
+
+    if component_filter is not None:
+        json_data["components"] = [
+            component for component in json_data["components"] if component_filter(component)
+        ]
+
+    with profiling.phase("check_sonar_format"):
+        check_sonar_format(json_data)
+
+    # The number column settles the common case without a pass over the values
+    if not values_valid:
+        with profiling.phase("check_metrics_values"):
+            check_metrics_values(json_data)
+
+    return json_data["components"]
+
+
+@contextmanager
+def json_file_errors():
     try:
-        with open(absolute_path, "r") as file:
-            return json.load(file)
+        yield
     except FileNotFoundError:
         raise exceptions.FileNotFound("The file was not found")
     except OSError as error:
@@ -40,6 +97,206 @@ def open_json_file(absolute_path):
         )
 
 
+def open_json_file(absolute_path):
+    with json_file_errors():
+        with open(absolute_path, "r") as file:
+            return json.load(file)
+
+
+def open_filtered_json_file(absolute_path, component_filter):
+    """
+    Reads a Sonar JSON file keeping only the components accepted by the
+    filter, the others are dropped as soon as they are parsed
+    """
+
+    json_data = {}
+
+    with json_file_errors():
+        components = [
+            component
+            for component in iter_components(absolute_path, json_data)
+            if component_filter(component)
+        ]
+
+    if "components" in json_data:
+        json_data["components"] = components
+
+    return json_data
+
+
+class JsonStream:
+    """Reads JSON tokens and values from a file without loading all of it"""
+
+    def __init__(self, file):
+        self.file = file
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+
+    def fill(self):
+        data = self.file.read(READ_SIZE)
+        self.buffer = self.buffer[self.position:] + data
+        self.position = 0
+
+        return len(data) > 0
+
+    def next_char(self):
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+
+            if not self.fill():
+                return None
+
+    def expect(self, chars):
+        char = self.next_char()
+
+        if char is None or char not in chars:
+            raise json.JSONDecodeError(
+                f"Expecting one of {chars!r}", self.buffer, self.position
+            )
+
+        self.position += 1
+
+        return char
+
+    def value(self):
+        self.next_char()
+
+        # Values ending at the end of the buffer may be truncated, like
+        # numbers, so they are decoded again with more data
+        while True:
+            try:
+                result, end = self.decoder.raw_decode(self.buffer, self.position)
+
+                if end < len(self.buffer):
+                    self.position = end
+                    return result
+            except json.JSONDecodeError:
+                if len(self.buffer) - self.position > MAX_VALUE_SIZE:
+                    raise
+
+            if not self.fill():
+                result, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return result
+
+    def items(self, close):
+        """Yields nothing for an empty object or list, else once per item"""
+
+        if self.next_char() == close:
+            self.position += 1
+            return
+
+        while True:
+            yield
+
+            if self.expect("," + close) == close:
+                return
+
+
+def iter_components(absolute_path, header):
+    """
+    Streams the items of the "components" list of a Sonar JSON file, one at
+    a time. The other top level keys are stored in header.
+    """
+
+    with open(absolute_path, "r") as file:
+        stream = JsonStream(file)
+        stream.expect("{")
+
+        for _ in stream.items("}"):
+            key = stream.value()
+            stream.expect(":")
+
+            if key != "components":
+                header[key] = stream.value()
+                continue
+
+            header[key] = None
+            stream.expect("[")
+
+            for _ in stream.items("]"):
+                yield stream.value()
+
+        if stream.next_char() is not None:
+            raise json.JSONDecodeError("Extra data", stream.buffer, stream.position)
+
+
+def iter_valid_components(absolute_path, component_filter=None):
+    """
+    Streams the components accepted by the filter, running the checks of
+    file_reader on the fly, without loading the whole file
+    """
+
+    check_file_extension(absolute_path)
+
+    header = {}
+    count = 0
+
+    with json_file_errors():
+        for component in iter_components(absolute_path, header):
+            if component_filter is not None and not component_filter(component):
+                continue
+
+            check_metrics_values({"components": [component]})
+            count += 1
+
+            yield component
+
+    check_sonar_keys(header)
+
+    if count == 0:
+        raise exceptions.InvalidMetricsJsonFile(
+            "Invalid Sonar JSON components value. It must have at least one component"
+        )
+
+
+def build_component_filter(
+    include_qualifiers=None,
+    exclude_qualifiers=None,
+    languages=None,
+    include_paths=None,
+    exclude_paths=None,
+):
+    """
+    Predicate of the components to import, None when every component is.
+    Path patterns are globs, or regular expressions when prefixed by "re:".
+    """
+
+    options = [include_qualifiers, exclude_qualifiers, languages, include_paths, exclude_paths]
+
+    if not any(options):
+        return None
+
+    include_paths = [path_matcher(pattern) for pattern in include_paths or []]
+    exclude_paths = [path_matcher(pattern) for pattern in exclude_paths or []]
+
+    def component_filter(component):
+        qualifier = component.get("qualifier")
+        path = component.get("path", "")
+
+        return (
+            (not include_qualifiers or qualifier in include_qualifiers)
+            and qualifier not in (exclude_qualifiers or [])
+            and (not languages or component.get("language") in languages)
+            and (not include_paths or any(match(path) for match in include_paths))
+            and not any(match(path) for match in exclude_paths)
+        )
+
+    return component_filter
+
+
+def path_matcher(pattern):
+    if pattern.startswith("re:"):
+        return re.compile(pattern[3:]).search
+
+    return lambda path: fnmatchcase(path, pattern)
+
+
 def get_missing_keys_str(attrs, required_attrs):
     missing_keys = []
 
@@ -50,7 +307,7 @@ def get_missing_keys_str(attrs, required_attrs):
     return ", ".join(missing_keys)
 
 
-def check_sonar_format(json_data):
+def check_sonar_keys(json_data):
     attributes = list(json_data.keys())
     missing_keys = get_missing_keys_str(attributes, REQUIRED_SONAR_JSON_KEYS)
 
@@ -70,6 +327,10 @@ def check_sonar_format(json_data):
             f"Invalid Sonar baseComponent keys. Missing keys are: {missing_keys}"
         )
 
+
+def check_sonar_format(json_data):
+    check_sonar_keys(json_data)
+
     if len(json_data["components"]) == 0:
         raise exceptions.InvalidMetricsJsonFile(
             "Invalid Sonar JSON components value. It must have at least one component"
@@ -1,14 +1,26 @@
-import requests
+from src.cli import client, mirror, profiling
 from src.cli.utils import pretty_date_str
+from src.cli.formatters import render, write_output
 
-BASE_URL = "http://localhost:5000/"
+LIST_FIELDNAMES = ["_id", "name", "created_at"]
 
 
-def parse_list():
-    response = requests.get(
-        BASE_URL + "/pre-configs",
-        headers={"Accept": "application/json"},
-    )
+def parse_list(output_format="text", online=False):
+    synced_at = None if online else mirror.synced_at()
+    pre_configs = None
+
+    if synced_at is not None:
+        with profiling.phase("mirror_read"):
+            pre_configs = mirror.list_pre_configs(with_documents=output_format == "json")
+
+    if pre_configs is not None:
+        mirror.print_mirror_notice(synced_at)
+
+        with profiling.phase("render"):
+            print_pre_configs(pre_configs, output_format)
+        return
+
+    response = client.get("pre-configs")
 
     pre_configs = response.json()
 
@@ -16,6 +28,19 @@ def parse_list():
         print("Error: an error occurred while fetching your pre configurations")
         return
 
+    with profiling.phase("render"):
+        print_pre_configs(pre_configs, output_format)
+
+
+def print_pre_configs(pre_configs, output_format):
+    if output_format != "text":
+        rows = [
+            {key: pre_config.get(key) for key in LIST_FIELDNAMES}
+            for pre_config in pre_configs
+        ]
+        write_output(render(rows, output_format, LIST_FIELDNAMES, document=pre_configs))
+        return
+
     print(
         "{:<30} {:<35} {:<30} {:<10}".format("ID", "Name", "Created at", "Metrics file")
     )
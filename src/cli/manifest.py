@@ -0,0 +1,241 @@
+"""
+Imports driven by a manifest of repositories and releases.
+
+Each entry has the pre config ID and language extension of an import and
+either a Sonar JSON file or the repository and release to fetch from
+SonarCloud. Entries run concurrently and the ones that succeed are recorded in
+a state file, so running the same manifest again only retries the others.
+"""
+import hashlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import requests
+from src.cli import exceptions, profiling
+from src.cli.importer import import_file
+from src.cli.sonar import fetch_sonar_file, DEFAULT_OUTPUT_DIR
+from src.cli.utils import get_data_dir, write_json_atomic
+
+DEFAULT_WORKERS = 4
+
+REQUIRED_ENTRY_KEYS = ["pre_config_id", "language_extension"]
+
+state_lock = threading.Lock()
+
+
+def load_yaml(file):
+    try:
+        import yaml
+    except ImportError:
+        raise exceptions.InvalidManifest(
+            "PyYAML is required to read YAML manifests, install it or use JSON"
+        )
+
+    try:
+        return yaml.safe_load(file)
+    except yaml.YAMLError as error:
+        raise exceptions.InvalidManifest(f"Failed to decode the YAML file. {error}")
+
+
+def load_manifest(manifest_path):
+    manifest_path = Path(manifest_path)
+
+    try:
+        with open(manifest_path, "r") as file:
+            if manifest_path.suffix in (".yml", ".yaml"):
+                data = load_yaml(file)
+            else:
+                data = json.load(file)
+    except FileNotFoundError:
+        raise exceptions.FileNotFound("The file was not found")
+    except OSError as error:
+        raise exceptions.UnableToOpenFile(f"Failed to open the file. {error}")
+    except json.JSONDecodeError as error:
+        raise exceptions.InvalidManifest(f"Failed to decode the JSON file. {error}")
+
+    entries = data.get("entries") if isinstance(data, dict) else data
+
+    if not isinstance(entries, list):
+        raise exceptions.InvalidManifest(
+            'The manifest must be a list of entries or have an "entries" list'
+        )
+
+    for index, entry in enumerate(entries, start=1):
+        check_entry(index, entry)
+
+        if "file" in entry:
+            entry["file"] = str(manifest_path.absolute().parent / entry["file"])
+
+    return entries
+
+
+def check_entry(index, entry):
+    if not isinstance(entry, dict):
+        raise exceptions.InvalidManifest(f"Entry {index} must be an object")
+
+    missing_keys = [key for key in REQUIRED_ENTRY_KEYS if key not in entry]
+
+    if "file" not in entry and not ("repo" in entry and "release" in entry):
+        missing_keys.append('"file" or "repo" and "release"')
+
+    if missing_keys:
+        raise exceptions.InvalidManifest(
+            f"Entry {index} is missing the keys: {', '.join(missing_keys)}"
+        )
+
+
+def entry_name(entry):
+    if "name" in entry:
+        return entry["name"]
+
+    if "file" in entry:
+        return Path(entry["file"]).name
+
+    return f"{entry['repo']}@{entry['release']}"
+
+
+def entry_key(entry):
+    return hashlib.sha256(json.dumps(entry, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def state_path(manifest_path):
+    key = hashlib.sha256(str(Path(manifest_path).absolute()).encode("utf-8"))
+
+    return get_data_dir("manifests") / f"{key.hexdigest()}.json"
+
+
+def read_state(manifest_path):
+    try:
+        with open(state_path(manifest_path), "r") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def record_success(manifest_path, entry, result):
+    with state_lock:
+        state = read_state(manifest_path)
+        state[entry_key(entry)] = {"name": entry_name(entry), **result}
+
+        write_json_atomic(state_path(manifest_path), state)
+
+
+def run_entry(entry, output_dir=DEFAULT_OUTPUT_DIR):
+    start = time.perf_counter()
+
+    try:
+        file_path = entry.get("file")
+
+        if file_path is None:
+            with profiling.phase("sonar_fetch"):
+                file_path = fetch_sonar_file(entry["repo"], entry["release"], output_dir)
+
+        status_code, response_data = import_file(
+            file_path,
+            entry["pre_config_id"],
+            entry["language_extension"],
+            entry.get("all_metrics", False),
+        )
+
+        if 200 <= status_code <= 299:
+            status, message = "ok", ""
+        else:
+            status = "error"
+            message = "; ".join(f"{k}: {v}" for k, v in response_data.items())
+    except exceptions.Cancelled:
+        raise
+    except (
+        exceptions.MeasureSoftGramCLIException,
+        requests.exceptions.RequestException,
+    ) as error:
+        status, message = "error", str(error)
+    except ValueError as error:
+        # Such as an HTML error page of a proxy instead of a JSON body
+        status, message = "error", f"Invalid response: {error}"
+    except KeyError as error:
+        status, message = "error", f"Missing key {error} in a response"
+
+    return {
+        "status": status,
+        "message": message,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_manifest(
+    manifest_path, entries, workers=DEFAULT_WORKERS, output_dir=DEFAULT_OUTPUT_DIR, force=False
+):
+    state = {} if force else read_state(manifest_path)
+    results = {}
+    pending = []
+
+    for index, entry in enumerate(entries):
+        if state.get(entry_key(entry), {}).get("status") == "ok":
+            results[index] = {"status": "skipped", "message": "", "seconds": 0.0}
+        else:
+            pending.append(index)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(run_entry, entries[index], output_dir): index
+            for index in pending
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            results[index] = future.result()
+
+            if results[index]["status"] == "ok":
+                record_success(manifest_path, entries[index], results[index])
+
+            print(
+                f"[{done}/{len(pending)}] {entry_name(entries[index])} "
+                + results[index]["status"],
+                file=sys.stderr,
+            )
+
+    return [(entry_name(entry), results[index]) for index, entry in enumerate(entries)]
+
+
+def print_report(results):
+    row_format = "{:<40} {:<8} {:>8}  {}"
+
+    print(row_format.format("Entry", "Status", "Seconds", "Message"))
+
+    for name, result in results:
+        print(
+            row_format.format(
+                name,
+                result["status"],
+                "{:.2f}".format(result["seconds"]),
+                result["message"],
+            )
+        )
+
+    counts = {
+        status: sum(1 for _, result in results if result["status"] == status)
+        for status in ("ok", "error", "skipped")
+    }
+
+    print(
+        f"\n{counts['ok']} succeeded, {counts['error']} failed, "
+        + f"{counts['skipped']} skipped"
+    )
+
+
+def parse_batch(
+    manifest_path, workers=DEFAULT_WORKERS, output_dir=DEFAULT_OUTPUT_DIR, force=False
+):
+    try:
+        entries = load_manifest(manifest_path)
+    except exceptions.MeasureSoftGramCLIException as error:
+        print("Error: ", error)
+        return
+
+    results = run_manifest(manifest_path, entries, workers, output_dir, force)
+
+    with profiling.phase("render"):
+        print_report(results)
@@ -0,0 +1,237 @@
+"""
+Memory report of a command, written as JSON with --memory-report.
+
+Each profiling phase records its peak and net traced memory, its largest
+allocation sites and the peak RSS of the process when it ends. The sites are
+the growth by line between the tracemalloc snapshot taken when the phase
+ends and the last one taken before it started, so they also count the
+allocations made between phases. Grouping a snapshot by line goes over every
+trace in Python, so it is skipped for phases that grow the traced memory by
+less than SITES_MIN_BYTES, and the report still slows big imports down. Python 3.8 has no
+tracemalloc.reset_peak, so there the peak of a phase is the peak of the
+command so far and the report says it is not exact. Phases running in
+several threads at once share one tracemalloc, so their numbers mix.
+"""
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from src.cli.utils import write_json_atomic
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+TOP_ALLOCATIONS = 10
+
+# Smallest growth of the traced memory of a phase for its sites to be looked up
+SITES_MIN_BYTES = 1024 * 1024
+
+# Stage of the import path of the phases that belong to it
+STAGES = {
+    "open_json_file": "read",
+    "read_snapshot": "read",
+    "decode_snapshot": "read",
+    "check_sonar_format": "validate",
+    "check_metrics_values": "validate",
+    "validate_stream": "validate",
+    "project_metrics": "payload_build",
+    "json_encode": "serialize",
+    "network": "send",
+}
+
+enabled = False
+
+phases = {}
+
+# Peak of the command before the last reset_peak
+command_peak = 0
+
+# Size and count by site of the last snapshot
+last_sites = {}
+
+phases_lock = threading.Lock()
+
+local = threading.local()
+
+reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+# Allocations of the report itself. Sites are filtered once grouped, since
+# Snapshot.filter_traces is even slower than the grouping.
+IGNORED_FILES = {
+    tracemalloc.__file__,
+    __file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+}
+
+
+def max_rss_bytes():
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def fold_command_peak(peak):
+    global command_peak
+
+    with phases_lock:
+        command_peak = max(command_peak, peak)
+
+
+def snapshot_sites():
+    global last_sites
+
+    sites = {
+        (stat.traceback[0].filename, stat.traceback[0].lineno): (stat.size, stat.count)
+        for stat in tracemalloc.take_snapshot().statistics("lineno")
+    }
+
+    with phases_lock:
+        last_sites = sites
+
+    return sites
+
+
+def new_phase():
+    return {
+        "calls": 0,
+        "peak_traced_bytes": 0,
+        "net_traced_bytes": 0,
+        "max_rss_bytes": None,
+        "sites": {},
+    }
+
+
+def record_phase(name, peak, net, baseline, sites):
+    with phases_lock:
+        stats = phases.setdefault(name, new_phase())
+        stats["calls"] += 1
+        stats["peak_traced_bytes"] = max(stats["peak_traced_bytes"], peak)
+        stats["net_traced_bytes"] += net
+        stats["max_rss_bytes"] = max_rss_bytes()
+
+        for (filename, lineno), (size, count) in sites.items():
+            if filename in IGNORED_FILES:
+                continue
+
+            base_size, base_count = baseline.get((filename, lineno), (0, 0))
+
+            if size > base_size:
+                site = f"{filename}:{lineno}"
+                total_size, total_count = stats["sites"].get(site, (0, 0))
+                stats["sites"][site] = (
+                    total_size + size - base_size,
+                    total_count + count - base_count,
+                )
+
+
+@contextmanager
+def phase(name):
+    """Records the memory allocated inside the block when the report is on"""
+
+    if not enabled:
+        yield
+        return
+
+    stack = local.__dict__.setdefault("stack", [])
+    current, peak = tracemalloc.get_traced_memory()
+
+    # The peak is reset for the inner phase, so the outer one keeps its own
+    if stack:
+        stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+
+    if reset_peak is not None:
+        fold_command_peak(peak)
+        reset_peak()
+
+    with phases_lock:
+        frame = {"peak": current, "baseline": last_sites}
+
+    stack.append(frame)
+
+    try:
+        yield
+    finally:
+        stack.pop()
+        end_current, end_peak = tracemalloc.get_traced_memory()
+        frame["peak"] = max(frame["peak"], end_peak)
+
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], frame["peak"])
+
+        net = end_current - current
+        sites = snapshot_sites() if net >= SITES_MIN_BYTES else {}
+
+        record_phase(name, frame["peak"], net, frame["baseline"], sites)
+
+
+def top_sites(sites):
+    ranked = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)
+
+    return [
+        {"site": site, "size_bytes": size, "count": count}
+        for site, (size, count) in ranked[:TOP_ALLOCATIONS]
+        if size > 0
+    ]
+
+
+def to_json(total_seconds):
+    with phases_lock:
+        phase_reports = [
+            {
+                "name": name,
+                "stage": STAGES.get(name),
+                "calls": stats["calls"],
+                "peak_traced_bytes": stats["peak_traced_bytes"],
+                "net_traced_bytes": stats["net_traced_bytes"],
+                "max_rss_bytes": stats["max_rss_bytes"],
+                "top_allocations": top_sites(stats["sites"]),
+            }
+            for name, stats in phases.items()
+        ]
+
+    return {
+        "python": sys.version.split()[0],
+        "peak_exact": reset_peak is not None,
+        "total": {
+            "seconds": total_seconds,
+            "peak_traced_bytes": max(command_peak, tracemalloc.get_traced_memory()[1]),
+            "max_rss_bytes": max_rss_bytes(),
+        },
+        "phases": phase_reports,
+    }
+
+
+@contextmanager
+def collect_command(output_path):
+    """Traces the memory of the whole command and writes the report at exit"""
+
+    global enabled, command_peak, last_sites
+
+    if output_path is None:
+        yield
+        return
+
+    with phases_lock:
+        phases.clear()
+        command_peak = 0
+        last_sites = {}
+
+    start = time.perf_counter()
+    tracemalloc.start()
+    enabled = True
+
+    try:
+        yield
+    finally:
+        enabled = False
+        report = to_json(time.perf_counter() - start)
+        tracemalloc.stop()
+        write_json_atomic(output_path, report)
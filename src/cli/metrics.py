@@ -0,0 +1,199 @@
+import re
+import threading
+from contextlib import contextmanager
+from src.cli import cancellation
+from src.cli.utils import write_json_atomic
+
+METRICS_FORMATS = ["json", "prometheus"]
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+ID_IN_PATH = re.compile(r"^pre-configs/[^/]+$")
+
+enabled = False
+
+endpoints = {}
+
+endpoints_lock = threading.Lock()
+
+
+def endpoint_label(endpoint):
+    endpoint = endpoint.split("?", 1)[0].strip("/")
+
+    if ID_IN_PATH.match(endpoint):
+        return "pre-configs/{id}"
+
+    return endpoint
+
+
+def new_histogram():
+    return {"buckets": [0] * (len(LATENCY_BUCKETS) + 1), "sum": 0.0, "count": 0}
+
+
+def observe(histogram, value):
+    index = len(LATENCY_BUCKETS)
+
+    for bucket_index, upper_bound in enumerate(LATENCY_BUCKETS):
+        if value <= upper_bound:
+            index = bucket_index
+            break
+
+    histogram["buckets"][index] += 1
+    histogram["sum"] += value
+    histogram["count"] += 1
+
+
+def body_size(body):
+    if isinstance(body, bytes):
+        return len(body)
+
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+
+    return 0
+
+
+def record_request(method, endpoint, response, total_seconds, retries=0, error=None):
+    """Aggregates one request made by the client, successful or not"""
+
+    if not enabled:
+        return
+
+    if response is not None:
+        status = str(response.status_code)
+        request = getattr(response, "request", None)
+        request_bytes = body_size(getattr(request, "body", None))
+        response_bytes = len(getattr(response, "content", b"") or b"")
+        elapsed = getattr(response, "elapsed", None)
+        ttfb = elapsed.total_seconds() if elapsed is not None else None
+    else:
+        status = type(error).__name__ if error is not None else "error"
+        request_bytes = response_bytes = 0
+        ttfb = None
+
+    key = (method.upper(), endpoint_label(endpoint))
+
+    with endpoints_lock:
+        data = endpoints.setdefault(
+            key,
+            {
+                "requests": 0,
+                "status": {},
+                "retries": 0,
+                "request_bytes": 0,
+                "response_bytes": 0,
+                "total_seconds": new_histogram(),
+                "ttfb_seconds": new_histogram(),
+            },
+        )
+
+        data["requests"] += 1
+        data["status"][status] = data["status"].get(status, 0) + 1
+        data["retries"] += retries
+        data["request_bytes"] += request_bytes
+        data["response_bytes"] += response_bytes
+        observe(data["total_seconds"], total_seconds)
+
+        if ttfb is not None:
+            observe(data["ttfb_seconds"], ttfb)
+
+
+def to_json():
+    with endpoints_lock:
+        return {
+            "bucket_upper_bounds": LATENCY_BUCKETS,
+            "endpoints": [
+                {"method": method, "endpoint": endpoint, **data}
+                for (method, endpoint), data in sorted(endpoints.items())
+            ],
+        }
+
+
+def prometheus_histogram(lines, name, labels, histogram):
+    cumulative = 0
+
+    for upper_bound, count in zip(LATENCY_BUCKETS + ["+Inf"], histogram["buckets"]):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{upper_bound}"}} {cumulative}')
+
+    lines.append(f"{name}_sum{{{labels}}} {histogram['sum']}")
+    lines.append(f"{name}_count{{{labels}}} {histogram['count']}")
+
+
+def to_prometheus():
+    lines = [
+        "# TYPE measuresoftgram_http_requests_total counter",
+        "# TYPE measuresoftgram_http_retries_total counter",
+        "# TYPE measuresoftgram_http_request_bytes_total counter",
+        "# TYPE measuresoftgram_http_response_bytes_total counter",
+        "# TYPE measuresoftgram_http_request_duration_seconds histogram",
+        "# TYPE measuresoftgram_http_time_to_first_byte_seconds histogram",
+    ]
+
+    for data in to_json()["endpoints"]:
+        labels = f'method="{data["method"]}",endpoint="{data["endpoint"]}"'
+
+        for status, count in sorted(data["status"].items()):
+            lines.append(
+                f'measuresoftgram_http_requests_total{{{labels},status="{status}"}} {count}'
+            )
+
+        lines.append(f"measuresoftgram_http_retries_total{{{labels}}} {data['retries']}")
+        lines.append(
+            f"measuresoftgram_http_request_bytes_total{{{labels}}} {data['request_bytes']}"
+        )
+        lines.append(
+            f"measuresoftgram_http_response_bytes_total{{{labels}}} {data['response_bytes']}"
+        )
+        prometheus_histogram(
+            lines,
+            "measuresoftgram_http_request_duration_seconds",
+            labels,
+            data["total_seconds"],
+        )
+        prometheus_histogram(
+            lines,
+            "measuresoftgram_http_time_to_first_byte_seconds",
+            labels,
+            data["ttfb_seconds"],
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(output_path, metrics_format="json"):
+    if metrics_format == "prometheus":
+        with open(output_path, "w") as file:
+            file.write(to_prometheus())
+    else:
+        write_json_atomic(output_path, to_json())
+
+
+@contextmanager
+def collect_command(output_path, metrics_format="json"):
+    """Collects the request metrics of the whole command and writes them at exit"""
+
+    global enabled
+
+    if output_path is None:
+        yield
+        return
+
+    enabled = True
+
+    with endpoints_lock:
+        endpoints.clear()
+
+    def flush():
+        write_metrics(output_path, metrics_format)
+
+    # Written even when a cancelled command is forced to exit
+    cancellation.register_flush(flush)
+
+    try:
+        yield
+    finally:
+        enabled = False
+        cancellation.unregister_flush(flush)
+        flush()
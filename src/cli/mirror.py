@@ -0,0 +1,221 @@
+"""
+Local mirror of the pre configurations.
+
+The sync command asks the service only for the pre configurations created or
+changed since the newest "updated_at" it has seen, so the watermark comes
+from the service clock. The watermark is inclusive, and records are upserted,
+so a record changed in the same second as the last sync is not missed. A
+service that ignores the "updated_since" parameter sends every record, which
+is still correct. Deletions are only noticed by a full sync.
+
+Until the first sync, list and show keep going to the service. They also do
+when the mirror cannot be read, like when the data dir cannot be created.
+"""
+import json
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from src.cli import client, profiling
+from src.cli.utils import get_data_dir, pretty_date_str
+
+DATABASE_FILE_NAME = "mirror.sqlite3"
+
+# Errors of a data dir or database that cannot be used
+MIRROR_ERRORS = (OSError, sqlite3.Error)
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS pre_configs (
+        id TEXT PRIMARY KEY,
+        name TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        document TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS pre_configs_by_created_at ON pre_configs (created_at)",
+    "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+
+def connect():
+    connection = sqlite3.connect(get_data_dir() / DATABASE_FILE_NAME, timeout=10)
+
+    for statement in SCHEMA:
+        connection.execute(statement)
+
+    return connection
+
+
+def read_state(connection, key):
+    row = connection.execute(
+        "SELECT value FROM sync_state WHERE key = ?", (key,)
+    ).fetchone()
+
+    return None if row is None else row[0]
+
+
+def write_state(connection, key, value):
+    connection.execute(
+        "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value)
+    )
+
+
+def updated_at(pre_config):
+    return pre_config.get("updated_at") or pre_config.get("created_at")
+
+
+def upsert(connection, pre_configs):
+    connection.executemany(
+        "INSERT OR REPLACE INTO pre_configs VALUES (?, ?, ?, ?, ?)",
+        [
+            (
+                pre_config["_id"],
+                pre_config.get("name"),
+                pre_config.get("created_at"),
+                updated_at(pre_config),
+                json.dumps(pre_config),
+            )
+            for pre_config in pre_configs
+        ],
+    )
+
+
+def fetch_changed_pre_configs(since):
+    if since is None:
+        response = client.get("pre-configs")
+    else:
+        response = client.get("pre-configs", params={"updated_since": since})
+
+    if not 200 <= response.status_code <= 299:
+        return None
+
+    return response.json()
+
+
+def sync(full=False):
+    """Pulls the changed pre configurations, returns their count or None"""
+
+    connection = connect()
+
+    try:
+        since = None if full else read_state(connection, "watermark")
+        pre_configs = fetch_changed_pre_configs(since)
+
+        if pre_configs is None:
+            return None
+
+        with connection, profiling.phase("mirror_write"):
+            if full:
+                connection.execute("DELETE FROM pre_configs")
+
+            upsert(connection, pre_configs)
+
+            watermarks = [updated_at(p) for p in pre_configs if updated_at(p)]
+
+            if watermarks:
+                write_state(connection, "watermark", max([since or "", *watermarks]))
+
+            write_state(connection, "synced_at", client_now())
+
+        return len(pre_configs)
+    finally:
+        connection.close()
+
+
+def client_now():
+    return datetime.now(timezone.utc).isoformat(sep=" ", timespec="seconds")
+
+
+def read_mirror(function, *args):
+    """Result of function(connection, *args), None when the mirror cannot be read"""
+
+    try:
+        connection = connect()
+
+        try:
+            return function(connection, *args)
+        finally:
+            connection.close()
+    except MIRROR_ERRORS:
+        return None
+
+
+def synced_at():
+    """When the mirror was last synced, None when it never was"""
+
+    return read_mirror(read_state, "synced_at")
+
+
+def store_pre_config(pre_config):
+    """Keeps a pre config changed by this CLI up to date in a synced mirror"""
+
+    try:
+        connection = connect()
+
+        try:
+            if read_state(connection, "synced_at") is not None:
+                with connection:
+                    upsert(connection, [pre_config])
+        finally:
+            connection.close()
+    except (*MIRROR_ERRORS, KeyError) as error:
+        print(f"Warning: the local mirror was not updated: {error}", file=sys.stderr)
+
+
+def select_pre_configs(connection, with_documents):
+    if with_documents:
+        rows = connection.execute(
+            "SELECT document FROM pre_configs ORDER BY created_at, id"
+        ).fetchall()
+
+        return [json.loads(document) for document, in rows]
+
+    rows = connection.execute(
+        "SELECT id, name, created_at FROM pre_configs ORDER BY created_at, id"
+    ).fetchall()
+
+    return [
+        {"_id": id, "name": name, "created_at": created_at}
+        for id, name, created_at in rows
+    ]
+
+
+def list_pre_configs(with_documents=False):
+    """The pre configs of the mirror, None when it cannot be read"""
+
+    return read_mirror(select_pre_configs, with_documents)
+
+
+def select_pre_config(connection, id):
+    row = connection.execute(
+        "SELECT document FROM pre_configs WHERE id = ?", (id,)
+    ).fetchone()
+
+    return None if row is None else json.loads(row[0])
+
+
+def get_pre_config(id):
+    return read_mirror(select_pre_config, id)
+
+
+def print_mirror_notice(synced_at):
+    print(
+        f"Served from the local mirror, synced at {pretty_date_str(synced_at)}."
+        + " Run sync to update it, or use --online",
+        file=sys.stderr,
+    )
+
+
+def parse_sync(full=False):
+    try:
+        count = sync(full)
+    except MIRROR_ERRORS as error:
+        print(f"Error: the local mirror could not be written: {error}")
+        return
+
+    if count is None:
+        print("Error: an error occurred while fetching your pre configurations")
+        return
+
+    print(f"{count} pre configurations synced to the local mirror")
@@ -0,0 +1,121 @@
+import cProfile
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from src.cli import memory
+
+enabled = False
+
+phases = {}
+
+phases_lock = threading.Lock()
+
+profiler = None
+
+
+@contextmanager
+def phase(name):
+    """
+    Records the wall and CPU time spent inside the block when profiling, and
+    its memory when the memory report is on
+    """
+
+    if not enabled and not memory.enabled:
+        yield
+        return
+
+    with memory.phase(name), timed_phase(name):
+        yield
+
+
+@contextmanager
+def timed_phase(name):
+    if not enabled:
+        yield
+        return
+
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+
+        with phases_lock:
+            calls, total_wall, total_cpu = phases.get(name, (0, 0.0, 0.0))
+            phases[name] = (calls + 1, total_wall + wall, total_cpu + cpu)
+
+
+def start(pstats_path=None):
+    global enabled, profiler
+
+    enabled = True
+    phases.clear()
+
+    if pstats_path is not None:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+
+def stop(pstats_path=None):
+    global enabled, profiler
+
+    enabled = False
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(pstats_path)
+        profiler = None
+
+
+def print_report(total_wall, total_cpu, stream=None):
+    stream = sys.stderr if stream is None else stream
+    row_format = "{:<24} {:>6} {:>12} {:>12}\n"
+
+    lines = [row_format.format("Phase", "Calls", "Wall (ms)", "CPU (ms)")]
+
+    with phases_lock:
+        for name, (calls, wall, cpu) in sorted(
+            phases.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            lines.append(
+                row_format.format(
+                    name, calls, "{:.2f}".format(wall * 1000), "{:.2f}".format(cpu * 1000)
+                )
+            )
+
+    lines.append(
+        row_format.format(
+            "total",
+            "-",
+            "{:.2f}".format(total_wall * 1000),
+            "{:.2f}".format(total_cpu * 1000),
+        )
+    )
+
+    stream.write("\n" + "".join(lines))
+    stream.flush()
+
+
+@contextmanager
+def profile_command(active, pstats_path=None):
+    """Profiles the whole command, printing the phase breakdown at the end"""
+
+    if not active:
+        yield
+        return
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    start(pstats_path)
+
+    try:
+        yield
+    finally:
+        stop(pstats_path)
+        print_report(
+            time.perf_counter() - wall_start, time.process_time() - cpu_start
+        )
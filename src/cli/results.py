@@ -1,3 +1,8 @@
+from src.cli.formatters import render, write_output
+
+RESULT_FIELDNAMES = ["level", "name", "parent", "value", "weighted_value"]
+
+
 def to_zero_one_decimal(value):
     if value > 1:
         return value / 100
@@ -32,11 +37,161 @@ def print_results(results):
         print("\n")
 
 
-def validade_analysis_response(status_code, response_json):
+def flatten_results(results):
+    result_values = results["analysis"]
+
+    rows = [
+        {
+            "level": "sqc",
+            "name": "sqc",
+            "parent": None,
+            "value": result_values["sqc"]["sqc"],
+            "weighted_value": None,
+        }
+    ]
+
+    for key_c, value_c in result_values["characteristics"].items():
+        rows.append(
+            {
+                "level": "characteristic",
+                "name": key_c,
+                "parent": "sqc",
+                "value": value_c,
+                "weighted_value": result_values["weighted_characteristics"]["sqc"].get(
+                    key_c
+                ),
+            }
+        )
+
+    for key_c, weighted_subcharacteristics in result_values[
+        "weighted_subcharacteristics"
+    ].items():
+        for key_sc, value_sc in weighted_subcharacteristics.items():
+            rows.append(
+                {
+                    "level": "subcharacteristic",
+                    "name": key_sc,
+                    "parent": key_c,
+                    "value": result_values["subcharacteristics"].get(key_sc),
+                    "weighted_value": value_sc,
+                }
+            )
+
+    for key_sc, weighted_measures in result_values["weighted_measures"].items():
+        for key_m, value_m in weighted_measures.items():
+            rows.append(
+                {
+                    "level": "measure",
+                    "name": key_m,
+                    "parent": key_sc,
+                    "value": None,
+                    "weighted_value": value_m,
+                }
+            )
+
+    return rows
+
+
+def validade_analysis_response(status_code, response_json, output_format="text"):
     if status_code == 201 or status_code == 200:
-        print_results(response_json)
+        if output_format == "text":
+            print_results(response_json)
+        else:
+            write_output(
+                render(
+                    flatten_results(response_json),
+                    output_format,
+                    RESULT_FIELDNAMES,
+                    document=response_json,
+                )
+            )
     else:
         if response_json is not None and "error" in response_json.keys():
             print("Error: ", response_json["error"])
         else:
             print("Error while making analysis")
+
+
+def comparison_characteristics(analyses):
+    return sorted(
+        {
+            characteristic
+            for _, status_code, response_json in analyses
+            if status_code in (200, 201)
+            for characteristic in response_json["analysis"]["characteristics"]
+        }
+    )
+
+
+def render_comparison(analyses, output_format):
+    characteristics = comparison_characteristics(analyses)
+    rows = []
+    document = []
+
+    for id, status_code, response_json in analyses:
+        row = {"pre_config_id": id, "sqc": None, "error": None}
+
+        if status_code in (200, 201):
+            result_values = response_json["analysis"]
+            row["sqc"] = result_values["sqc"]["sqc"]
+            row.update(
+                {
+                    characteristic: result_values["characteristics"].get(
+                        characteristic
+                    )
+                    for characteristic in characteristics
+                }
+            )
+            document.append({"pre_config_id": id, **response_json})
+        else:
+            row["error"] = (response_json or {}).get(
+                "error", "Error while making analysis"
+            )
+            document.append({"pre_config_id": id, "error": row["error"]})
+
+        rows.append(row)
+
+    return render(
+        rows,
+        output_format,
+        ["pre_config_id", "sqc", *characteristics, "error"],
+        document=document,
+    )
+
+
+def print_comparison(analyses, output_format="text"):
+    if output_format != "text":
+        write_output(render_comparison(analyses, output_format))
+        return
+
+    characteristics = comparison_characteristics(analyses)
+
+    row_format = "{:<30} {:<10}" + " {:<18}" * len(characteristics)
+
+    print(row_format.format("ID", "SQC", *characteristics))
+
+    errors = []
+
+    for id, status_code, response_json in analyses:
+        if status_code not in (200, 201):
+            error = (response_json or {}).get("error", "Error while making analysis")
+            errors.append((id, error))
+            print(row_format.format(id, "-", *["-"] * len(characteristics)))
+            continue
+
+        result_values = response_json["analysis"]
+        values = [
+            "{:.4f}".format(result_values["characteristics"][characteristic])
+            if characteristic in result_values["characteristics"]
+            else "-"
+            for characteristic in characteristics
+        ]
+
+        print(
+            row_format.format(
+                id, "{:.4f}".format(result_values["sqc"]["sqc"]), *values
+            )
+        )
+
+    for id, error in errors:
+        print(f"\nError in {id}: {error}")
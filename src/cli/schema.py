@@ -0,0 +1,161 @@
+"""
+Validators compiled from declarative schemas of nested weighted documents.
+
+A schema names the list at the root of the document and describes each
+level of the tree below it: the key of its children and the exception and
+message of every check. compiled_validator turns it into the source of one
+function. For each level, that function runs a pass with the loops over its
+parents unrolled and every check inlined. Messages are only formatted when
+a check fails. The code object is marshaled under the data directory, keyed
+by the schema, COMPILER_VERSION and the bytecode magic number, so later runs
+skip the code generation and compile().
+"""
+import hashlib
+import importlib.util
+import json
+import marshal
+import types
+from src.cli import exceptions
+from src.cli.utils import atomic_file, get_data_dir
+
+COMPILER_VERSION = 1
+
+# Checks of a level in the order they run on each node, the node name being
+# the only field of their messages
+NODE_CHECKS = (
+    "missing_name",
+    "missing_weight",
+    "invalid_weight",
+    "missing_children",
+    "empty_children",
+)
+
+validators = {}
+
+
+def schema_digest(schema):
+    key = json.dumps(
+        [schema, COMPILER_VERSION, importlib.util.MAGIC_NUMBER.hex()], sort_keys=True
+    )
+
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def schema_checks(schema):
+    """(depth, check) of every check, the index of its exception in the generated code"""
+
+    return [
+        (depth, check)
+        for depth, level in enumerate(schema["levels"])
+        for check in NODE_CHECKS + ("weights_sum",)
+        if check in level
+    ]
+
+
+def level_pass(schema, depth, checks):
+    """Source lines of the pass validating the nodes of one level"""
+
+    levels = schema["levels"]
+    level = levels[depth]
+    lines = []
+    indent = "    "
+    parent = f'document["{schema["root"]}"]'
+
+    for parent_depth in range(depth):
+        lines.append(f"{indent}for node{parent_depth} in {parent}:")
+        parent = f'node{parent_depth}["{levels[parent_depth]["children"]}"]'
+        indent += "    "
+
+    node = f"node{depth}"
+    body = indent + "    "
+    lines.append(f"{indent}total = 0")
+    lines.append(f"{indent}for {node} in {parent}:")
+
+    def fail(check, condition, argument=f", {node}"):
+        lines.append(f"{body}{condition}")
+        lines.append(f"{body}    raise error({checks.index((depth, check))}{argument})")
+
+    fail("missing_name", f'if "name" not in {node}:', argument="")
+    fail("missing_weight", f'if "weight" not in {node}:')
+    lines.append(f'{body}weight = {node}["weight"]')
+    fail("invalid_weight", "if not 0 < weight <= 100:")
+    lines.append(f"{body}total += weight")
+
+    if level.get("children") is not None:
+        fail("missing_children", f'if "{level["children"]}" not in {node}:')
+        lines.append(f'{body}children = {node}["{level["children"]}"]')
+        fail("empty_children", "if children is None or len(children) == 0:")
+
+    # Same as the sum rounded by create.round_sum_of_weights being 100
+    lines.append(f"{indent}if total != 100 and not 0 < round(100 - total, 2) <= 0.01:")
+    lines.append(f"{indent}    raise error({checks.index((depth, 'weights_sum'))})")
+
+    return lines
+
+
+def validator_source(schema):
+    checks = schema_checks(schema)
+    lines = ["def validate(document):"]
+
+    for depth in range(len(schema["levels"])):
+        lines.extend(level_pass(schema, depth, checks))
+
+    lines.append("    return True")
+
+    return "\n".join(lines) + "\n"
+
+
+def cache_path(digest):
+    return get_data_dir("schemas") / f"{digest}.marshal"
+
+
+def load_code(schema, digest):
+    try:
+        code = marshal.loads(cache_path(digest).read_bytes())
+
+        if isinstance(code, types.CodeType):
+            return code
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    code = compile(validator_source(schema), f"<schema {schema['root']}>", "exec")
+
+    # The cache only saves time, a data directory that cannot be written, or
+    # even created, is not an error
+    try:
+        with atomic_file(cache_path(digest), "wb") as file:
+            marshal.dump(code, file)
+    except OSError:
+        pass
+
+    return code
+
+
+def compiled_validator(schema):
+    """
+    Function validating a document against the schema, raising the exception
+    of the first failing check
+    """
+
+    digest = schema_digest(schema)
+    validator = validators.get(digest)
+
+    if validator is not None:
+        return validator
+
+    levels = schema["levels"]
+    errors = [
+        (getattr(exceptions, levels[depth][check][0]), levels[depth][check][1])
+        for depth, check in schema_checks(schema)
+    ]
+
+    def error(index, node=None):
+        exception, message = errors[index]
+
+        return exception(message if node is None else message.format(node["name"]))
+
+    namespace = {"error": error}
+    exec(load_code(schema, digest), namespace)
+    validator = validators[digest] = namespace["validate"]
+
+    return validator
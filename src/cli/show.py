@@ -1,37 +1,92 @@
-import requests
+from src.cli import client, mirror, profiling
 from src.cli.utils import pretty_date_str
+from src.cli.formatters import render, write_output
 
-BASE_URL = "http://localhost:5000/"
 
+SHOW_FIELDNAMES = [
+    "characteristic",
+    "characteristic_weight",
+    "subcharacteristic",
+    "subcharacteristic_weight",
+    "measure",
+    "measure_weight",
+]
 
-def parse_show(id):
-    response = requests.get(
-        BASE_URL + f"/pre-configs/{id}",
-        headers={"Accept": "application/json"},
-    )
+
+def flatten_pre_config(pre_config):
+    rows = []
+
+    for key, char_data in pre_config["characteristics"].items():
+        for subchar in char_data["subcharacteristics"]:
+            subchar_data = pre_config["subcharacteristics"][subchar]
+
+            for measure in subchar_data["measures"]:
+                rows.append(
+                    {
+                        "characteristic": key,
+                        "characteristic_weight": char_data["weight"],
+                        "subcharacteristic": subchar,
+                        "subcharacteristic_weight": char_data["weights"][subchar],
+                        "measure": measure,
+                        "measure_weight": subchar_data["weights"][measure],
+                    }
+                )
+
+    return rows
+
+
+def parse_show(id, output_format="text", online=False):
+    synced_at = None if online else mirror.synced_at()
+    pre_config = None if synced_at is None else mirror.get_pre_config(id)
+
+    # Pre configs missing from the mirror may have been created after the sync
+    if pre_config is not None:
+        mirror.print_mirror_notice(synced_at)
+
+        with profiling.phase("render"):
+            print_pre_config(pre_config, output_format)
+        return
+
+    response = client.get(f"pre-configs/{id}")
 
     response_data = response.json()
 
     if 200 <= response.status_code <= 299:
-        print(f"Name: {response_data['name']}")
-        print(f"ID: {response_data['_id']}")
-        print(f"Created at: {pretty_date_str(response_data['created_at'])}")
+        with profiling.phase("render"):
+            print_pre_config(response_data, output_format)
+    else:
+        print("Error: ", response_data["error"])
 
-        print(
-            "\nSelected levels. Ordered as characteristics -> subcharacteristics -> measures\n"
+
+def print_pre_config(pre_config, output_format):
+    if output_format != "text":
+        write_output(
+            render(
+                flatten_pre_config(pre_config),
+                output_format,
+                SHOW_FIELDNAMES,
+                document=pre_config,
+            )
         )
+        return
 
-        for key, char_data in response_data["characteristics"].items():
-            print(f"{key} (weigth: {char_data['weight']})")
+    print(f"Name: {pre_config['name']}")
+    print(f"ID: {pre_config['_id']}")
+    print(f"Created at: {pretty_date_str(pre_config['created_at'])}")
 
-            for subchar in char_data["subcharacteristics"]:
-                subchar_data = response_data["subcharacteristics"][subchar]
+    print(
+        "\nSelected levels. Ordered as characteristics -> subcharacteristics -> measures\n"
+    )
 
-                print(f"\t{subchar} (weigth: {char_data['weights'][subchar]})")
+    for key, char_data in pre_config["characteristics"].items():
+        print(f"{key} (weigth: {char_data['weight']})")
 
-                for measure in subchar_data["measures"]:
-                    print(f"\t\t{measure} (weigth: {subchar_data['weights'][measure]})")
+        for subchar in char_data["subcharacteristics"]:
+            subchar_data = pre_config["subcharacteristics"][subchar]
 
-            print("\n")
-    else:
-        print("Error: ", response_data["error"])
+            print(f"\t{subchar} (weigth: {char_data['weights'][subchar]})")
+
+            for measure in subchar_data["measures"]:
+                print(f"\t\t{measure} (weigth: {subchar_data['weights'][measure]})")
+
+        print("\n")
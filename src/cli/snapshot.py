@@ -0,0 +1,409 @@
+"""
+Compact binary snapshots of Sonar metrics files.
+
+A snapshot starts with SNAPSHOT_MAGIC, the length and CRC32 of a JSON
+directory, and the directory itself, followed by 8-byte aligned columns,
+each with its own CRC32:
+
+- atoms: every distinct string and JSON value of the components, stored
+  once. "atoms.types" tells strings from JSON text, "atoms.offsets" holds
+  code point offsets into the UTF-8 "atoms.text".
+- components and measures: a "shape" column indexing the key lists of the
+  directory, so key order is kept, and one column of atom indexes per key.
+  "components.measures" holds the offsets of the measures of each component.
+- measures.number: the metric values as float64, for checks without parsing.
+
+The document without its components is kept as JSON in the directory, so a
+snapshot converts back to the same Sonar JSON.
+"""
+import functools
+import gc
+import json
+import math
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from contextlib import contextmanager
+from src.cli import exceptions, profiling
+
+SNAPSHOT_EXTENSION = "msgsnap"
+
+SNAPSHOT_MAGIC = b"MSGSNAP1"
+
+HEADER = struct.Struct("<8sII")
+
+# Atom index of the keys a record does not have
+ABSENT = 0
+
+ATOM_STRING = 0
+ATOM_SCALAR = 1
+ATOM_CONTAINER = 2
+
+
+def is_snapshot(file_path):
+    return str(file_path).split(".")[-1] == SNAPSHOT_EXTENSION
+
+
+class AtomTable:
+    def __init__(self):
+        self.indexes = {}
+        self.types = array("B", [ATOM_SCALAR])
+        self.texts = ["null"]
+
+    def add(self, value):
+        # The type is part of the key since False == 0 == 0.0
+        if isinstance(value, (dict, list)):
+            atom = (ATOM_CONTAINER, json.dumps(value))
+        else:
+            atom = (type(value), value)
+
+        index = self.indexes.get(atom)
+
+        if index is None:
+            index = self.indexes[atom] = len(self.texts)
+
+            if isinstance(value, str):
+                self.types.append(ATOM_STRING)
+                self.texts.append(value)
+            elif atom[0] == ATOM_CONTAINER:
+                self.types.append(ATOM_CONTAINER)
+                self.texts.append(atom[1])
+            else:
+                self.types.append(ATOM_SCALAR)
+                self.texts.append(json.dumps(value))
+
+        return index
+
+
+class RecordColumns:
+    """Shapes and per-key atom columns of a list of JSON objects"""
+
+    def __init__(self, name):
+        self.name = name
+        self.shapes = {}
+        self.shape = array("I")
+        self.columns = {}
+
+    def add(self, record, atoms, skip=()):
+        row = len(self.shape)
+        keys = tuple(record)
+        self.shape.append(self.shapes.setdefault(keys, len(self.shapes)))
+        added = 0
+
+        for key in keys:
+            if key in skip:
+                continue
+
+            column = self.columns.get(key)
+
+            if column is None:
+                column = self.columns[key] = array("I", [ABSENT]) * row
+
+            column.append(atoms.add(record[key]))
+            added += 1
+
+        if added < len(self.columns):
+            for column in self.columns.values():
+                if len(column) == row:
+                    column.append(ABSENT)
+
+    def sections(self):
+        yield f"{self.name}.shape", self.shape
+
+        for key, column in self.columns.items():
+            yield f"{self.name}.key:{key}", column
+
+
+def metric_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def encode(json_data):
+    atoms = AtomTable()
+    components = RecordColumns("components")
+    measures = RecordColumns("measures")
+    measure_offsets = array("I", [0])
+    numbers = array("d")
+
+    for component in json_data["components"]:
+        components.add(component, atoms, skip=("measures",))
+
+        for measure in component["measures"]:
+            measures.add(measure, atoms)
+            numbers.append(metric_number(measure.get("value")))
+
+        measure_offsets.append(len(numbers))
+
+    offsets = array("I", [0])
+
+    for text in atoms.texts:
+        offsets.append(offsets[-1] + len(text))
+
+    head = dict(json_data, components=None)
+    columns = [
+        ("atoms.types", atoms.types),
+        ("atoms.offsets", offsets),
+        ("atoms.text", "".join(atoms.texts).encode("utf-8")),
+        *components.sections(),
+        ("components.measures", measure_offsets),
+        *measures.sections(),
+        ("measures.number", numbers),
+    ]
+
+    directory = {
+        "head": head,
+        "counts": {"components": len(components.shape), "measures": len(numbers)},
+        "shapes": {
+            "components": [list(keys) for keys in components.shapes],
+            "measures": [list(keys) for keys in measures.shapes],
+        },
+        "sections": {},
+    }
+
+    return directory, columns
+
+
+def column_bytes(column):
+    if isinstance(column, bytes):
+        return column
+
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+
+    return column.tobytes()
+
+
+def padding(size):
+    return b"\0" * (-size % 8)
+
+
+def write_snapshot(json_data, output_path):
+    with profiling.phase("encode_snapshot"):
+        directory, columns = encode(json_data)
+        payloads = [
+            (name, column_bytes(column), getattr(column, "typecode", "B"))
+            for name, column in columns
+        ]
+
+    # The offsets of the columns depend on the size of the directory that
+    # lists them, so they are relative to the end of the directory
+    offset = 0
+
+    for name, payload, typecode in payloads:
+        directory["sections"][name] = [offset, len(payload), zlib.crc32(payload), typecode]
+        offset += len(payload) + len(padding(len(payload)))
+
+    directory_bytes = json.dumps(directory).encode("utf-8")
+    directory_bytes += padding(HEADER.size + len(directory_bytes))
+
+    with open(output_path, "wb") as file:
+        file.write(
+            HEADER.pack(SNAPSHOT_MAGIC, len(directory_bytes), zlib.crc32(directory_bytes))
+        )
+        file.write(directory_bytes)
+
+        for _, payload, _ in payloads:
+            file.write(payload)
+            file.write(padding(len(payload)))
+
+
+def invalid_snapshot(reason):
+    return exceptions.InvalidMetricsJsonFile(f"Invalid snapshot file. {reason}")
+
+
+def read_directory(view):
+    if len(view) < HEADER.size:
+        raise invalid_snapshot("The file is truncated")
+
+    magic, directory_size, directory_crc = HEADER.unpack_from(view)
+
+    if magic != SNAPSHOT_MAGIC:
+        raise invalid_snapshot("Unknown file format")
+
+    # Views of the mapped file are released before raising, or it could not be closed
+    with view[HEADER.size:HEADER.size + directory_size] as data:
+        directory_bytes = bytes(data)
+
+    if zlib.crc32(directory_bytes) != directory_crc:
+        raise invalid_snapshot("The checksum of the directory does not match")
+
+    return json.loads(directory_bytes.rstrip(b"\0")), HEADER.size + directory_size
+
+
+def read_column(view, start, section, name):
+    offset, size, crc, typecode = section
+
+    with view[start + offset:start + offset + size] as data:
+        valid = len(data) == size and zlib.crc32(data) == crc
+
+        if valid and name == "atoms.text":
+            return bytes(data)
+
+        if valid:
+            column = array(typecode)
+            column.frombytes(data)
+
+    if not valid:
+        raise invalid_snapshot(f'The checksum of the "{name}" column does not match')
+
+    if sys.byteorder != "little":
+        column.byteswap()
+
+    return column
+
+
+def read_columns(absolute_path):
+    try:
+        with open(absolute_path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            view = memoryview(mapped)
+
+            try:
+                directory, start = read_directory(view)
+                columns = {
+                    name: read_column(view, start, section, name)
+                    for name, section in directory["sections"].items()
+                }
+            finally:
+                view.release()
+    except FileNotFoundError:
+        raise exceptions.FileNotFound("The file was not found")
+    except (OSError, ValueError) as error:
+        raise exceptions.UnableToOpenFile(f"Failed to open the file. {error}")
+
+    return directory, columns
+
+
+def decode_atoms(columns):
+    text = columns["atoms.text"].decode("utf-8")
+    offsets = columns["atoms.offsets"].tolist()
+    atoms = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+    containers = set()
+
+    for index, atom_type in enumerate(columns["atoms.types"]):
+        if atom_type == ATOM_SCALAR:
+            atoms[index] = json.loads(atoms[index])
+        elif atom_type == ATOM_CONTAINER:
+            containers.add(index)
+
+    return atoms, containers
+
+
+@functools.lru_cache(maxsize=None)
+def record_builder(keys):
+    """
+    Function building the records of one shape from their columns, generated
+    so each record is a dict display instead of a call per key
+    """
+
+    names = [f"v{index}" for index in range(len(keys))]
+    items = ", ".join(f"{key!r}: {name}" for key, name in zip(keys, names))
+    source = f"lambda columns: [{{{items}}} for ({', '.join(names)},) in zip(*columns)]"
+
+    return eval(source, {})
+
+
+def build_records(name, shapes, columns, atoms, containers):
+    """The JSON objects of a RecordColumns, built column by column"""
+
+    shape = columns[f"{name}.shape"].tolist()
+    values = {}
+
+    for key in {key for keys in shapes for key in keys}:
+        column = columns.get(f"{name}.key:{key}")
+
+        # Keys without a column, like the measures of the components, are
+        # filled in by the caller
+        if column is None:
+            values[key] = [None] * len(shape)
+            continue
+
+        values[key] = list(map(atoms.__getitem__, column))
+
+        # Containers are decoded once per use, so records share no objects
+        if containers:
+            for row in [r for r, i in enumerate(column) if i in containers]:
+                values[key][row] = json.loads(atoms[column[row]])
+
+    if len(shapes) == 1:
+        return record_builder(tuple(shapes[0]))([values[key] for key in shapes[0]])
+
+    records = [None] * len(shape)
+
+    for shape_index, keys in enumerate(shapes):
+        rows = [row for row, index in enumerate(shape) if index == shape_index]
+        built = record_builder(tuple(keys))(
+            [[values[key][row] for row in rows] for key in keys]
+        )
+
+        for row, record in zip(rows, built):
+            records[row] = record
+
+    return records
+
+
+@contextmanager
+def gc_paused():
+    """
+    Pauses the cyclic garbage collector, which would otherwise run over and
+    over while millions of records, none of them in a cycle, are created
+    """
+
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def values_are_valid(directory, columns):
+    """
+    Whether check_metrics_values would pass, from the number column. When it
+    is False the row by row check finds the first error as in the JSON file.
+    """
+
+    return all(
+        "metric" in keys and "value" in keys for keys in directory["shapes"]["measures"]
+    ) and not any(map(math.isnan, columns["measures.number"]))
+
+
+def load_snapshot(absolute_path):
+    """
+    Reads a snapshot back into the Sonar JSON document it was made from.
+    Also tells whether its metric values are valid.
+    """
+
+    try:
+        with profiling.phase("read_snapshot"):
+            directory, columns = read_columns(absolute_path)
+
+        with profiling.phase("decode_snapshot"), gc_paused():
+            atoms, containers = decode_atoms(columns)
+            shapes = directory["shapes"]
+            measures = build_records("measures", shapes["measures"], columns, atoms, containers)
+            components = build_records(
+                "components", shapes["components"], columns, atoms, containers
+            )
+            offsets = columns["components.measures"].tolist()
+
+            for component, start, end in zip(components, offsets, offsets[1:]):
+                component["measures"] = measures[start:end]
+
+            values_valid = values_are_valid(directory, columns)
+    except (KeyError, ValueError, IndexError, TypeError) as error:
+        raise invalid_snapshot(f"Failed to decode it: {error!r}")
+
+    json_data = directory["head"]
+    json_data["components"] = components
+
+    return json_data, values_valid
@@ -0,0 +1,43 @@
+import json
+from datetime import datetime
+from pathlib import Path
+import requests
+from src.cli import client
+from src.cli.exceptions import MeasureSoftGramCLIException
+from src.cli.jsonReader import METRICS_SONAR
+
+SONAR_URL = "https://sonarcloud.io/api/measures/component_tree?component=fga-eps-mds_"
+
+DEFAULT_OUTPUT_DIR = "./analytics-raw-data"
+
+
+def sonar_url(repo):
+    return f'{SONAR_URL}{repo}&metricKeys={",".join(METRICS_SONAR)}&ps=500'
+
+
+def sonar_file_name(repo, release_version, date=None):
+    date = datetime.now() if date is None else date
+
+    return f'fga-eps-mds-{repo}-{date.strftime("%m-%d-%Y-%H-%M-%S")}-{release_version}.json'
+
+
+def fetch_sonar_file(repo, release_version, output_dir=DEFAULT_OUTPUT_DIR):
+    """Saves the SonarCloud metrics of a repository, returning the file path"""
+
+    url = sonar_url(repo)
+    client.wait_rate_limit(url)
+
+    response = requests.get(url, timeout=client.timeout_for("sonar"))
+
+    if not 200 <= response.status_code <= 299:
+        raise MeasureSoftGramCLIException(
+            f"Failed to fetch the SonarCloud metrics of {repo}: HTTP {response.status_code}"
+        )
+
+    file_path = Path(output_dir) / sonar_file_name(repo, release_version)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(file_path, "w") as fp:
+        fp.write(json.dumps(json.loads(response.text)))
+
+    return file_path
@@ -1,5 +1,11 @@
+import hashlib
+import json
+import os
 import pytz
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
 
 
 def pretty_date_str(date_str, format="%m/%d/%Y %H:%M:%S", timezone="Brazil/East"):
@@ -8,3 +14,73 @@ def pretty_date_str(date_str, format="%m/%d/%Y %H:%M:%S", timezone="Brazil/East"
     date_time = date_time.astimezone(pytz.timezone(timezone))
 
     return date_time.strftime(format)
+
+
+DEFAULT_BASE_URL = "http://localhost:5000/"
+
+
+def normalize_base_url(base_url):
+    base_url = base_url.strip()
+
+    return base_url if base_url.endswith("/") else base_url + "/"
+
+
+def get_base_url():
+    """MeasureSoftGram service URL, overridable with MEASURESOFTGRAM_URL"""
+
+    return get_base_urls()[0]
+
+
+def get_base_urls():
+    """URLs of the MeasureSoftGram backends, MEASURESOFTGRAM_URL separated by commas"""
+
+    base_urls = os.environ.get("MEASURESOFTGRAM_URL", DEFAULT_BASE_URL)
+
+    return [normalize_base_url(url) for url in base_urls.split(",") if url.strip()] or [
+        DEFAULT_BASE_URL
+    ]
+
+
+def get_data_dir(*parts):
+    """Directory where the CLI keeps its local state, created on demand"""
+
+    data_dir = Path(
+        os.environ.get("MEASURESOFTGRAM_HOME", Path.home() / ".measuresoftgram")
+    ).joinpath(*parts)
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    return data_dir
+
+
+@contextmanager
+def atomic_file(path, mode="w"):
+    """File replacing path only once it is completely written"""
+
+    file_descriptor, tmp_path = tempfile.mkstemp(
+        dir=Path(path).parent, prefix=f".{Path(path).name}.", suffix=".tmp"
+    )
+
+    try:
+        with os.fdopen(file_descriptor, mode) as file:
+            yield file
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_json_atomic(path, data):
+    with atomic_file(path) as file:
+        json.dump(data, file)
+
+
+def file_sha256(absolute_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+
+    with open(absolute_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
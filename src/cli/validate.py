@@ -0,0 +1,174 @@
+"""
+Offline validation of metrics and pre config files.
+
+Runs the same checks as import and create without contacting the service, on
+every CPU core, so it can gate commits and CI runs over many files.
+"""
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from src.cli import cancellation, exceptions, profiling
+from src.cli.create import pre_config_file_reader
+from src.cli.formatters import render, write_output
+from src.cli.jsonReader import JsonStream, file_reader, json_file_errors, open_json_file
+
+FILE_KINDS = ["auto", "metrics", "pre-config"]
+
+VALIDATE_FIELDNAMES = ["path", "kind", "status", "error", "seconds"]
+
+METRICS_KEYS = {"paging", "baseComponent", "components"}
+
+PRE_CONFIG_KEYS = {"pre_config_name", "characteristics"}
+
+
+def detect_kind(absolute_path):
+    """Tells metrics from pre config files by their first known top level key"""
+
+    with json_file_errors():
+        with open(absolute_path, "r") as file:
+            stream = JsonStream(file)
+            stream.expect("{")
+
+            for _ in stream.items("}"):
+                key = stream.value()
+
+                if key in METRICS_KEYS:
+                    return "metrics"
+
+                if key in PRE_CONFIG_KEYS:
+                    return "pre-config"
+
+                stream.expect(":")
+                stream.value()
+
+    raise exceptions.InvalidMeasuresoftgramFormat(
+        "The file is neither a Sonar metrics file nor a pre configuration"
+    )
+
+
+def validate_file(absolute_path, kind="auto", available_pre_configs=None):
+    start = time.perf_counter()
+    error = None
+
+    try:
+        if kind == "auto":
+            kind = detect_kind(absolute_path)
+
+        if kind == "metrics":
+            file_reader(absolute_path)
+        else:
+            pre_config_file_reader(absolute_path, available_pre_configs)
+    except exceptions.MeasureSoftGramCLIException as exception:
+        error = str(exception)
+    except (AttributeError, TypeError, ValueError) as exception:
+        error = f"Invalid file structure. {exception}"
+
+    return {
+        "path": absolute_path,
+        "kind": kind,
+        "status": "ok" if error is None else "invalid",
+        "error": error or "",
+        "seconds": round(time.perf_counter() - start, 6),
+    }
+
+
+def collect_files(paths):
+    files = []
+
+    for path in paths:
+        path = Path(path)
+
+        if path.is_dir():
+            files.extend(sorted(str(p) for p in path.rglob("*.json") if p.is_file()))
+        else:
+            files.append(str(path))
+
+    return list(dict.fromkeys(files))
+
+
+def ignore_sigint():
+    """Leaves Ctrl-C to the parent process, which cancels the pool"""
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def until_cancelled(results):
+    collected = []
+
+    for result in results:
+        cancellation.raise_if_cancelled()
+        collected.append(result)
+
+    return collected
+
+
+def validate_files(files, kind="auto", available_pre_configs=None, workers=None):
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(files) == 1:
+        return until_cancelled(validate_file(f, kind, available_pre_configs) for f in files)
+
+    chunksize = max(1, len(files) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=ignore_sigint) as executor:
+        results = executor.map(
+            validate_file,
+            files,
+            [kind] * len(files),
+            [available_pre_configs] * len(files),
+            chunksize=chunksize,
+        )
+
+        # Closing the results cancels the chunks not started yet, so that
+        # leaving the pool does not wait for them
+        try:
+            return until_cancelled(results)
+        finally:
+            results.close()
+
+
+def print_validation(results, output_format="text"):
+    if output_format != "text":
+        write_output(render(results, output_format, VALIDATE_FIELDNAMES))
+        return
+
+    for result in results:
+        if result["status"] == "ok":
+            print(f"ok       {result['path']}")
+        else:
+            print(f"invalid  {result['path']} ({result['kind']}): {result['error']}")
+
+    invalid = sum(1 for result in results if result["status"] != "ok")
+
+    print(f"\n{len(results)} files validated, {invalid} invalid")
+
+
+def parse_validate(
+    paths, kind="auto", available_path=None, workers=None, output_format="text"
+):
+    """Validates the files, returning False when any of them is invalid"""
+
+    available_pre_configs = None
+
+    try:
+        if available_path is not None:
+            available_pre_configs = open_json_file(r"{}".format(available_path))
+    except exceptions.MeasureSoftGramCLIException as error:
+        print("Error: ", error)
+        return False
+
+    files = collect_files(paths)
+
+    if len(files) == 0:
+        print("Error: no file to validate")
+        return False
+
+    with profiling.phase("validate"):
+        results = validate_files(files, kind, available_pre_configs, workers)
+
+    with profiling.phase("render"):
+        print_validation(results, output_format)
+
+    return all(result["status"] == "ok" for result in results)
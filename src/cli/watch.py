@@ -0,0 +1,196 @@
+"""
+Watch mode of the import command.
+
+The directory is polled for new or changed JSON files. A file is imported once
+its size and modification time stay the same for the settle time, so files
+still being written are not read halfway. Imported and invalid files are kept
+in an index in the data directory, keyed by the directory and the pre config
+ID, so restarting the watch does not upload them again.
+"""
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests
+from src.cli import cancellation, exceptions
+from src.cli.importer import import_file
+from src.cli.utils import get_data_dir, write_json_atomic
+
+DEFAULT_INTERVAL = 1.0
+
+DEFAULT_SETTLE = 2.0
+
+DEFAULT_WORKERS = 2
+
+index_lock = threading.Lock()
+
+
+def index_path(directory, pre_config_id):
+    key = hashlib.sha256(f"{Path(directory).absolute()}:{pre_config_id}".encode("utf-8"))
+
+    return get_data_dir("watch") / f"{key.hexdigest()}.json"
+
+
+def read_index(directory, pre_config_id):
+    try:
+        with open(index_path(directory, pre_config_id), "r") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def record_file(directory, pre_config_id, index, file_path, stamp, status):
+    with index_lock:
+        index[str(file_path)] = {"size": stamp[0], "mtime_ns": stamp[1], "status": status}
+
+        write_json_atomic(index_path(directory, pre_config_id), index)
+
+
+def scan_ready_files(directory, index, pending, settle, now):
+    """
+    Files not in the index whose size and modification time did not change
+    for settle seconds. pending keeps the stamps seen by previous scans.
+    """
+
+    ready = []
+    seen = set()
+
+    for file_path in sorted(Path(directory).glob("*.json")):
+        if file_path.name.startswith("."):
+            continue
+
+        try:
+            stat = file_path.stat()
+        except OSError:
+            continue
+
+        key = str(file_path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        seen.add(key)
+        indexed = index.get(key)
+
+        if indexed is not None and (indexed["size"], indexed["mtime_ns"]) == stamp:
+            continue
+
+        if key not in pending or pending[key][0] != stamp:
+            pending[key] = (stamp, now)
+        elif now - pending[key][1] >= settle:
+            ready.append((file_path, stamp))
+
+    for key in set(pending) - seen:
+        del pending[key]
+
+    return ready
+
+
+def import_watched_file(file_path, pre_config_id, language_extension, all_metrics, component_filter):
+    try:
+        status_code, response_data = import_file(
+            file_path, pre_config_id, language_extension, all_metrics, component_filter
+        )
+    except exceptions.Cancelled:
+        raise
+    except exceptions.ServiceUnavailable as error:
+        print(f"Error in {file_path.name}: {error}, it will be imported again")
+        return None
+    except exceptions.MeasureSoftGramCLIException as error:
+        print(f"Error in {file_path.name}: {error}")
+        return "invalid"
+    except requests.exceptions.RequestException as error:
+        print(f"Error in {file_path.name}: {error}, it will be imported again")
+        return None
+    except (ValueError, KeyError) as error:
+        # Such as an HTML error page of a proxy instead of a JSON body
+        print(f"Error in {file_path.name}: invalid response {error!r}, it will be imported again")
+        return None
+
+    if 200 <= status_code <= 299:
+        print(f"Imported {file_path.name}")
+        return "ok"
+
+    message = "; ".join(f"{key}: {value}" for key, value in response_data.items())
+    print(f"Error in {file_path.name}: {message}")
+
+    return "invalid" if 400 <= status_code <= 499 else None
+
+
+def watch_directory(
+    directory,
+    pre_config_id,
+    language_extension,
+    interval=DEFAULT_INTERVAL,
+    settle=DEFAULT_SETTLE,
+    workers=DEFAULT_WORKERS,
+    all_metrics=False,
+    component_filter=None,
+    stop=None,
+):
+    """Imports the files of the directory as they are ready, until stop is set"""
+
+    stop = cancellation.cancelled if stop is None else stop
+    index = read_index(directory, pre_config_id)
+    pending = {}
+    in_flight = set()
+
+    def run(file_path, stamp):
+        try:
+            status = import_watched_file(
+                file_path, pre_config_id, language_extension, all_metrics, component_filter
+            )
+
+            # Files that failed for a transient reason are tried again
+            if status is not None:
+                record_file(directory, pre_config_id, index, file_path, stamp, status)
+        finally:
+            with index_lock:
+                in_flight.discard(str(file_path))
+
+    print(f"Watching {directory} for new metrics files, press Ctrl-C to stop")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while True:
+            with index_lock:
+                indexed = dict(index)
+
+            for file_path, stamp in scan_ready_files(
+                directory, indexed, pending, settle, time.monotonic()
+            ):
+                with index_lock:
+                    if str(file_path) in in_flight:
+                        continue
+
+                    in_flight.add(str(file_path))
+
+                pending.pop(str(file_path), None)
+                executor.submit(run, file_path, stamp)
+
+            if stop.wait(interval):
+                break
+
+
+def parse_watch(
+    directory,
+    pre_config_id,
+    language_extension,
+    interval=DEFAULT_INTERVAL,
+    settle=DEFAULT_SETTLE,
+    workers=DEFAULT_WORKERS,
+    all_metrics=False,
+    component_filter=None,
+):
+    if not Path(directory).is_dir():
+        print("Error:  The watched path must be a directory")
+        return
+
+    watch_directory(
+        directory,
+        pre_config_id,
+        language_extension,
+        interval,
+        settle,
+        workers,
+        all_metrics,
+        component_filter,
+    )
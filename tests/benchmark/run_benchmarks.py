@@ -0,0 +1,267 @@
+"""
+Benchmarks of the CLI hot paths on synthetic inputs of increasing size.
+
+Usage:
+    python -m tests.benchmark.run_benchmarks [--update-baselines] [--threshold 0.25]
+
+Every benchmark reports the best wall time of a few runs and the peak memory
+traced by tracemalloc. The numbers are compared against baselines.json and the
+run fails when any of them regresses more than the threshold.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from src.cli import create, generator, jsonReader
+from src.cli.list import parse_list
+from src.cli.results import print_results
+
+BASELINES_PATH = Path(__file__).absolute().parent / "baselines.json"
+
+DEFAULT_THRESHOLD = 0.25
+
+REPEAT = 5
+
+# Timings below this difference are considered noise
+MIN_SECONDS_DELTA = 0.001
+
+
+class DummyResponse:
+    def __init__(self, status_code, mocked_data):
+        self.status_code = status_code
+        self.res = mocked_data
+
+    def json(self):
+        return self.res
+
+
+def synthetic_results(characteristics_count):
+    names = [f"characteristic_{c}" for c in range(characteristics_count)]
+
+    return {
+        "analysis": {
+            "sqc": {"sqc": 0.5},
+            "characteristics": {name: 0.5 for name in names},
+            "subcharacteristics": {f"{name}_sub": 0.5 for name in names},
+            "weighted_characteristics": {"sqc": {name: 50.0 for name in names}},
+            "weighted_subcharacteristics": {
+                name: {f"{name}_sub": 50.0} for name in names
+            },
+            "weighted_measures": {
+                f"{name}_sub": {f"{name}_measure": 50.0} for name in names
+            },
+        }
+    }
+
+
+def synthetic_pre_configs(count):
+    return [
+        {
+            "_id": f"{index:024x}",
+            "name": f"pre-config-{index}",
+            "created_at": "2022-04-24 15:30:29+00:00",
+        }
+        for index in range(count)
+    ]
+
+
+def prepare_benchmarks(directory):
+    """Returns (name, size, function) tuples, building the inputs up front"""
+
+    benchmarks = []
+
+    for size in [100, 1000, 10000]:
+        path = str(Path(directory) / f"sonar_{size}.json")
+        generator.generate_sonar_file(path, size, seed=size)
+        sonar = jsonReader.open_json_file(path)
+
+        benchmarks.append(
+            ("file_reader", size, lambda path=path: jsonReader.file_reader(path))
+        )
+        benchmarks.append(
+            (
+                "check_metrics_values",
+                size,
+                lambda sonar=sonar: jsonReader.check_metrics_values(sonar),
+            )
+        )
+
+    for size in [2, 5, 10]:
+        path = str(Path(directory) / f"pre_config_{size}.json")
+        available_path = str(Path(directory) / f"available_{size}.json")
+        generator.generate_pre_config_file(path, (size, size, size))
+        generator.generate_available_file(available_path, (size, size, size))
+        pre_config = jsonReader.open_json_file(path)
+        available = jsonReader.open_json_file(available_path)
+        characteristics = create.read_file_characteristics(pre_config)
+        subcharacteristics = create.read_file_sub_characteristics(pre_config)
+
+        benchmarks.append(
+            (
+                "pre_config_file_reader",
+                size,
+                lambda path=path, available=available: create.pre_config_file_reader(
+                    path, available
+                ),
+            )
+        )
+        benchmarks.append(
+            (
+                "validate_core_available",
+                size,
+                lambda a=available, c=characteristics, s=subcharacteristics: (
+                    create.validate_core_available(a, c, s)
+                ),
+            )
+        )
+
+    for size in [10, 100, 1000]:
+        results = synthetic_results(size)
+
+        benchmarks.append(
+            ("print_results", size, lambda results=results: print_results(results))
+        )
+
+        response = DummyResponse(200, synthetic_pre_configs(size))
+
+        def render_list(response=response):
+            with mock.patch("requests.get", return_value=response):
+                parse_list("text", online=True)
+
+        benchmarks.append(("parse_list", size, render_list))
+
+    return benchmarks
+
+
+def measure(function):
+    best_seconds = None
+
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds = seconds
+
+    tracemalloc.start()
+    function()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": best_seconds, "peak_bytes": peak_bytes}
+
+
+def run_benchmarks(benchmarks):
+    measurements = {}
+
+    for name, size, function in benchmarks:
+        with mock.patch("sys.stdout", new=StringIO()):
+            measurements[f"{name}[{size}]"] = measure(function)
+
+    return measurements
+
+
+def find_regressions(measurements, baselines, threshold):
+    regressions = []
+
+    for key, measurement in measurements.items():
+        baseline = baselines.get(key)
+
+        if baseline is None:
+            continue
+
+        if measurement["seconds"] > max(
+            baseline["seconds"] * (1 + threshold),
+            baseline["seconds"] + MIN_SECONDS_DELTA,
+        ):
+            regressions.append(
+                (key, "seconds", baseline["seconds"], measurement["seconds"])
+            )
+
+        if measurement["peak_bytes"] > baseline["peak_bytes"] * (1 + threshold):
+            regressions.append(
+                (key, "peak_bytes", baseline["peak_bytes"], measurement["peak_bytes"])
+            )
+
+    return regressions
+
+
+def print_report(measurements, baselines):
+    row_format = "{:<36} {:>12} {:>12} {:>14} {:>14}"
+
+    print(
+        row_format.format(
+            "Benchmark", "Time (ms)", "Base (ms)", "Peak (KiB)", "Base (KiB)"
+        )
+    )
+
+    for key, measurement in measurements.items():
+        baseline = baselines.get(key)
+
+        print(
+            row_format.format(
+                key,
+                "{:.3f}".format(measurement["seconds"] * 1000),
+                "{:.3f}".format(baseline["seconds"] * 1000) if baseline else "-",
+                "{:.1f}".format(measurement["peak_bytes"] / 1024),
+                "{:.1f}".format(baseline["peak_bytes"] / 1024) if baseline else "-",
+            )
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the CLI hot paths")
+    parser.add_argument(
+        "--update-baselines",
+        action="store_true",
+        help="Store the measurements as the new baselines",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Accepted relative regression before failing (0.25 is 25%%)",
+    )
+    args = parser.parse_args(argv)
+
+    # Local state, like the pre config mirror and the schema cache, stays out
+    # of the developer's own data directory
+    with tempfile.TemporaryDirectory() as directory, mock.patch.dict(
+        os.environ, {"MEASURESOFTGRAM_HOME": str(Path(directory) / "home")}
+    ):
+        measurements = run_benchmarks(prepare_benchmarks(directory))
+
+    try:
+        with open(BASELINES_PATH, "r") as file:
+            baselines = json.load(file)
+    except FileNotFoundError:
+        baselines = {}
+
+    print_report(measurements, baselines)
+
+    if args.update_baselines:
+        with open(BASELINES_PATH, "w") as file:
+            json.dump(measurements, file, indent=4, sort_keys=True)
+            file.write("\n")
+
+        print(f"\nBaselines saved to {BASELINES_PATH}")
+        return 0
+
+    regressions = find_regressions(measurements, baselines, args.threshold)
+
+    for key, field, baseline, value in regressions:
+        print(f"\nRegression in {key}: {field} went from {baseline:.6g} to {value:.6g}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+End-to-end throughput and tail latency of the CLI against the mock server.
+
+Usage:
+    python -m tests.benchmark.run_load [--requests 200] [--concurrency 8]
+        [--latency 0.01] [--error-rate 0] [--update-baselines]
+
+Each operation (list, show, import and analysis) runs the CLI functions
+in-process against a local MockServer. The p95 latency and the throughput are
+compared against load_baselines.json and the run fails on regressions larger
+than the threshold.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import requests
+from tests.mock_server import MockBackend, MockServer
+
+BASELINES_PATH = Path(__file__).absolute().parent / "load_baselines.json"
+
+DEFAULT_THRESHOLD = 0.25
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+
+    return values[index]
+
+
+def prepare_server(directory, latency, error_rate):
+    from src.cli import generator
+
+    available_path = str(Path(directory) / "available.json")
+    pre_config_path = str(Path(directory) / "pre_config.json")
+    sonar_path = str(Path(directory) / "sonar.json")
+
+    generator.generate_available_file(available_path, (3, 3, 3))
+    generator.generate_pre_config_file(pre_config_path, (3, 3, 3))
+    generator.generate_sonar_file(sonar_path, 500, seed=1)
+
+    with open(available_path, "r") as file:
+        server = MockServer(
+            backend=MockBackend(json.load(file)),
+            latency=latency,
+            error_rate=error_rate,
+        )
+
+    os.environ["MEASURESOFTGRAM_URL"] = server.url
+
+    return server.start(), pre_config_path, sonar_path
+
+
+def operations(pre_config_path, sonar_path):
+    # The CLI modules read MEASURESOFTGRAM_URL when they are imported
+    from src.cli import create
+    from src.cli.analysis import parse_analysis
+    from src.cli.cliRunner import parse_import
+    from src.cli.list import parse_list
+    from src.cli.show import parse_show
+    from src.cli.utils import get_base_url
+    from tests.test_helpers import read_json
+
+    available = read_json(str(Path(pre_config_path).parent / "available.json"))
+    pre_config = create.pre_config_file_reader(pre_config_path, available)
+
+    response = requests.post(get_base_url() + "pre-configs", json=pre_config)
+
+    if response.status_code != 201:
+        raise RuntimeError(f"Failed to create the pre configuration: {response.text}")
+
+    pre_config_id = response.json()["_id"]
+    parse_import(sonar_path, pre_config_id, "py")
+
+    return {
+        "list": lambda: parse_list(),
+        "show": lambda: parse_show(pre_config_id),
+        "import": lambda: parse_import(sonar_path, pre_config_id, "py"),
+        "analysis": lambda: parse_analysis(pre_config_id, use_cache=False),
+    }
+
+
+def run_operation(function, requests_count, concurrency):
+    def timed():
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(lambda _: timed(), range(requests_count)))
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        "throughput": requests_count / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+def find_regressions(measurements, baselines, threshold):
+    regressions = []
+
+    for key, measurement in measurements.items():
+        baseline = baselines.get(key)
+
+        if baseline is None:
+            continue
+
+        if measurement["p95"] > baseline["p95"] * (1 + threshold):
+            regressions.append((key, "p95", baseline["p95"], measurement["p95"]))
+
+        if measurement["throughput"] < baseline["throughput"] * (1 - threshold):
+            regressions.append(
+                (key, "throughput", baseline["throughput"], measurement["throughput"])
+            )
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CLI load test on the mock server")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baselines", action="store_true")
+    args = parser.parse_args(argv)
+
+    measurements = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["MEASURESOFTGRAM_HOME"] = directory
+        server, pre_config_path, sonar_path = prepare_server(
+            directory, args.latency, args.error_rate
+        )
+
+        try:
+            with mock.patch("sys.stdout", new=StringIO()):
+                for name, function in operations(pre_config_path, sonar_path).items():
+                    measurements[name] = run_operation(
+                        function, args.requests, args.concurrency
+                    )
+        finally:
+            server.stop()
+
+    row_format = "{:<12} {:>14} {:>10} {:>10} {:>10}"
+    print(
+        row_format.format(
+            "Operation", "Throughput/s", "p50 (ms)", "p95 (ms)", "p99 (ms)"
+        )
+    )
+
+    for name, measurement in measurements.items():
+        print(
+            row_format.format(
+                name,
+                "{:.1f}".format(measurement["throughput"]),
+                "{:.2f}".format(measurement["p50"] * 1000),
+                "{:.2f}".format(measurement["p95"] * 1000),
+                "{:.2f}".format(measurement["p99"] * 1000),
+            )
+        )
+
+    if args.update_baselines:
+        with open(BASELINES_PATH, "w") as file:
+            json.dump(measurements, file, indent=4, sort_keys=True)
+            file.write("\n")
+
+        print(f"\nBaselines saved to {BASELINES_PATH}")
+        return 0
+
+    try:
+        with open(BASELINES_PATH, "r") as file:
+            baselines = json.load(file)
+    except FileNotFoundError:
+        baselines = {}
+
+    regressions = find_regressions(measurements, baselines, args.threshold)
+
+    for key, field, baseline, value in regressions:
+        print(f"\nRegression in {key}: {field} went from {baseline:.6g} to {value:.6g}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
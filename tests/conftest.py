@@ -0,0 +1,19 @@
+import pytest
+from src.cli import client
+
+
+@pytest.fixture(autouse=True)
+def measuresoftgram_home(tmp_path, monkeypatch):
+    """Keeps the CLI local state of every test inside a temporary directory"""
+
+    home = tmp_path / "measuresoftgram"
+    monkeypatch.setenv("MEASURESOFTGRAM_HOME", str(home))
+
+    return home
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Retries happen right away, so tests of failing requests stay fast"""
+
+    monkeypatch.setattr(client, "BACKOFF_BASE", 0.0)
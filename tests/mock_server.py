@@ -0,0 +1,514 @@
+"""
+Local stand-in for the MeasureSoftGram service.
+
+It implements the endpoints used by the CLI on top of an in-memory store and
+can inject latency, bandwidth caps, random failures and payload size limits,
+so end-to-end behaviour can be exercised and measured offline.
+
+Usage:
+    python -m tests.mock_server --port 5000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_AVAILABLE_PATH = (
+    Path(__file__).absolute().parent / "unit" / "data" / "measuresoftgramCoreFormat.json"
+)
+
+PRE_CONFIG_PATH = re.compile(r"^pre-configs/(?P<id>[^/]+)$")
+
+
+def now():
+    return datetime.now(timezone.utc).isoformat(sep=" ", timespec="seconds")
+
+
+class PayloadTooLarge(Exception):
+    pass
+
+
+class MockBackend:
+    """In-memory state shared by every request of one or more servers"""
+
+    def __init__(self, available=None):
+        if available is None:
+            with open(DEFAULT_AVAILABLE_PATH, "r") as file:
+                available = json.load(file)
+
+        self.available = available
+        self.pre_configs = {}
+        self.metrics = {}
+        self.uploads = {}
+        self.completed_uploads = {}
+        self.lock = threading.Lock()
+
+    def create_pre_config(self, data):
+        if not data.get("name"):
+            return 422, {"error": "The pre config name is required"}
+
+        with self.lock:
+            if any(p["name"] == data["name"] for p in self.pre_configs.values()):
+                return 422, {"error": "The pre config name is already in use"}
+
+            pre_config = {
+                "_id": uuid.uuid4().hex[:24],
+                "name": data["name"],
+                "characteristics": data.get("characteristics", {}),
+                "subcharacteristics": data.get("subcharacteristics", {}),
+                "measures": data.get("measures", []),
+                "created_at": now(),
+            }
+            pre_config["updated_at"] = pre_config["created_at"]
+            self.pre_configs[pre_config["_id"]] = pre_config
+
+        return 201, pre_config
+
+    def list_pre_configs(self, updated_since=None):
+        with self.lock:
+            return 200, [
+                p
+                for p in self.pre_configs.values()
+                if updated_since is None or p["updated_at"] >= updated_since
+            ]
+
+    def get_pre_config(self, id):
+        with self.lock:
+            pre_config = self.pre_configs.get(id)
+
+        if pre_config is None:
+            return 404, {"error": f"There is no pre configurations with ID {id}"}
+
+        return 200, pre_config
+
+    def change_pre_config_name(self, id, data):
+        with self.lock:
+            if id not in self.pre_configs:
+                return 404, {"error": f"There is no pre configurations with ID {id}"}
+
+            if any(
+                p["name"] == data.get("name") and p["_id"] != id
+                for p in self.pre_configs.values()
+            ):
+                return 422, {"error": "The pre config name is already in use"}
+
+            self.pre_configs[id]["name"] = data.get("name")
+            self.pre_configs[id]["updated_at"] = now()
+
+            return 200, self.pre_configs[id]
+
+    def required_metrics(self, pre_config):
+        return {
+            metric
+            for measure in pre_config["measures"]
+            for metric in self.available["measures"][measure]["metrics"]
+        }
+
+    def import_chunk(self, data):
+        """Keeps the chunks of a resumable import until all of them arrive"""
+
+        chunk = data["chunk"]
+        upload_id = chunk["upload_id"]
+
+        with self.lock:
+            if upload_id in self.completed_uploads:
+                return self.completed_uploads[upload_id]
+
+            upload = self.uploads.get(upload_id)
+
+            if upload is None and chunk["index"] != 0:
+                return 404, {"chunk": f"There is no upload with ID {upload_id}"}
+
+            upload = self.uploads.setdefault(upload_id, {})
+            upload[chunk["index"]] = data.get("components") or []
+
+            if len(upload) < chunk["total"]:
+                return 202, {"received": chunk["index"]}
+
+            del self.uploads[upload_id]
+
+        components = [c for index in sorted(upload) for c in upload[index]]
+        result = self.import_metrics({**data, "components": components, "chunk": None})
+
+        with self.lock:
+            self.completed_uploads[upload_id] = result
+
+        return result
+
+    def import_metrics(self, data):
+        if data.get("chunk"):
+            return self.import_chunk(data)
+
+        pre_config_id = data.get("pre_config_id")
+
+        with self.lock:
+            pre_config = self.pre_configs.get(pre_config_id)
+
+        if pre_config is None:
+            return 404, {"pre_config_id": f"{pre_config_id} is not a valid ID"}
+
+        components = data.get("components") or []
+        metrics = {
+            measure["metric"] for c in components for measure in c["measures"]
+        }
+        missing_metrics = self.required_metrics(pre_config) - metrics
+
+        if missing_metrics:
+            return 422, {
+                "__all__": "The metrics in this file are not the expected in the "
+                + f"pre config. Missing metrics: {', '.join(sorted(missing_metrics))}"
+            }
+
+        with self.lock:
+            self.metrics[pre_config_id] = components
+
+        return 201, {}
+
+    def measure_value(self, components, measure):
+        values = [
+            float(m["value"])
+            for component in components
+            for m in component["measures"]
+            if m["metric"] in self.available["measures"][measure]["metrics"]
+        ]
+
+        if not values:
+            return 0.0
+
+        mean = sum(values) / len(values)
+
+        return mean / (1 + mean)
+
+    def analysis(self, data):
+        pre_config_id = data.get("pre_config_id")
+
+        with self.lock:
+            pre_config = self.pre_configs.get(pre_config_id)
+            components = self.metrics.get(pre_config_id)
+
+        if pre_config is None:
+            return 404, {"error": "Pre-Config is not a valid ID"}
+
+        if components is None:
+            return 422, {"error": "There are no metrics imported for this Pre-Config"}
+
+        result = {
+            "sqc": {"sqc": 0.0},
+            "characteristics": {},
+            "subcharacteristics": {},
+            "weighted_characteristics": {"sqc": {}},
+            "weighted_subcharacteristics": {},
+            "weighted_measures": {},
+        }
+
+        for subchar, subchar_data in pre_config["subcharacteristics"].items():
+            weighted = {
+                measure: self.measure_value(components, measure)
+                * subchar_data["weights"][measure]
+                for measure in subchar_data["measures"]
+            }
+            result["weighted_measures"][subchar] = weighted
+            result["subcharacteristics"][subchar] = sum(weighted.values()) / 100
+
+        for char, char_data in pre_config["characteristics"].items():
+            weighted = {
+                subchar: result["subcharacteristics"][subchar]
+                * char_data["weights"][subchar]
+                for subchar in char_data["subcharacteristics"]
+            }
+            result["weighted_subcharacteristics"][char] = weighted
+            result["characteristics"][char] = sum(weighted.values()) / 100
+            result["weighted_characteristics"]["sqc"][char] = (
+                result["characteristics"][char] * char_data["weight"]
+            )
+
+        result["sqc"]["sqc"] = (
+            sum(result["weighted_characteristics"]["sqc"].values()) / 100
+        )
+
+        return 201, {"analysis": result}
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def endpoint(self):
+        return self.path.split("?", 1)[0].strip("/")
+
+    def query(self):
+        return {
+            key: values[-1]
+            for key, values in parse_qs(urlsplit(self.path).query).items()
+        }
+
+    def read_body(self):
+        body = self.read_raw_body()
+
+        if not body:
+            return {}
+
+        if self.headers.get("Content-Type") == "application/x-ndjson":
+            header, *components = [json.loads(line) for line in body.splitlines() if line]
+            return {**header, "components": components}
+
+        return json.loads(body)
+
+    def read_raw_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            return self.throttled_read(int(self.headers.get("Content-Length") or 0))
+
+        chunks, total = [], 0
+
+        while True:
+            size = int(self.rfile.readline().split(b";", 1)[0], 16)
+
+            if size == 0:
+                break
+
+            total += size
+
+            if self.server.max_payload is not None and total > self.server.max_payload:
+                raise PayloadTooLarge()
+
+            chunks.append(self.throttled_read(size))
+            self.rfile.readline()
+
+        # Trailer fields, up to the empty line that ends the body
+        while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+            pass
+
+        return b"".join(chunks)
+
+    def throttled_read(self, length):
+        chunks = []
+
+        while length > 0:
+            chunk = self.rfile.read(min(length, self.server.chunk_size()))
+
+            if not chunk:
+                break
+
+            chunks.append(chunk)
+            length -= len(chunk)
+            self.server.throttle(len(chunk))
+
+        return b"".join(chunks)
+
+    def send_json(self, status_code, data):
+        body = json.dumps(data).encode("utf-8")
+
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        for start in range(0, len(body), self.server.chunk_size()):
+            chunk = body[start:start + self.server.chunk_size()]
+            self.wfile.write(chunk)
+            self.server.throttle(len(chunk))
+
+    def handle_request(self, method):
+        self.server.record_request(method, self.endpoint())
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        length = int(self.headers.get("Content-Length") or 0)
+
+        if self.server.max_payload is not None and length > self.server.max_payload:
+            self.send_json(413, {"error": "Payload too large"})
+            self.close_connection = True
+            return
+
+        try:
+            if self.server.should_fail():
+                self.read_raw_body()
+                self.send_json(500, {"error": "Injected failure"})
+                return
+
+            status_code, data = self.route(method)
+        except PayloadTooLarge:
+            self.send_json(413, {"error": "Payload too large"})
+            self.close_connection = True
+            return
+        except (ValueError, KeyError, TypeError) as error:
+            status_code, data = 400, {"error": f"Bad request: {error}"}
+
+        self.send_json(status_code, data)
+
+    def route(self, method):
+        backend = self.server.backend
+        endpoint = self.endpoint()
+        match = PRE_CONFIG_PATH.match(endpoint)
+
+        if method == "GET" and endpoint == "available-pre-configs":
+            return 200, backend.available
+        if method == "GET" and endpoint == "pre-configs":
+            return backend.list_pre_configs(self.query().get("updated_since"))
+        if method == "POST" and endpoint == "pre-configs":
+            return backend.create_pre_config(self.read_body())
+        if method == "GET" and match:
+            return backend.get_pre_config(match.group("id"))
+        if method == "PATCH" and match:
+            return backend.change_pre_config_name(match.group("id"), self.read_body())
+        if method == "OPTIONS" and endpoint == "import-metrics":
+            return 200, {"chunked_imports": True}
+        if method == "POST" and endpoint == "import-metrics":
+            return backend.import_metrics(self.read_body())
+        if method == "POST" and endpoint == "analysis":
+            return backend.analysis(self.read_body())
+
+        self.read_raw_body()
+
+        return 404, {"error": f"Endpoint {method} /{endpoint} not found"}
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PATCH(self):
+        self.handle_request("PATCH")
+
+    def do_OPTIONS(self):
+        self.handle_request("OPTIONS")
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 0),
+        backend=None,
+        latency=0.0,
+        bandwidth=None,
+        error_rate=0.0,
+        max_payload=None,
+        seed=None,
+        verbose=False,
+    ):
+        super().__init__(address, MockRequestHandler)
+
+        self.backend = MockBackend() if backend is None else backend
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.max_payload = max_payload
+        self.verbose = verbose
+        self.requests = []
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+
+        return f"http://{host}:{port}/"
+
+    def chunk_size(self):
+        if self.bandwidth is None:
+            return 64 * 1024
+
+        return max(1, min(64 * 1024, int(self.bandwidth) // 20))
+
+    def throttle(self, size):
+        if self.bandwidth:
+            time.sleep(size / self.bandwidth)
+
+    def should_fail(self):
+        with self.random_lock:
+            return self.error_rate > 0 and self.random.random() < self.error_rate
+
+    def handle_error(self, request, client_address):
+        # Clients that go away mid-request are expected, e.g. on Ctrl-C
+        if self.verbose:
+            super().handle_error(request, client_address)
+
+    def record_request(self, method, endpoint):
+        with self.random_lock:
+            self.requests.append((method, endpoint))
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the MeasureSoftGram service"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every request"
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        default=None,
+        help="Cap of the bytes per second read and written by each request",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Probability of a request failing with a 500 error (0 to 1)",
+    )
+    parser.add_argument(
+        "--max-payload",
+        type=int,
+        default=None,
+        help="Largest accepted request body in bytes, larger ones get a 413 error",
+    )
+    parser.add_argument(
+        "--available",
+        type=Path,
+        default=DEFAULT_AVAILABLE_PATH,
+        help="JSON file with the available-pre-configs catalog",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with open(args.available, "r") as file:
+        backend = MockBackend(json.load(file))
+
+    server = MockServer(
+        (args.host, args.port),
+        backend,
+        args.latency,
+        args.bandwidth,
+        args.error_rate,
+        args.max_payload,
+        args.seed,
+        verbose=True,
+    )
+
+    print(f"MeasureSoftGram mock server listening on {server.url}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+import json
+import re
+import subprocess
+import pytest
+from src.cli import generator
+from tests.mock_server import MockBackend, MockServer
+from tests.test_helpers import read_json
+
+
+def capture(command):
+    proc = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    out, err = proc.communicate()
+    return out, err, proc.returncode
+
+
+@pytest.fixture
+def data_files(tmp_path):
+    pre_config_path = str(tmp_path / "pre_config.json")
+    available_path = str(tmp_path / "available.json")
+    sonar_path = str(tmp_path / "sonar.json")
+
+    generator.generate_pre_config_file(pre_config_path, (2, 2, 3))
+    generator.generate_available_file(available_path, (2, 2, 3))
+    generator.generate_sonar_file(sonar_path, 30, seed=1)
+
+    return pre_config_path, available_path, sonar_path
+
+
+def start_server(monkeypatch, available_path, **options):
+    server = MockServer(backend=MockBackend(read_json(available_path)), **options)
+    monkeypatch.setenv("MEASURESOFTGRAM_URL", server.url)
+
+    return server.start()
+
+
+def test_end_to_end(monkeypatch, data_files):
+    pre_config_path, available_path, sonar_path = data_files
+    server = start_server(monkeypatch, available_path)
+
+    try:
+        out, _, returncode = capture(["measuresoftgram", "create", pre_config_path])
+
+        assert returncode == 0
+        pre_config_id = re.search(r"Pre Configuration ID: (\w+)", out.decode()).group(1)
+
+        out, _, returncode = capture(["measuresoftgram", "list"])
+
+        assert returncode == 0
+        assert pre_config_id in out.decode("utf-8")
+
+        out, _, returncode = capture(["measuresoftgram", "show", pre_config_id])
+
+        assert returncode == 0
+        assert "characteristic_0 (weigth: 50.0)" in out.decode("utf-8")
+
+        out, _, returncode = capture(
+            ["measuresoftgram", "import", sonar_path, pre_config_id, "py"]
+        )
+
+        assert returncode == 0
+        assert "The imported metrics were saved" in out.decode("utf-8")
+
+        out, _, returncode = capture(["measuresoftgram", "analysis", pre_config_id])
+
+        assert returncode == 0
+        assert "The analysis was completed with Success!" in out.decode("utf-8")
+    finally:
+        server.stop()
+
+
+def test_injected_failures(monkeypatch, data_files):
+    _, available_path, _ = data_files
+    server = start_server(monkeypatch, available_path, error_rate=1.0)
+
+    try:
+        out, _, returncode = capture(["measuresoftgram", "list"])
+
+        assert returncode == 0
+        assert "Error: an error occurred while fetching your pre configurations" in (
+            out.decode("utf-8")
+        )
+    finally:
+        server.stop()
+
+
+def test_payload_limit(monkeypatch, data_files):
+    pre_config_path, available_path, _ = data_files
+    server = start_server(monkeypatch, available_path, max_payload=10)
+
+    try:
+        out, _, returncode = capture(["measuresoftgram", "create", pre_config_path])
+
+        assert returncode == 0
+        assert "Payload too large" in out.decode("utf-8")
+    finally:
+        server.stop()
+
+
+def test_resumable_import(monkeypatch, data_files):
+    pre_config_path, available_path, sonar_path = data_files
+    server = start_server(monkeypatch, available_path)
+
+    try:
+        out, _, _ = capture(["measuresoftgram", "create", pre_config_path])
+        pre_config_id = re.search(r"Pre Configuration ID: (\w+)", out.decode()).group(1)
+
+        out, err, returncode = capture(
+            [
+                "measuresoftgram",
+                "import",
+                sonar_path,
+                pre_config_id,
+                "py",
+                "--resume",
+                "--chunk-size",
+                "7",
+            ]
+        )
+
+        assert returncode == 0
+        assert "The imported metrics were saved" in out.decode("utf-8")
+        assert "[4/5] chunk uploaded" in err.decode("utf-8")
+        assert len(server.backend.metrics[pre_config_id]) == 30
+    finally:
+        server.stop()
+
+
+def test_import_memory_report(monkeypatch, data_files, tmp_path):
+    pre_config_path, available_path, sonar_path = data_files
+    server = start_server(monkeypatch, available_path)
+    report_path = str(tmp_path / "memory.json")
+
+    try:
+        out, _, _ = capture(["measuresoftgram", "create", pre_config_path])
+        pre_config_id = re.search(r"Pre Configuration ID: (\w+)", out.decode()).group(1)
+
+        _, _, returncode = capture(
+            [
+                "measuresoftgram",
+                "--memory-report",
+                report_path,
+                "import",
+                sonar_path,
+                pre_config_id,
+                "py",
+            ]
+        )
+
+        report = read_json(report_path)
+
+        assert returncode == 0
+        assert {phase["stage"] for phase in report["phases"]} >= {
+            "read",
+            "validate",
+            "payload_build",
+            "serialize",
+            "send",
+        }
+        assert report["total"]["max_rss_bytes"] > 0
+    finally:
+        server.stop()
+
+
+def test_snapshot_import(monkeypatch, data_files):
+    pre_config_path, available_path, sonar_path = data_files
+    server = start_server(monkeypatch, available_path)
+    snapshot_path = sonar_path.replace(".json", ".msgsnap")
+
+    try:
+        out, _, _ = capture(["measuresoftgram", "create", pre_config_path])
+        pre_config_id = re.search(r"Pre Configuration ID: (\w+)", out.decode()).group(1)
+
+        out, _, returncode = capture(["measuresoftgram", "convert", sonar_path])
+
+        assert returncode == 0
+        assert f"converted to {snapshot_path}" in out.decode("utf-8")
+
+        out, _, returncode = capture(
+            ["measuresoftgram", "import", snapshot_path, pre_config_id, "py"]
+        )
+
+        assert returncode == 0
+        assert "The imported metrics were saved" in out.decode("utf-8")
+        assert len(server.backend.metrics[pre_config_id]) == 30
+    finally:
+        server.stop()
+
+
+@pytest.mark.parametrize("framing", ["json", "ndjson"])
+def test_streamed_import(monkeypatch, data_files, framing):
+    pre_config_path, available_path, sonar_path = data_files
+    server = start_server(monkeypatch, available_path)
+
+    try:
+        out, _, _ = capture(["measuresoftgram", "create", pre_config_path])
+        pre_config_id = re.search(r"Pre Configuration ID: (\w+)", out.decode()).group(1)
+
+        out, _, returncode = capture(
+            ["measuresoftgram", "import", sonar_path, pre_config_id, "py", "--stream", framing]
+        )
+
+        assert returncode == 0
+        assert "The imported metrics were saved" in out.decode("utf-8")
+        assert len(server.backend.metrics[pre_config_id]) == 30
+    finally:
+        server.stop()
+
+
+def test_streamed_payload_limit(monkeypatch, data_files):
+    _, available_path, sonar_path = data_files
+    server = start_server(monkeypatch, available_path, max_payload=1000)
+
+    try:
+        out, _, returncode = capture(
+            ["measuresoftgram", "import", sonar_path, "123", "py", "--stream", "--all-metrics"]
+        )
+
+        assert returncode == 0
+        assert "Payload too large" in out.decode("utf-8")
+    finally:
+        server.stop()
+
+
+def test_batch(monkeypatch, data_files, tmp_path):
+    pre_config_path, available_path, sonar_path = data_files
+    server = start_server(monkeypatch, available_path)
+
+    try:
+        out, _, _ = capture(["measuresoftgram", "create", pre_config_path])
+        pre_config_id = re.search(r"Pre Configuration ID: (\w+)", out.decode()).group(1)
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text(
+            json.dumps(
+                [
+                    {
+                        "name": f"release-{release}",
+                        "file": sonar_path,
+                        "pre_config_id": pre_config_id,
+                        "language_extension": "py",
+                    }
+                    for release in range(3)
+                ]
+            )
+        )
+
+        command = ["measuresoftgram", "--rate-limit", "50", "batch", str(manifest_path)]
+        out, _, returncode = capture(command)
+
+        assert returncode == 0
+        assert "3 succeeded, 0 failed, 0 skipped" in out.decode("utf-8")
+
+        out, _, returncode = capture(command)
+
+        assert "0 succeeded, 0 failed, 3 skipped" in out.decode("utf-8")
+    finally:
+        server.stop()
+
+
+def test_mirror_sync(monkeypatch, data_files):
+    pre_config_path, available_path, _ = data_files
+    server = start_server(monkeypatch, available_path)
+
+    try:
+        out, _, _ = capture(["measuresoftgram", "create", pre_config_path])
+        pre_config_id = re.search(r"Pre Configuration ID: (\w+)", out.decode()).group(1)
+
+        out, _, returncode = capture(["measuresoftgram", "sync"])
+
+        assert returncode == 0
+        assert "1 pre configurations synced" in out.decode("utf-8")
+
+        capture(["measuresoftgram", "change-name", pre_config_id, "renamed"])
+        requests_before = len(server.requests)
+
+        out, err, returncode = capture(["measuresoftgram", "list"])
+
+        assert returncode == 0
+        assert "renamed" in out.decode("utf-8")
+        assert "local mirror" in err.decode("utf-8")
+        assert len(server.requests) == requests_before
+
+        server.backend.pre_configs[pre_config_id]["name"] = "changed elsewhere"
+        server.backend.pre_configs[pre_config_id]["updated_at"] = "9999"
+
+        out, _, _ = capture(["measuresoftgram", "sync"])
+
+        assert "1 pre configurations synced" in out.decode("utf-8")
+        assert server.requests[-1] == ("GET", "pre-configs")
+
+        out, _, _ = capture(["measuresoftgram", "list"])
+
+        assert "changed elsewhere" in out.decode("utf-8")
+
+        out, _, _ = capture(["measuresoftgram", "sync"])
+
+        assert "1 pre configurations synced" in out.decode("utf-8")
+    finally:
+        server.stop()
+
+
+def test_batch_over_backends(monkeypatch, data_files, tmp_path):
+    pre_config_path, available_path, sonar_path = data_files
+    backend = MockBackend(read_json(available_path))
+    servers = [MockServer(backend=backend).start() for _ in range(2)]
+    down = MockServer(backend=backend)
+    down_url = down.url
+    down.server_close()
+    monkeypatch.setenv(
+        "MEASURESOFTGRAM_URL", ",".join([server.url for server in servers] + [down_url])
+    )
+
+    try:
+        out, _, _ = capture(["measuresoftgram", "create", pre_config_path])
+        pre_config_id = re.search(r"Pre Configuration ID: (\w+)", out.decode()).group(1)
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text(
+            json.dumps(
+                [
+                    {
+                        "name": f"release-{release}",
+                        "file": sonar_path,
+                        "pre_config_id": pre_config_id,
+                        "language_extension": "py",
+                    }
+                    for release in range(6)
+                ]
+            )
+        )
+
+        out, err, returncode = capture(["measuresoftgram", "batch", str(manifest_path)])
+
+        assert returncode == 0
+        assert "6 succeeded, 0 failed, 0 skipped" in out.decode("utf-8")
+        assert all(("POST", "import-metrics") in server.requests for server in servers)
+        assert f"{down_url} is failing" in err.decode("utf-8")
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def test_create_many(monkeypatch, data_files, tmp_path):
+    pre_config_path, available_path, _ = data_files
+    server = start_server(monkeypatch, available_path)
+    other_path = str(tmp_path / "other_pre_config.json")
+    generator.generate_pre_config_file(other_path, (2, 2, 3), name="other-pre-config")
+
+    try:
+        out, _, returncode = capture(
+            ["measuresoftgram", "create", pre_config_path, other_path]
+        )
+
+        assert returncode == 0
+        assert len(re.findall(r"Pre Configuration ID: (\w+)", out.decode())) == 2
+        assert server.requests.count(("GET", "available-pre-configs")) == 1
+        assert len(server.backend.pre_configs) == 2
+    finally:
+        server.stop()
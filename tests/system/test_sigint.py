@@ -1,30 +1,73 @@
 import signal
 import subprocess
+import time
 from time import sleep
 import pytest
+from tests.mock_server import MockServer
+from tests.test_helpers import read_json
 
 
-def capture(command):
+def capture(command, signals=1):
     proc = subprocess.Popen(
         command,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
     )
 
-    sleep(0.5)
+    sleep(1)
 
-    proc.send_signal(signal.SIGINT)
+    for _ in range(signals):
+        proc.send_signal(signal.SIGINT)
+        sleep(0.1)
 
     out, err = proc.communicate()
 
     return out, err, proc.returncode
 
 
-@pytest.mark.xfail
-def test_sigint():
-    out, err, returncode = capture(["measuresoftgram", "create"])
+@pytest.fixture
+def slow_server(monkeypatch):
+    server = MockServer(latency=3).start()
+    monkeypatch.setenv("MEASURESOFTGRAM_URL", server.url)
+
+    yield server
+
+    server.stop()
+
+
+def test_sigint(slow_server):
+    out, err, returncode = capture(["measuresoftgram", "list"])
 
     print(out)
     print(err)
-    assert returncode == 0
+    assert returncode == 130
     assert "\n\nExiting MeasureSoftGram..." in out.decode("utf-8")
+    assert len(slow_server.requests) == 1
+
+
+def test_sigint_grace_period(slow_server, tmp_path):
+    metrics_path = str(tmp_path / "metrics.json")
+    start = time.perf_counter()
+    _, _, returncode = capture(
+        [
+            "measuresoftgram",
+            "--grace-period",
+            "0.2",
+            "--metrics-out",
+            metrics_path,
+            "list",
+        ]
+    )
+
+    assert returncode == 130
+    assert time.perf_counter() - start < 2.5
+    assert read_json(metrics_path)["endpoints"] == []
+
+
+def test_second_sigint_forces_exit(slow_server):
+    start = time.perf_counter()
+    out, _, returncode = capture(["measuresoftgram", "list"], signals=2)
+
+    assert returncode == 130
+    assert "Forcing the exit of MeasureSoftGram" in out.decode("utf-8")
+    assert time.perf_counter() - start < 2.5
@@ -0,0 +1,45 @@
+import subprocess
+
+
+def capture(command):
+    proc = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    out, err = proc.communicate()
+    return out, err, proc.returncode
+
+
+def test_validate_valid_files():
+    out, _, returncode = capture(
+        [
+            "measuresoftgram",
+            "validate",
+            "tests/unit/data/sonar.json",
+            "tests/unit/data/measuresoftgramPreConfig.json",
+            "--available",
+            "tests/unit/data/measuresoftgramCoreFormat.json",
+        ]
+    )
+
+    assert returncode == 0
+    assert "2 files validated, 0 invalid" in out.decode("utf-8")
+
+
+def test_validate_invalid_files(tmp_path):
+    (tmp_path / "broken.json").write_text("{")
+
+    out, _, returncode = capture(["measuresoftgram", "validate", str(tmp_path)])
+
+    assert returncode == 1
+    assert "broken.json" in out.decode("utf-8")
+
+
+def test_diff_identical_files():
+    out, _, returncode = capture(
+        ["measuresoftgram", "diff", "tests/unit/data/sonar.json", "tests/unit/data/sonar.json"]
+    )
+
+    assert returncode == 0
+    assert "0 added, 0 removed, 0 changed components" in out.decode("utf-8")
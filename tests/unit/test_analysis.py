@@ -0,0 +1,90 @@
+from io import StringIO
+from src.cli.analysis import parse_analysis_many
+
+
+class DummyResponse:
+    def __init__(self, status_code, mocked_data):
+        self.status_code = status_code
+        self.res = mocked_data
+
+    def json(self):
+        return self.res
+
+
+def analysis_result(sqc, maintainability, reliability):
+    return {
+        "analysis": {
+            "sqc": {"sqc": sqc},
+            "characteristics": {
+                "maintainability": maintainability,
+                "reliability": reliability,
+            },
+        }
+    }
+
+
+ANALYSES = {
+    "62656d15f354349ee4abfc7b": analysis_result(0.6165, 0.5, 0.7142),
+    "62656e79f354349ee4abfc7c": analysis_result(0.8, 0.9, 0.7),
+}
+
+
+def fake_post(url, json, **kwargs):
+    if json["pre_config_id"] in ANALYSES:
+        return DummyResponse(201, ANALYSES[json["pre_config_id"]])
+
+    return DummyResponse(404, {"error": "Pre-Config is not a valid ID"})
+
+
+def test_parse_analysis_many(mocker):
+    mocker.patch("requests.post", side_effect=fake_post)
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_analysis_many(
+            ["62656d15f354349ee4abfc7b", "62656e79f354349ee4abfc7c", "123"],
+            workers=2,
+            use_cache=False,
+        )
+
+        output_lines = fake_out.getvalue().splitlines()
+
+        assert output_lines[0].split() == ["ID", "SQC", "maintainability", "reliability"]
+        assert output_lines[1].split() == [
+            "62656d15f354349ee4abfc7b",
+            "0.6165",
+            "0.5000",
+            "0.7142",
+        ]
+        assert output_lines[2].split() == [
+            "62656e79f354349ee4abfc7c",
+            "0.8000",
+            "0.9000",
+            "0.7000",
+        ]
+        assert output_lines[3].split() == ["123", "-", "-", "-"]
+        assert "Error in 123: Pre-Config is not a valid ID" in fake_out.getvalue()
+
+
+def test_parse_analysis_many_all_pre_configs(mocker):
+    pre_configs = [{"_id": id, "name": id} for id in ANALYSES]
+
+    mocker.patch("requests.get", return_value=DummyResponse(200, pre_configs))
+    post = mocker.patch("requests.post", side_effect=fake_post)
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_analysis_many([], all_pre_configs=True)
+
+        assert post.call_count == 2
+        assert len(fake_out.getvalue().splitlines()) == 3
+
+
+def test_parse_analysis_many_list_error(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(500, {}))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_analysis_many([], all_pre_configs=True)
+
+        assert (
+            "Error: an error occurred while fetching your pre configurations"
+            in fake_out.getvalue()
+        )
@@ -0,0 +1,102 @@
+import pytest
+import requests
+from src.cli import backends, client
+
+
+class DummyResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return {}
+
+
+URLS = ["http://node-a/", "http://node-b/"]
+
+
+@pytest.fixture(autouse=True)
+def two_backends(monkeypatch):
+    monkeypatch.setattr(backends, "backends", [])
+    monkeypatch.setattr(backends, "EJECT_SECONDS", 60.0)
+    backends.configure(URLS)
+
+    return backends.backends
+
+
+def test_least_outstanding_backend_is_picked(two_backends):
+    node_a, node_b = two_backends
+    first = backends.acquire()
+    second = backends.acquire()
+
+    assert {first, second} == {node_a, node_b}
+
+    backends.release(first)
+
+    assert backends.acquire() is first
+
+    backends.release(first)
+    backends.release(second)
+
+    assert backends.acquire() is second
+
+
+def test_failing_backend_is_ejected(two_backends, capsys):
+    node_a, node_b = two_backends
+
+    for _ in range(backends.EJECT_AFTER):
+        node_a.outstanding += 1
+        backends.release(node_a, error=requests.exceptions.ConnectionError())
+
+    assert node_a.ejected_until is not None
+    assert "http://node-a/ is failing" in capsys.readouterr().err
+    assert all(backends.acquire() is node_b for _ in range(5))
+
+
+def test_client_errors_do_not_eject(two_backends):
+    node_a, _ = two_backends
+
+    for _ in range(backends.EJECT_AFTER):
+        node_a.outstanding += 1
+        backends.release(node_a, response=DummyResponse(404))
+
+    assert node_a.ejected_until is None
+
+
+@pytest.mark.parametrize("status_code, readmitted", [(200, True), (503, False)])
+def test_ejected_backend_is_health_checked(mocker, two_backends, status_code, readmitted):
+    node_a, node_b = two_backends
+    node_a.ejections = 1
+    node_a.ejected_until = 0.0
+    node_b.outstanding = 1
+    get = mocker.patch("requests.get", return_value=DummyResponse(status_code))
+
+    picked = backends.acquire()
+
+    get.assert_called_once_with("http://node-a/available-pre-configs", timeout=backends.HEALTH_TIMEOUT)
+    assert (picked is node_a) == readmitted
+    assert (node_a.ejected_until is None) == readmitted
+
+
+def test_all_ejected_uses_the_first_to_come_back(two_backends):
+    node_a, node_b = two_backends
+    node_a.ejected_until = float("inf")
+    node_b.ejected_until = 1e12
+
+    assert backends.acquire() is node_b
+
+
+def test_request_retried_on_another_backend(mocker, two_backends):
+    def get(url, **kwargs):
+        if url.startswith("http://node-a/"):
+            raise requests.exceptions.ConnectionError()
+
+        return DummyResponse(200)
+
+    mocker.patch("requests.get", side_effect=get)
+
+    for _ in range(4):
+        assert client.get("pre-configs").status_code == 200
+
+    assert two_backends[0].ejected_until is not None
+    assert all(backend.outstanding == 0 for backend in two_backends)
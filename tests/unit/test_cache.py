@@ -0,0 +1,124 @@
+import os
+from io import StringIO
+from src.cli import cache
+from src.cli.analysis import parse_analysis
+
+
+class DummyResponse:
+    def __init__(self, status_code, mocked_data):
+        self.status_code = status_code
+        self.res = mocked_data
+
+    def json(self):
+        return self.res
+
+
+PRE_CONFIG = {"_id": "62656d15f354349ee4abfc7b", "name": "pre-config-1"}
+
+RESULTS = {
+    "analysis": {
+        "sqc": {"sqc": 0.5},
+        "subcharacteristics": {},
+        "characteristics": {},
+        "weighted_characteristics": {"sqc": {}},
+        "weighted_subcharacteristics": {},
+        "weighted_measures": {},
+    }
+}
+
+
+def test_analysis_served_from_cache(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(200, PRE_CONFIG))
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, RESULTS))
+
+    for _ in range(2):
+        with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+            parse_analysis(PRE_CONFIG["_id"])
+
+            assert "SQC: 0.5" in fake_out.getvalue()
+
+    assert post.call_count == 1
+
+
+def test_cached_analysis_expires(mocker, monkeypatch):
+    mocker.patch("requests.get", return_value=DummyResponse(200, PRE_CONFIG))
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, RESULTS))
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        parse_analysis(PRE_CONFIG["_id"])
+
+        # Any entry is older than a negative max age
+        monkeypatch.setattr(cache, "MAX_AGE_SECONDS", -1.0)
+        parse_analysis(PRE_CONFIG["_id"])
+
+    assert post.call_count == 2
+
+
+def test_analysis_no_cache(mocker):
+    get = mocker.patch("requests.get", return_value=DummyResponse(200, PRE_CONFIG))
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, RESULTS))
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        parse_analysis(PRE_CONFIG["_id"], use_cache=False)
+        parse_analysis(PRE_CONFIG["_id"], use_cache=False)
+
+    assert get.call_count == 0
+    assert post.call_count == 2
+
+
+def test_fingerprint_changes_after_import(tmp_path):
+    metrics_file = tmp_path / "sonar.json"
+    metrics_file.write_text("{}")
+
+    before = cache.analysis_fingerprint(PRE_CONFIG["_id"], PRE_CONFIG)
+    cache.record_import(PRE_CONFIG["_id"], metrics_file)
+    after = cache.analysis_fingerprint(PRE_CONFIG["_id"], PRE_CONFIG)
+
+    assert before != after
+    assert after != cache.analysis_fingerprint(
+        PRE_CONFIG["_id"], {**PRE_CONFIG, "name": "renamed"}
+    )
+
+
+def test_errors_are_not_cached(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(200, PRE_CONFIG))
+    mocker.patch("requests.post", return_value=DummyResponse(500, {"error": "Boom"}))
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        parse_analysis(PRE_CONFIG["_id"])
+
+    assert list(cache.analysis_cache_dir().glob("*.json")) == []
+
+
+def test_lru_eviction():
+    for index in range(3):
+        cache.store_analysis(str(index), "fingerprint", RESULTS)
+        entry_path = cache.cache_entry_path(str(index), "fingerprint")
+        os.utime(entry_path, (index, index))
+
+    cache.get_cached_analysis("0", "fingerprint")
+
+    # Entries differ in size with the repr of their stored_at time
+    cache.evict(
+        sum(cache.cache_entry_path(id, "fingerprint").stat().st_size for id in ("0", "2"))
+    )
+
+    assert cache.get_cached_analysis("0", "fingerprint") is not None
+    assert cache.get_cached_analysis("1", "fingerprint") is None
+    assert cache.get_cached_analysis("2", "fingerprint") is not None
+
+
+def test_unusable_data_dir(monkeypatch, tmp_path, capsys):
+    data_file = tmp_path / "not-a-directory"
+    data_file.write_text("")
+    monkeypatch.setenv("MEASURESOFTGRAM_HOME", str(data_file))
+
+    fingerprint = cache.analysis_fingerprint(PRE_CONFIG["_id"], PRE_CONFIG)
+    cache.store_analysis(PRE_CONFIG["_id"], fingerprint, RESULTS)
+    cache.record_import(PRE_CONFIG["_id"], "tests/unit/data/sonar.json")
+
+    assert cache.get_cached_analysis(PRE_CONFIG["_id"], fingerprint) is None
+    err = capsys.readouterr().err
+
+    assert "Warning: the analysis was not cached" in err
+    assert "Warning: the import was not recorded in the cache" in err
@@ -0,0 +1,59 @@
+import pytest
+from src.cli import cancellation, client
+from src.cli.exceptions import Cancelled
+
+
+class DummyResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+@pytest.fixture(autouse=True)
+def reset_cancellation(monkeypatch):
+    monkeypatch.setattr(cancellation, "GRACE_SECONDS", 60.0)
+
+    yield
+
+    cancellation.reset()
+
+
+def test_no_request_sent_after_cancel(mocker):
+    get = mocker.patch("requests.get", return_value=DummyResponse(200))
+
+    cancellation.cancel()
+
+    with pytest.raises(Cancelled):
+        client.get("pre-configs")
+
+    assert get.call_count == 0
+
+
+def test_cancel_stops_retries(mocker, monkeypatch):
+    monkeypatch.setattr(client, "BACKOFF_BASE", 60.0)
+
+    def fake_get(url, **kwargs):
+        cancellation.cancel()
+        return DummyResponse(503)
+
+    get = mocker.patch("requests.get", side_effect=fake_get)
+
+    with pytest.raises(Cancelled):
+        client.get("pre-configs")
+
+    assert get.call_count == 1
+
+
+def test_second_cancel_forces_exit(mocker):
+    exit = mocker.patch("os._exit")
+    flushed = []
+    cancellation.register_flush(lambda: flushed.append(True))
+
+    cancellation.cancel()
+
+    assert exit.call_count == 0
+
+    cancellation.cancel()
+
+    exit.assert_called_once_with(cancellation.EXIT_CANCELLED)
+    assert flushed == [True]
@@ -0,0 +1,136 @@
+import threading
+import time
+import pytest
+import requests
+import urllib3
+from src.cli import client
+
+
+class DummyResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return {}
+
+
+def refused_error():
+    reason = urllib3.exceptions.NewConnectionError(None, "Connection refused")
+
+    return requests.exceptions.ConnectionError(
+        urllib3.exceptions.MaxRetryError(None, "/analysis", reason)
+    )
+
+
+def test_get_retried_on_server_error(mocker):
+    get = mocker.patch(
+        "requests.get", side_effect=[DummyResponse(503), DummyResponse(200)]
+    )
+
+    assert client.get("pre-configs").status_code == 200
+    assert get.call_count == 2
+
+
+def test_get_retries_are_limited(mocker):
+    get = mocker.patch("requests.get", return_value=DummyResponse(500))
+
+    assert client.get("pre-configs").status_code == 500
+    assert get.call_count == client.RETRIES + 1
+
+
+def test_get_retried_on_read_timeout(mocker):
+    get = mocker.patch(
+        "requests.get",
+        side_effect=[requests.exceptions.ReadTimeout(), DummyResponse(200)],
+    )
+
+    assert client.get("pre-configs").status_code == 200
+    assert get.call_count == 2
+
+
+@pytest.mark.parametrize("status_code, calls", [(500, 1), (502, 1), (503, 2)])
+def test_post_retried_only_when_not_processed(mocker, status_code, calls):
+    post = mocker.patch(
+        "requests.post", side_effect=[DummyResponse(status_code), DummyResponse(201)]
+    )
+
+    client.post("analysis", json={"pre_config_id": "abc"})
+
+    assert post.call_count == calls
+
+
+def test_post_retried_when_connection_refused(mocker):
+    post = mocker.patch(
+        "requests.post", side_effect=[refused_error(), DummyResponse(201)]
+    )
+
+    assert client.post("analysis").status_code == 201
+    assert post.call_count == 2
+
+
+def test_post_not_retried_on_read_timeout(mocker):
+    post = mocker.patch("requests.post", side_effect=requests.exceptions.ReadTimeout())
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.post("import-metrics")
+
+    assert post.call_count == 1
+
+
+def test_timeouts(mocker):
+    get = mocker.patch("requests.get", return_value=DummyResponse(200))
+    post = mocker.patch("requests.post", return_value=DummyResponse(201))
+    mocker.patch.dict(client.TIMEOUTS)
+
+    client.configure(timeouts=dict([client.parse_timeout("analysis=200")]))
+    client.get("pre-configs/abc")
+    client.post("analysis")
+
+    assert get.call_args.kwargs["timeout"] == client.TIMEOUTS["default"]
+    assert post.call_args.kwargs["timeout"] == (5.0, 200.0)
+
+
+def test_parse_timeout():
+    assert client.parse_timeout("10") == ("default", (5.0, 10.0))
+    assert client.parse_timeout("import-metrics=600") == (
+        "import-metrics",
+        (5.0, 600.0),
+    )
+
+
+def test_hedged_get(mocker):
+    release = threading.Event()
+    responses = iter([("slow", 200), ("fast", 200)])
+
+    def fake_get(url, **kwargs):
+        name, status_code = next(responses)
+
+        if name == "slow":
+            release.wait(5)
+
+        response = DummyResponse(status_code)
+        response.name = name
+        return response
+
+    mocker.patch("requests.get", side_effect=fake_get)
+    mocker.patch.object(client, "HEDGE_AFTER", 0.01)
+
+    try:
+        assert client.get("pre-configs").name == "fast"
+    finally:
+        release.set()
+
+
+def test_rate_limit_spaces_requests_per_host(monkeypatch):
+    monkeypatch.setattr(client, "RATE_LIMIT", 20.0)
+    monkeypatch.setattr(client, "next_request_times", {})
+
+    start = time.monotonic()
+
+    for _ in range(3):
+        client.wait_rate_limit("http://first:5000/pre-configs")
+
+    client.wait_rate_limit("http://second:5000/pre-configs")
+
+    assert 0.09 <= time.monotonic() - start < 0.5
@@ -1,8 +1,22 @@
+import json
 import pytest
+from concurrent.futures import Future
+from io import StringIO
 from src.cli import create, exceptions
+from src.cli.cliRunner import parse_create
 from tests.test_helpers import read_json
 
 
+class DummyResponse:
+    def __init__(self, status_code, res_data):
+        self.status_code = status_code
+        self.res_data = res_data
+        self.text = json.dumps(res_data)
+
+    def json(self):
+        return self.res_data
+
+
 def test_pre_config_file_reader():
     available_pre_config = read_json("tests/unit/data/measuresoftgramCoreFormat.json")
 
@@ -488,3 +502,50 @@ def test_ordenate_subcharacteristics():
     ordenated_subcharacteristics = create.ordenate_subcharacteristics(subcharacteristics)
 
     assert ordenated_subcharacteristics == ["modifiability", "testing_status"]
+
+
+def test_pre_config_file_reader_joins_catalog_future():
+    available_pre_config = Future()
+    available_pre_config.set_result(
+        read_json("tests/unit/data/measuresoftgramCoreFormat.json")
+    )
+
+    pre_config = create.pre_config_file_reader(
+        "tests/unit/data/measuresoftgramPreConfig.json", available_pre_config
+    )
+
+    assert pre_config["measures"][0] == "passed_tests"
+
+
+def test_pre_config_file_reader_validates_file_before_catalog(tmp_path):
+    pre_config_path = tmp_path / "pre_config.json"
+    pre_config_path.write_text(json.dumps({"characteristics": [{"weight": 100}]}))
+    available_pre_config = Future()
+    available_pre_config.set_exception(RuntimeError("catalog fetch failed"))
+
+    with pytest.raises(exceptions.UnableToReadFile):
+        create.pre_config_file_reader(str(pre_config_path), available_pre_config)
+
+
+def test_parse_create_many_files(mocker):
+    get = mocker.patch(
+        "requests.get",
+        return_value=DummyResponse(
+            200, read_json("tests/unit/data/measuresoftgramCoreFormat.json")
+        ),
+    )
+    post = mocker.patch(
+        "requests.post", return_value=DummyResponse(201, {"_id": "6261b76c974ddbc76bdea7af"})
+    )
+    paths = ["tests/unit/data/measuresoftgramPreConfig.json", "tests/unit/data/missing.txt"]
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_create(paths, workers=2)
+
+        output = fake_out.getvalue()
+
+    assert get.call_count == 1
+    assert post.call_count == 1
+    assert output.index("Pre Configuration ID: 6261b76c974ddbc76bdea7af") < output.index(
+        "Error: "
+    )
@@ -0,0 +1,127 @@
+import json
+from io import StringIO
+import pytest
+from src.cli import diff
+from tests.test_helpers import read_json
+
+SONAR_PATH = "tests/unit/data/sonar.json"
+
+
+@pytest.fixture
+def releases(tmp_path):
+    old = read_json(SONAR_PATH)
+    new = read_json(SONAR_PATH)
+
+    removed = new["components"].pop(0)
+    new["components"].append(dict(removed, key="added:component"))
+
+    changed = new["components"][0]
+    changed["old_value"] = changed["measures"][0]["value"]
+    changed["measures"][0]["value"] = str(float(changed["old_value"]) + 2)
+
+    old_path = tmp_path / "old.json"
+    new_path = tmp_path / "new.json"
+    old_path.write_text(json.dumps(old))
+    new_path.write_text(json.dumps(new))
+
+    return str(old_path), str(new_path), removed["key"], changed
+
+
+def expected_rows(removed_key, changed):
+    return [
+        {"status": "added", "key": "added:component", "metric": "", "old": "", "new": "", "delta": ""},
+        {"status": "removed", "key": removed_key, "metric": "", "old": "", "new": "", "delta": ""},
+        {
+            "status": "changed",
+            "key": changed["key"],
+            "metric": changed["measures"][0]["metric"],
+            "old": changed["old_value"],
+            "new": changed["measures"][0]["value"],
+            "delta": 2.0,
+        },
+    ]
+
+
+def sorted_rows(rows):
+    return sorted(rows, key=lambda row: (row["status"], row["key"]))
+
+
+def test_diff_files_in_memory(releases):
+    old_path, new_path, removed_key, changed = releases
+
+    rows = list(diff.diff_files(old_path, new_path))
+
+    assert sorted_rows(rows) == sorted_rows(expected_rows(removed_key, changed))
+
+
+def test_diff_files_partitioned_matches_in_memory(releases):
+    old_path, new_path, _, _ = releases
+
+    in_memory = list(diff.diff_files(old_path, new_path))
+    partitioned = list(diff.diff_files(old_path, new_path, memory_budget=1024))
+
+    assert diff.partitions_for([old_path, new_path], 1024) > 1
+    assert sorted_rows(partitioned) == sorted_rows(in_memory)
+
+
+def test_diff_identical_files():
+    assert list(diff.diff_files(SONAR_PATH, SONAR_PATH)) == []
+
+
+def test_diff_measures_added_and_removed_metrics():
+    rows = list(diff.diff_measures("key", {"a": "1", "b": "x"}, {"a": "1", "c": "2"}))
+
+    assert rows == [
+        {"status": "changed", "key": "key", "metric": "b", "old": "x", "new": "", "delta": ""},
+        {"status": "changed", "key": "key", "metric": "c", "old": "", "new": "2", "delta": ""},
+    ]
+
+
+def test_parse_diff_text(mocker, releases):
+    old_path, new_path, removed_key, changed = releases
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        diff.parse_diff(old_path, new_path)
+        output = fake_out.getvalue()
+
+    assert "+ added:component" in output
+    assert f"- {removed_key}" in output
+    assert f"~ {changed['key']} {changed['measures'][0]['metric']}:" in output
+    assert "(+2)" in output
+    assert "1 added, 1 removed, 1 changed components" in output
+
+
+def test_parse_diff_jsonl(mocker, releases):
+    old_path, new_path, removed_key, changed = releases
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        diff.parse_diff(old_path, new_path, output_format="jsonl")
+        rows = [json.loads(line) for line in fake_out.getvalue().splitlines()]
+
+    assert sorted_rows(rows) == sorted_rows(expected_rows(removed_key, changed))
+
+
+def test_parse_diff_invalid_file(mocker, tmp_path):
+    broken_path = tmp_path / "broken.json"
+    broken_path.write_text("{")
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        diff.parse_diff(str(broken_path), SONAR_PATH)
+        output = fake_out.getvalue()
+
+    assert "Error:  Failed to decode the JSON file" in output
+
+
+def test_parse_diff_missing_file(mocker, tmp_path):
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        diff.parse_diff(str(tmp_path / "missing.json"), SONAR_PATH)
+        output = fake_out.getvalue()
+
+    assert "Error:  The file was not found" in output
+
+
+def test_partition_rows_are_streamed():
+    rows = diff.diff_partition([("b", {"a": "1"}), ("a", {"a": "2"})], [("b", {"a": "1"}), ("c", {})])
+
+    assert next(rows) == diff.component_row("removed", "a")
+    assert list(rows) == [diff.component_row("added", "c")]
@@ -0,0 +1,69 @@
+import pytest
+from src.cli import create, exceptions, generator, jsonReader
+from tests.test_helpers import read_json
+
+
+@pytest.mark.parametrize("count", [1, 3, 7, 30, 6400])
+def test_split_weights(count):
+    weights = generator.split_weights(count)
+
+    assert len(weights) == count
+    assert sum(weights) == 100.0
+    assert all(create.validate_weight_value(weight) for weight in weights)
+
+
+def test_split_weights_too_many_items():
+    with pytest.raises(exceptions.InvalidWeight):
+        generator.split_weights(6401)
+
+
+@pytest.mark.parametrize("distribution", generator.DISTRIBUTIONS)
+def test_generate_sonar_file(tmp_path, distribution):
+    output_path = str(tmp_path / "sonar.json")
+
+    generator.generate_sonar_file(output_path, 50, distribution, seed=1)
+
+    components = jsonReader.file_reader(output_path)
+
+    assert len(components) == 50
+    assert {component["qualifier"] for component in components} == {
+        "DIR",
+        "UTS",
+        "FIL",
+    }
+    assert [measure["metric"] for measure in components[1]["measures"]] == (
+        jsonReader.METRICS_SONAR
+    )
+
+
+def test_generate_sonar_file_is_reproducible(tmp_path):
+    generator.generate_sonar_file(str(tmp_path / "a.json"), 20, seed=7)
+    generator.generate_sonar_file(str(tmp_path / "b.json"), 20, seed=7)
+
+    assert read_json(tmp_path / "a.json") == read_json(tmp_path / "b.json")
+
+
+def test_generate_sonar_file_invalid_values(tmp_path):
+    output_path = str(tmp_path / "sonar.json")
+
+    generator.generate_sonar_file(output_path, 10, invalid_rate=1.0, seed=1)
+
+    with pytest.raises(exceptions.InvalidMetricException):
+        jsonReader.file_reader(output_path)
+
+
+@pytest.mark.parametrize("breadth", [(1, 1, 1), (3, 7, 11), (2, 5, 30)])
+def test_generate_pre_config_file(tmp_path, breadth):
+    pre_config_path = str(tmp_path / "pre_config.json")
+    available_path = str(tmp_path / "available.json")
+
+    generator.generate_pre_config_file(pre_config_path, breadth)
+    generator.generate_available_file(available_path, breadth)
+
+    pre_config = create.pre_config_file_reader(
+        pre_config_path, read_json(available_path)
+    )
+
+    assert len(pre_config["characteristics"]) == breadth[0]
+    assert len(pre_config["subcharacteristics"]) == breadth[0] * breadth[1]
+    assert len(pre_config["measures"]) == breadth[0] * breadth[1] * breadth[2]
@@ -0,0 +1,156 @@
+import json
+from io import StringIO
+from src.cli import history
+from src.cli.analysis import request_analysis
+
+DAY = 24 * 60 * 60 * 1000
+
+ID = "62656d15f354349ee4abfc7b"
+
+
+class DummyResponse:
+    def __init__(self, status_code, mocked_data):
+        self.status_code = status_code
+        self.res = mocked_data
+
+    def json(self):
+        return self.res
+
+
+def analysis_result(sqc, maintainability, reliability):
+    return {
+        "analysis": {
+            "sqc": {"sqc": sqc},
+            "characteristics": {
+                "maintainability": maintainability,
+                "reliability": reliability,
+            },
+        }
+    }
+
+
+def test_record_and_query_history():
+    history.record_analysis(ID, analysis_result(0.6, 0.5, 0.7), analysed_at=1 * DAY)
+    history.record_analysis(ID, analysis_result(0.8, 0.9, 0.7), analysed_at=2 * DAY)
+    history.record_analysis("other", analysis_result(0.1, 0.1, 0.1), analysed_at=2 * DAY)
+
+    assert history.query_history([ID], ["reliability"], since=2 * DAY) == [
+        (ID, 2 * DAY, "reliability", 0.7),
+        (ID, 2 * DAY, "sqc", 0.8),
+    ]
+
+    assert len(history.query_history(until=1 * DAY)) == 3
+    assert len(history.query_history()) == 9
+
+
+def test_history_uses_the_indexes():
+    connection = history.connect()
+
+    for ids, characteristics in [([ID], ["reliability"]), (None, ["reliability"]), (None, None)]:
+        query, parameters = history.history_query(ids, characteristics, 0, DAY)
+        plan = connection.execute("EXPLAIN QUERY PLAN " + query, parameters).fetchall()
+
+        assert "USING" in plan[0][-1] and "INDEX" in plan[0][-1]
+
+    connection.close()
+
+
+def test_analysis_is_recorded(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(404, {"error": "no"}))
+    mocker.patch(
+        "requests.post", return_value=DummyResponse(201, analysis_result(0.6, 0.5, 0.7))
+    )
+
+    request_analysis(ID)
+
+    assert sorted(row[2] for row in history.query_history([ID])) == [
+        "maintainability",
+        "reliability",
+        "sqc",
+    ]
+
+
+def test_failed_analysis_is_not_recorded(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(404, {"error": "no"}))
+    mocker.patch("requests.post", return_value=DummyResponse(404, {"error": "no"}))
+
+    request_analysis(ID)
+
+    assert history.query_history() == []
+
+
+def test_parse_history_text(mocker):
+    history.record_analysis(ID, analysis_result(0.6, 0.5, 0.7))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        history.parse_history([ID])
+        output = fake_out.getvalue()
+
+    assert "maintainability" in output
+    assert "0.6000" in output
+    assert ID in output
+
+
+def test_parse_history_jsonl(mocker):
+    history.record_analysis(ID, analysis_result(0.6, 0.5, 0.7), analysed_at=DAY)
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        history.parse_history(output_format="jsonl", since="1970-01-01T00:00:00+00:00")
+        rows = [json.loads(line) for line in fake_out.getvalue().splitlines()]
+
+    assert rows[-1] == {
+        "pre_config_id": ID,
+        "analysed_at": "1970-01-02T00:00:00+00:00",
+        "name": "sqc",
+        "value": 0.6,
+    }
+
+
+def test_parse_history_empty_and_invalid_date(mocker):
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        history.parse_history()
+        history.parse_history(since="yesterday")
+        output = fake_out.getvalue()
+
+    assert "There are no analyses in the history for this query" in output
+    assert "Error: invalid date." in output
+
+
+def test_cached_analysis_is_not_recorded_again(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(200, {"_id": ID}))
+    mocker.patch(
+        "requests.post", return_value=DummyResponse(201, analysis_result(0.6, 0.5, 0.7))
+    )
+
+    request_analysis(ID)
+    request_analysis(ID)
+
+    assert len({row[1] for row in history.query_history([ID])}) == 1
+
+
+def test_until_date_includes_the_whole_day(mocker):
+    analysed_at = history.parse_time("2022-05-01T18:30:00")
+    history.record_analysis(ID, analysis_result(0.6, 0.5, 0.7), analysed_at=analysed_at)
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        history.parse_history(since="2022-05-01", until="2022-05-01", output_format="jsonl")
+        rows = fake_out.getvalue().splitlines()
+
+    assert len(rows) == 3
+    assert history.parse_time("2022-05-01", end_of_day=True) == (
+        history.parse_time("2022-05-02") - 1
+    )
+
+
+def test_unusable_data_dir(mocker, monkeypatch, tmp_path, capsys):
+    data_file = tmp_path / "not-a-directory"
+    data_file.write_text("")
+    monkeypatch.setenv("MEASURESOFTGRAM_HOME", str(data_file))
+    mocker.patch("requests.get", return_value=DummyResponse(404, {"error": "no"}))
+    mocker.patch(
+        "requests.post", return_value=DummyResponse(201, analysis_result(0.6, 0.5, 0.7))
+    )
+
+    request_analysis(ID)
+
+    assert "Warning: the analysis was not saved in the history" in capsys.readouterr().err
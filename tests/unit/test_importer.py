@@ -0,0 +1,318 @@
+import json
+from io import StringIO
+import pytest
+import requests
+from src.cli import checkpoint
+from src.cli.importer import components_sha256, parse_import, read_components
+from src.cli.jsonReader import build_component_filter
+from tests.test_helpers import read_json
+
+SONAR_PATH = "tests/unit/data/sonar.json"
+
+PRE_CONFIG_ID = "62656d15f354349ee4abfc7b"
+
+
+AVAILABLE = read_json("tests/unit/data/measuresoftgramCoreFormat.json")
+
+
+class DummyResponse:
+    def __init__(self, status_code, mocked_data):
+        self.status_code = status_code
+        self.res = mocked_data
+        self.text = json.dumps(mocked_data)
+
+    def json(self):
+        return self.res
+
+
+def fake_get(measures):
+    def get(url, **kwargs):
+        if url.endswith("available-pre-configs"):
+            return DummyResponse(200, AVAILABLE)
+
+        return DummyResponse(200, {"_id": PRE_CONFIG_ID, "measures": measures})
+
+    return get
+
+
+@pytest.fixture(autouse=True)
+def pre_config(mocker):
+    return mocker.patch(
+        "requests.get", side_effect=fake_get(["test_builds", "test_coverage"])
+    )
+
+
+@pytest.fixture(autouse=True)
+def chunked_imports(mocker):
+    return mocker.patch(
+        "requests.options", return_value=DummyResponse(200, {"chunked_imports": True})
+    )
+
+
+def chunk_responses(fail_at=None):
+    def fake_post(url, data, **kwargs):
+        chunk = json.loads(data)["chunk"]
+
+        if chunk["index"] == fail_at:
+            raise requests.exceptions.ConnectionError("Connection aborted")
+
+        if chunk["index"] == chunk["total"] - 1:
+            return DummyResponse(201, {})
+
+        return DummyResponse(202, {"received": chunk["index"]})
+
+    return fake_post
+
+
+def upload_hash(**kwargs):
+    return components_sha256(read_components(SONAR_PATH, PRE_CONFIG_ID, **kwargs), "py")
+
+
+def sent_chunks(post):
+    return [json.loads(call.kwargs["data"])["chunk"] for call in post.call_args_list]
+
+
+def test_resumable_import_continues_after_failure(mocker):
+    post = mocker.patch("requests.post", side_effect=chunk_responses(fail_at=2))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", resume=True, chunk_size=1)
+
+        assert "--resume to continue" in fake_out.getvalue()
+
+    saved = checkpoint.load_checkpoint(upload_hash(), PRE_CONFIG_ID)
+
+    assert saved["acknowledged"] == 2
+
+    post = mocker.patch("requests.post", side_effect=chunk_responses())
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", resume=True, chunk_size=1)
+
+        assert "Resuming the import at chunk 3 of 5" in fake_out.getvalue()
+        assert "The imported metrics were saved" in fake_out.getvalue()
+
+    chunks = sent_chunks(post)
+
+    assert chunks[0]["index"] == 2
+    assert chunks[-1]["index"] == chunks[0]["total"] - 1
+    assert {c["upload_id"] for c in chunks} == {saved["upload_id"]}
+    assert checkpoint.load_checkpoint(upload_hash(), PRE_CONFIG_ID) is None
+
+
+def test_resumable_import_restarts_discarded_upload(mocker):
+    stale = checkpoint.new_checkpoint(upload_hash(), PRE_CONFIG_ID, 1, 5)
+    stale["acknowledged"] = 2
+    checkpoint.save_checkpoint(stale)
+
+    fake_post = chunk_responses()
+
+    def forget_upload(url, data, **kwargs):
+        if json.loads(data)["chunk"]["upload_id"] == stale["upload_id"]:
+            return DummyResponse(404, {"chunk": "There is no upload with this ID"})
+
+        return fake_post(url, data, **kwargs)
+
+    post = mocker.patch("requests.post", side_effect=forget_upload)
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", resume=True, chunk_size=1)
+
+        assert "starting over" in fake_out.getvalue()
+        assert "The imported metrics were saved" in fake_out.getvalue()
+
+    assert [c["index"] for c in sent_chunks(post)][1] == 0
+
+
+def test_changed_filter_starts_over(mocker):
+    mocker.patch("requests.post", side_effect=chunk_responses(fail_at=2))
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", resume=True, chunk_size=1)
+
+    post = mocker.patch("requests.post", side_effect=chunk_responses())
+    component_filter = build_component_filter(exclude_qualifiers=["UTS"])
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(
+            SONAR_PATH,
+            PRE_CONFIG_ID,
+            "py",
+            resume=True,
+            chunk_size=1,
+            component_filter=component_filter,
+        )
+
+        assert "Resuming" not in fake_out.getvalue()
+        assert "The imported metrics were saved" in fake_out.getvalue()
+
+    chunks = sent_chunks(post)
+
+    assert [c["index"] for c in chunks] == [0, 1, 2]
+    assert {c["total"] for c in chunks} == {3}
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"return_value": DummyResponse(405, {"detail": "Method not allowed"})},
+        {"return_value": DummyResponse(200, {"name": "Import Metrics"})},
+        {"side_effect": requests.exceptions.ConnectionError("Connection aborted")},
+    ],
+)
+def test_service_without_chunked_imports(mocker, options):
+    mocker.patch("requests.options", **options)
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, {}))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", resume=True, chunk_size=1)
+
+        assert "uploading the file at once" in fake_out.getvalue()
+        assert "The imported metrics were saved" in fake_out.getvalue()
+
+    assert post.call_count == 1
+    assert "chunk" not in json.loads(post.call_args.kwargs["data"])
+    assert checkpoint.load_checkpoint(upload_hash(), PRE_CONFIG_ID) is None
+
+
+def test_chunk_saved_as_complete_import(mocker):
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, {}))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", resume=True, chunk_size=1)
+
+        assert "does not support resumable imports" in fake_out.getvalue()
+        assert "The imported metrics were saved" not in fake_out.getvalue()
+
+    assert post.call_count == 1
+    assert checkpoint.load_checkpoint(upload_hash(), PRE_CONFIG_ID) is None
+
+
+def test_rejected_import_removes_checkpoint(mocker):
+    mocker.patch(
+        "requests.post",
+        return_value=DummyResponse(422, {"__all__": "Missing metrics: coverage"}),
+    )
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", resume=True, chunk_size=1)
+
+        assert "General => Missing metrics: coverage" in fake_out.getvalue()
+
+    assert checkpoint.load_checkpoint(upload_hash(), PRE_CONFIG_ID) is None
+
+
+def test_import_uploads_only_required_metrics(mocker):
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, {}))
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py")
+
+    components = json.loads(post.call_args.kwargs["data"])["components"]
+    metrics = {m["metric"] for c in components for m in c["measures"]}
+
+    assert metrics == {"tests", "test_execution_time", "coverage"}
+    assert all(set(m) == {"metric", "value"} for c in components for m in c["measures"])
+    assert all("id" not in c for c in components)
+
+
+def test_import_all_metrics(mocker, pre_config):
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, {}))
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", all_metrics=True)
+
+    components = json.loads(post.call_args.kwargs["data"])["components"]
+
+    assert components == read_json(SONAR_PATH)["components"]
+    assert pre_config.call_count == 0
+
+
+def test_import_fails_fast_on_missing_metrics(mocker):
+    mocker.patch("requests.get", side_effect=fake_get(["passed_tests"]))
+    post = mocker.patch("requests.post")
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py")
+
+        assert "Missing metrics: test_success_density" in fake_out.getvalue()
+
+    assert post.call_count == 0
+
+
+def test_import_filtered_components(mocker):
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, {}))
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        parse_import(
+            SONAR_PATH,
+            PRE_CONFIG_ID,
+            "py",
+            component_filter=build_component_filter(exclude_qualifiers=["UTS"]),
+        )
+
+    components = json.loads(post.call_args.kwargs["data"])["components"]
+
+    assert components
+    assert all(c["qualifier"] != "UTS" for c in components)
+
+
+@pytest.mark.parametrize("framing", ["json", "ndjson"])
+def test_streamed_import(mocker, framing):
+    bodies = []
+
+    def fake_post(url, data, **kwargs):
+        bodies.append((b"".join(data), kwargs["headers"]["Content-Type"]))
+        return DummyResponse(201, {})
+
+    mocker.patch("requests.post", side_effect=fake_post)
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", framing=framing, all_metrics=True)
+
+        assert "The imported metrics were saved" in fake_out.getvalue()
+
+    body, content_type = bodies[0]
+
+    if framing == "ndjson":
+        assert content_type == "application/x-ndjson"
+        header, *components = [json.loads(line) for line in body.splitlines()]
+    else:
+        assert content_type == "application/json"
+        header = json.loads(body)
+        components = header.pop("components")
+
+    assert header == {"pre_config_id": PRE_CONFIG_ID, "language_extension": "py"}
+    assert components == read_json(SONAR_PATH)["components"]
+
+
+def test_streamed_import_retry_sends_whole_body(mocker):
+    bodies = []
+
+    def fake_post(url, data, **kwargs):
+        bodies.append(b"".join(data))
+        return DummyResponse(503 if len(bodies) == 1 else 201, {})
+
+    mocker.patch("requests.post", side_effect=fake_post)
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        parse_import(SONAR_PATH, PRE_CONFIG_ID, "py", framing="json")
+
+    assert len(bodies) == 2
+    assert bodies[0] == bodies[1]
+    assert len(json.loads(bodies[1])["components"]) == 5
+
+
+def test_streamed_import_invalid_file(mocker, tmp_path):
+    sonar_path = tmp_path / "sonar.json"
+    sonar_json = read_json(SONAR_PATH)
+    sonar_json["components"][-1]["measures"][0]["value"] = "NaN"
+    sonar_path.write_text(json.dumps(sonar_json))
+    post = mocker.patch("requests.post")
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_import(str(sonar_path), PRE_CONFIG_ID, "py", framing="json")
+
+        assert "Invalid metric value" in fake_out.getvalue()
+
+    assert post.call_count == 0
@@ -359,3 +359,87 @@ class TestCheckSonarFormat:
             jsonReader.check_sonar_format(json_data)
 
         assert error_msg in str(error.value)
+
+
+class TestIterComponents:
+    """
+    Tests iter_components and the filtered file reader
+    """
+
+    @pytest.mark.parametrize("read_size", [7, 1024 * 1024])
+    def test_same_as_json_load(self, read_size, monkeypatch):
+        """
+        Test streamed components match the whole file, whatever the read size
+        """
+
+        monkeypatch.setattr(jsonReader, "READ_SIZE", read_size)
+        json_data = jsonReader.open_json_file("tests/unit/data/sonar.json")
+        header = {}
+
+        components = list(
+            jsonReader.iter_components("tests/unit/data/sonar.json", header)
+        )
+
+        assert components == json_data["components"]
+        assert header["baseComponent"] == json_data["baseComponent"]
+
+    def test_file_invalid_json(self):
+        """
+        Test when the file is an invalid JSON
+        """
+
+        with pytest.raises(exceptions.InvalidMetricsJsonFile) as error:
+            jsonReader.open_filtered_json_file(
+                "tests/unit/data/invalid_json.json", lambda component: True
+            )
+
+        assert "Failed to decode the JSON file." in str(error.value)
+
+    def test_no_component_left(self):
+        """
+        Test when the filter rejects every component
+        """
+
+        with pytest.raises(exceptions.InvalidMetricsJsonFile) as error:
+            jsonReader.file_reader(
+                "tests/unit/data/sonar.json", lambda component: False
+            )
+
+        assert "It must have at least one component" in str(error.value)
+
+
+class TestBuildComponentFilter:
+    """
+    Tests build_component_filter function
+    """
+
+    COMPONENTS = [
+        {"qualifier": "DIR", "path": "src"},
+        {"qualifier": "FIL", "path": "src/app.py", "language": "py"},
+        {"qualifier": "FIL", "path": "vendor/lib.js", "language": "js"},
+        {"qualifier": "UTS", "path": "tests/test_app.py", "language": "py"},
+    ]
+
+    @pytest.mark.parametrize(
+        "options, expected_paths",
+        [
+            ({"include_qualifiers": ["FIL"]}, ["src/app.py", "vendor/lib.js"]),
+            ({"exclude_qualifiers": ["DIR", "UTS"]}, ["src/app.py", "vendor/lib.js"]),
+            ({"languages": ["py"]}, ["src/app.py", "tests/test_app.py"]),
+            ({"include_paths": ["src/*"]}, ["src/app.py"]),
+            ({"exclude_paths": ["vendor/*", "re:^tests/"]}, ["src", "src/app.py"]),
+            (
+                {"include_paths": [r"re:\.py$"], "exclude_qualifiers": ["UTS"]},
+                ["src/app.py"],
+            ),
+        ],
+    )
+    def test_filter(self, options, expected_paths):
+        component_filter = jsonReader.build_component_filter(**options)
+
+        assert [
+            c["path"] for c in self.COMPONENTS if component_filter(c)
+        ] == expected_paths
+
+    def test_no_options(self):
+        assert jsonReader.build_component_filter() is None
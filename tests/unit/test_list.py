@@ -1,3 +1,5 @@
+import json
+import pytest
 import re
 from io import StringIO
 from src.cli.list import parse_list
@@ -89,3 +91,33 @@ def test_error_in_pre_config_list(mocker):
             "Error: an error occurred while fetching your pre configurations"
             in fake_out.getvalue()
         )
+
+
+@pytest.mark.parametrize("output_format", ["json", "jsonl"])
+def test_pre_configs_list_json(mocker, output_format):
+    mocker.patch("requests.get", return_value=DummyResponse(200))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_list(output_format)
+
+        if output_format == "json":
+            pre_configs = json.loads(fake_out.getvalue())
+        else:
+            pre_configs = [json.loads(line) for line in fake_out.getvalue().splitlines()]
+
+        assert pre_configs == DummyResponse(200).json()
+
+
+def test_pre_configs_list_csv(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(200))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_list("csv")
+
+        output_lines = fake_out.getvalue().splitlines()
+
+        assert output_lines[0] == "_id,name,created_at"
+        assert output_lines[1] == (
+            "62656d15f354349ee4abfc7b,pre-config-1,2022-04-24 15:30:29+00:00"
+        )
+        assert len(output_lines) == 4
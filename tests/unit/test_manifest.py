@@ -0,0 +1,162 @@
+import json
+from io import StringIO
+import pytest
+from pathlib import Path
+from src.cli import exceptions, manifest
+from src.cli.manifest import load_manifest, parse_batch
+
+SONAR_PATH = "tests/unit/data/sonar.json"
+
+
+class DummyResponse:
+    def __init__(self, status_code, mocked_data):
+        self.status_code = status_code
+        self.text = mocked_data if isinstance(mocked_data, str) else json.dumps(mocked_data)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def write_manifest(tmp_path, entries, name="manifest.json"):
+    manifest_path = tmp_path / name
+    manifest_path.write_text(json.dumps({"entries": entries}))
+
+    return manifest_path
+
+
+def file_entry(name, pre_config_id="abc", file_path=SONAR_PATH):
+    return {
+        "name": name,
+        "file": str(Path(file_path).absolute()),
+        "pre_config_id": pre_config_id,
+        "language_extension": "py",
+        "all_metrics": True,
+    }
+
+
+def test_load_manifest_resolves_relative_files(tmp_path):
+    manifest_path = write_manifest(
+        tmp_path,
+        [
+            {"file": "sonar.json", "pre_config_id": "abc", "language_extension": "py"},
+            {"repo": "2021-2-X", "release": "v1", "pre_config_id": "abc", "language_extension": "py"},
+        ],
+    )
+
+    entries = load_manifest(manifest_path)
+
+    assert entries[0]["file"] == str(tmp_path / "sonar.json")
+    assert manifest.entry_name(entries[1]) == "2021-2-X@v1"
+
+
+def test_load_yaml_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.yml"
+    manifest_path.write_text(
+        "- repo: 2021-2-X\n  release: v1\n  pre_config_id: abc\n  language_extension: py\n"
+    )
+
+    assert load_manifest(manifest_path)[0]["repo"] == "2021-2-X"
+
+
+@pytest.mark.parametrize(
+    "entry, error_msg",
+    [
+        ({"file": "sonar.json"}, "pre_config_id, language_extension"),
+        (
+            {"repo": "2021-2-X", "pre_config_id": "abc", "language_extension": "py"},
+            '"file" or "repo" and "release"',
+        ),
+    ],
+)
+def test_invalid_entry(tmp_path, entry, error_msg):
+    manifest_path = write_manifest(tmp_path, [entry])
+
+    with pytest.raises(exceptions.InvalidManifest) as error:
+        load_manifest(manifest_path)
+
+    assert "Entry 1 is missing the keys" in str(error.value)
+    assert error_msg in str(error.value)
+
+
+def test_rerun_skips_succeeded_entries(tmp_path, mocker):
+    manifest_path = write_manifest(
+        tmp_path, [file_entry("first", "abc"), file_entry("second", "def")]
+    )
+
+    def fake_post(url, data, **kwargs):
+        if json.loads(data)["pre_config_id"] == "def":
+            return DummyResponse(404, {"pre_config_id": "def is not a valid ID"})
+
+        return DummyResponse(201, {})
+
+    post = mocker.patch("requests.post", side_effect=fake_post)
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_batch(manifest_path, workers=2)
+
+        assert "1 succeeded, 1 failed, 0 skipped" in fake_out.getvalue()
+        assert "pre_config_id: def is not a valid ID" in fake_out.getvalue()
+
+    post.reset_mock()
+    post.side_effect = None
+    post.return_value = DummyResponse(201, {})
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_batch(manifest_path, workers=2)
+
+        assert "1 succeeded, 0 failed, 1 skipped" in fake_out.getvalue()
+
+    assert post.call_count == 1
+    assert json.loads(post.call_args.kwargs["data"])["pre_config_id"] == "def"
+
+
+def test_force_runs_every_entry(tmp_path, mocker):
+    manifest_path = write_manifest(tmp_path, [file_entry("first")])
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, {}))
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        parse_batch(manifest_path)
+        parse_batch(manifest_path, force=True)
+
+    assert post.call_count == 2
+
+
+def test_entry_with_invalid_file(tmp_path, mocker):
+    manifest_path = write_manifest(
+        tmp_path, [file_entry("missing", file_path=tmp_path / "sona.json")]
+    )
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_batch(manifest_path)
+
+        assert "The file was not found" in fake_out.getvalue()
+        assert "0 succeeded, 1 failed" in fake_out.getvalue()
+
+
+def test_entry_errors_do_not_stop_the_batch(tmp_path, mocker):
+    entry = dict(file_entry("missing measure", "def"), all_metrics=False)
+    manifest_path = write_manifest(
+        tmp_path, [file_entry("proxy error", "abc"), entry, file_entry("third", "ghi")]
+    )
+
+    def fake_post(url, data, **kwargs):
+        if json.loads(data)["pre_config_id"] == "abc":
+            return DummyResponse(413, "<html><body>413 Request Entity Too Large</body></html>")
+
+        return DummyResponse(201, {})
+
+    def fake_get(url, **kwargs):
+        if url.endswith("available-pre-configs"):
+            return DummyResponse(200, {"measures": {}})
+
+        return DummyResponse(200, {"measures": ["passed_tests"]})
+
+    mocker.patch("requests.post", side_effect=fake_post)
+    mocker.patch("requests.get", side_effect=fake_get)
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_batch(manifest_path, workers=1)
+
+        assert "Invalid response: Expecting value" in fake_out.getvalue()
+        assert "Missing key 'passed_tests' in a response" in fake_out.getvalue()
+        assert "1 succeeded, 2 failed, 0 skipped" in fake_out.getvalue()
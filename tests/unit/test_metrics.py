@@ -0,0 +1,94 @@
+import json
+from datetime import timedelta
+import pytest
+import requests
+from src.cli import client, metrics
+
+
+class DummyRequest:
+    def __init__(self, body):
+        self.body = body
+
+
+class DummyResponse:
+    def __init__(self, status_code, body=None, content=b"{}"):
+        self.status_code = status_code
+        self.request = DummyRequest(body)
+        self.content = content
+        self.elapsed = timedelta(milliseconds=20)
+
+    def json(self):
+        return json.loads(self.content)
+
+
+@pytest.mark.parametrize(
+    "endpoint, label",
+    [
+        ("pre-configs", "pre-configs"),
+        ("/pre-configs/62656d15f354349ee4abfc7b", "pre-configs/{id}"),
+        ("analysis", "analysis"),
+    ],
+)
+def test_endpoint_label(endpoint, label):
+    assert metrics.endpoint_label(endpoint) == label
+
+
+def test_collect_command_json(mocker, tmp_path):
+    output_path = tmp_path / "metrics.json"
+
+    mocker.patch("requests.get", return_value=DummyResponse(200, content=b"[1, 2]"))
+    mocker.patch(
+        "requests.post", return_value=DummyResponse(201, body=b'{"a": 1}')
+    )
+
+    with metrics.collect_command(output_path):
+        client.get("pre-configs/abc")
+        client.get("pre-configs/def")
+        client.post("analysis", json={"pre_config_id": "abc"})
+
+    data = json.loads(output_path.read_text())
+    get_metrics, post_metrics = data["endpoints"]
+
+    assert (get_metrics["method"], get_metrics["endpoint"]) == (
+        "GET",
+        "pre-configs/{id}",
+    )
+    assert get_metrics["requests"] == 2
+    assert get_metrics["status"] == {"200": 2}
+    assert get_metrics["response_bytes"] == 12
+    assert get_metrics["ttfb_seconds"]["count"] == 2
+    assert get_metrics["ttfb_seconds"]["buckets"][2] == 2
+    assert post_metrics["request_bytes"] == 8
+    assert metrics.enabled is False
+
+
+def test_collect_command_prometheus(mocker, tmp_path):
+    output_path = tmp_path / "metrics.prom"
+
+    mocker.patch(
+        "requests.get", side_effect=requests.exceptions.ConnectionError("refused")
+    )
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        with metrics.collect_command(output_path, "prometheus"):
+            client.get("pre-configs")
+
+    lines = output_path.read_text().splitlines()
+
+    assert (
+        'measuresoftgram_http_requests_total{method="GET",endpoint="pre-configs",'
+        + 'status="ConnectionError"} 1'
+    ) in lines
+    assert (
+        'measuresoftgram_http_request_duration_seconds_bucket{method="GET",'
+        + 'endpoint="pre-configs",le="+Inf"} 1'
+    ) in lines
+
+
+def test_metrics_disabled(mocker):
+    metrics.endpoints.clear()
+    mocker.patch("requests.get", return_value=DummyResponse(200))
+
+    client.get("pre-configs")
+
+    assert metrics.endpoints == {}
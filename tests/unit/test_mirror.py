@@ -0,0 +1,142 @@
+from io import StringIO
+from src.cli import mirror
+from src.cli.list import parse_list
+from src.cli.show import parse_show
+
+
+class DummyResponse:
+    def __init__(self, status_code, mocked_data):
+        self.status_code = status_code
+        self.res = mocked_data
+
+    def json(self):
+        return self.res
+
+
+def pre_config(id, name, updated_at):
+    return {
+        "_id": id,
+        "name": name,
+        "created_at": "2022-04-24 15:30:29+00:00",
+        "updated_at": updated_at,
+        "characteristics": {
+            "reliability": {
+                "weight": 100,
+                "subcharacteristics": ["testing_status"],
+                "weights": {"testing_status": 100},
+            }
+        },
+        "subcharacteristics": {
+            "testing_status": {
+                "weights": {"passed_tests": 100},
+                "measures": ["passed_tests"],
+            }
+        },
+        "measures": ["passed_tests"],
+    }
+
+
+FIRST = pre_config("62656d15f354349ee4abfc7b", "pre-config-1", "2022-04-24 15:30:29+00:00")
+
+SECOND = pre_config("62656e79f354349ee4abfc7c", "pre-config-2", "2022-04-25 10:00:00+00:00")
+
+
+def test_sync_is_incremental(mocker):
+    mock_get = mocker.patch(
+        "requests.get", return_value=DummyResponse(200, [FIRST, SECOND])
+    )
+
+    assert mirror.synced_at() is None
+    assert mirror.sync() == 2
+    assert "params" not in mock_get.call_args.kwargs
+
+    renamed = dict(FIRST, name="renamed", updated_at="2022-04-26 08:00:00+00:00")
+    mock_get.return_value = DummyResponse(200, [renamed])
+
+    assert mirror.sync() == 1
+    assert mock_get.call_args.kwargs["params"] == {
+        "updated_since": "2022-04-25 10:00:00+00:00"
+    }
+    assert [p["name"] for p in mirror.list_pre_configs()] == ["renamed", "pre-config-2"]
+    assert mirror.synced_at() is not None
+
+
+def test_full_sync_drops_deleted(mocker):
+    mock_get = mocker.patch(
+        "requests.get", return_value=DummyResponse(200, [FIRST, SECOND])
+    )
+    mirror.sync()
+
+    mock_get.return_value = DummyResponse(200, [SECOND])
+
+    assert mirror.sync(full=True) == 1
+    assert "params" not in mock_get.call_args.kwargs
+    assert mirror.list_pre_configs(with_documents=True) == [SECOND]
+
+
+def test_failed_sync(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(500, {"error": "down"}))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        mirror.parse_sync()
+        output = fake_out.getvalue()
+
+    assert "Error: an error occurred while fetching your pre configurations" in output
+    assert mirror.synced_at() is None
+
+
+def test_list_and_show_from_mirror(mocker):
+    mock_get = mocker.patch(
+        "requests.get", return_value=DummyResponse(200, [FIRST, SECOND])
+    )
+    mirror.sync()
+    mock_get.reset_mock()
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_list()
+        parse_show(FIRST["_id"])
+        output = fake_out.getvalue()
+
+    assert mock_get.call_count == 0
+    assert "pre-config-2" in output
+    assert f"ID: {FIRST['_id']}" in output
+    assert "\t\tpassed_tests (weigth: 100)" in output
+
+
+def test_online_and_missing_pre_configs_use_the_service(mocker):
+    mock_get = mocker.patch("requests.get", return_value=DummyResponse(200, [FIRST]))
+    mirror.sync()
+
+    mock_get.return_value = DummyResponse(200, SECOND)
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_show(SECOND["_id"])
+        parse_show(FIRST["_id"], online=True)
+        output = fake_out.getvalue()
+
+    assert mock_get.call_count == 3
+    assert output.count(f"ID: {SECOND['_id']}") == 2
+
+
+def test_store_pre_config_only_when_synced():
+    mirror.store_pre_config(FIRST)
+
+    assert mirror.list_pre_configs() == []
+
+
+def test_unusable_data_dir(mocker, monkeypatch, tmp_path, capsys):
+    data_file = tmp_path / "not-a-directory"
+    data_file.write_text("")
+    monkeypatch.setenv("MEASURESOFTGRAM_HOME", str(data_file))
+    get = mocker.patch("requests.get", return_value=DummyResponse(200, [FIRST]))
+
+    parse_list()
+    mirror.store_pre_config(FIRST)
+    mirror.parse_sync()
+    captured = capsys.readouterr()
+
+    # sync gives up before fetching, list asks the service
+    assert get.call_count == 1
+    assert "pre-config-1" in captured.out
+    assert "Warning: the local mirror was not updated" in captured.err
+    assert "Error: the local mirror could not be written" in captured.out
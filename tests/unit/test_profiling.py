@@ -0,0 +1,80 @@
+import pstats
+from io import StringIO
+from src.cli import jsonReader, memory, profiling
+from tests.test_helpers import read_json
+
+
+def test_phase_disabled():
+    profiling.phases.clear()
+
+    with profiling.phase("open_json_file"):
+        pass
+
+    assert profiling.phases == {}
+
+
+def test_profile_command(mocker, tmp_path):
+    pstats_path = str(tmp_path / "import.pstats")
+
+    with mocker.patch("sys.stderr", new=StringIO()) as fake_err:
+        with profiling.profile_command(True, pstats_path):
+            jsonReader.file_reader("tests/unit/data/sonar.json")
+
+        report = fake_err.getvalue()
+
+    for name in ["open_json_file", "check_sonar_format", "check_metrics_values"]:
+        assert profiling.phases[name][0] == 1
+        assert name in report
+
+    assert "total" in report
+    assert profiling.enabled is False
+    assert pstats.Stats(pstats_path).total_calls > 0
+
+
+def test_profile_command_inactive(mocker):
+    profiling.phases.clear()
+
+    with mocker.patch("sys.stderr", new=StringIO()) as fake_err:
+        with profiling.profile_command(False):
+            jsonReader.file_reader("tests/unit/data/sonar.json")
+
+        assert fake_err.getvalue() == ""
+
+    assert profiling.phases == {}
+
+
+def test_memory_report(tmp_path):
+    report_path = str(tmp_path / "memory.json")
+
+    with memory.collect_command(report_path):
+        with profiling.phase("project_metrics"):
+            with profiling.phase("open_json_file"):
+                data = [bytes(1024) for _ in range(1000)]
+
+            del data
+
+    report = read_json(report_path)
+    phases = {phase["name"]: phase for phase in report["phases"]}
+
+    assert memory.enabled is False
+    assert profiling.phases == {}
+    assert phases["open_json_file"]["stage"] == "read"
+    assert phases["open_json_file"]["net_traced_bytes"] >= 1000 * 1024
+    assert phases["project_metrics"]["peak_traced_bytes"] >= 1000 * 1024
+    assert phases["project_metrics"]["net_traced_bytes"] < 1000 * 1024
+    assert report["total"]["peak_traced_bytes"] >= 1000 * 1024
+    assert report["total"]["max_rss_bytes"] > 0
+
+    top_allocation = phases["open_json_file"]["top_allocations"][0]
+
+    assert "test_profiling.py:" in top_allocation["site"]
+    assert top_allocation["count"] >= 1000
+
+
+def test_memory_phase_disabled():
+    memory.phases.clear()
+
+    with profiling.phase("open_json_file"):
+        pass
+
+    assert memory.phases == {}
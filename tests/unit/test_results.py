@@ -1,3 +1,5 @@
+import csv
+import json
 from src.cli.results import print_results, validade_analysis_response
 from io import StringIO
 
@@ -76,3 +78,49 @@ def test_validate_analysis_response_error(mocker):
         validade_analysis_response(404, ERROR_MESSAGE)
 
         assert "Pre-Config is not a valid ID" in fake_out.getvalue()
+
+
+def test_validate_analysis_response_jsonl(mocker):
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        validade_analysis_response(200, RESULTS, "jsonl")
+
+        rows = [json.loads(line) for line in fake_out.getvalue().splitlines()]
+
+        assert rows[0] == {
+            "level": "sqc",
+            "name": "sqc",
+            "parent": None,
+            "value": 0.6165241607725739,
+            "weighted_value": None,
+        }
+        assert {
+            "level": "subcharacteristic",
+            "name": "testing_status",
+            "parent": "reliability",
+            "value": 0.7142857142857143,
+            "weighted_value": 0.7142857142857143,
+        } in rows
+        assert len(rows) == 7
+
+
+def test_validate_analysis_response_json(mocker):
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        validade_analysis_response(200, RESULTS, "json")
+
+        assert json.loads(fake_out.getvalue()) == RESULTS
+
+
+def test_validate_analysis_response_csv(mocker):
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        validade_analysis_response(200, RESULTS, "csv")
+
+        rows = list(csv.DictReader(StringIO(fake_out.getvalue())))
+
+        assert rows[0]["level"] == "sqc"
+        assert rows[-1] == {
+            "level": "measure",
+            "name": "m1",
+            "parent": "testing_status",
+            "value": "",
+            "weighted_value": "0.7142857142857143",
+        }
@@ -0,0 +1,100 @@
+import pytest
+from src.cli import create, exceptions, schema
+from tests.test_helpers import read_json
+
+REMOVED = object()
+
+
+def read_pre_config():
+    return read_json("tests/unit/data/measuresoftgramPreConfig.json")
+
+
+def node_at(pre_config, depth):
+    node = pre_config["characteristics"][1]
+
+    if depth > 0:
+        node = node["subcharacteristics"][0]
+
+    if depth > 1:
+        node = node["measures"][2]
+
+    return node
+
+
+def hand_written_validation(pre_config):
+    create.validate_file_characteristics(pre_config)
+    create.validate_file_sub_characteristics(pre_config)
+    create.validate_file_measures(pre_config)
+
+
+@pytest.mark.parametrize("depth", [0, 1, 2])
+@pytest.mark.parametrize(
+    "key, value",
+    [
+        ("name", REMOVED),
+        ("weight", REMOVED),
+        ("weight", 0),
+        ("weight", 100.5),
+        ("weight", 20.0),
+        ("subcharacteristics", REMOVED),
+        ("subcharacteristics", []),
+        ("measures", REMOVED),
+        ("measures", None),
+    ],
+)
+def test_same_errors_as_hand_written_checks(depth, key, value):
+    pre_config = read_pre_config()
+    node = node_at(pre_config, depth)
+
+    if value is REMOVED:
+        node.pop(key, None)
+    else:
+        node[key] = value
+
+    try:
+        hand_written_validation(pre_config)
+    except exceptions.MeasureSoftGramCLIException as error:
+        expected = error
+    else:
+        assert create.validate_pre_config(pre_config)
+        return
+
+    with pytest.raises(type(expected)) as raised:
+        create.validate_pre_config(pre_config)
+
+    assert str(raised.value) == str(expected)
+
+
+def test_valid_pre_config():
+    assert create.validate_pre_config(read_pre_config())
+
+
+def test_compiled_code_cached_on_disk(mocker):
+    schema.validators.clear()
+    schema.compiled_validator(create.PRE_CONFIG_SCHEMA)
+
+    schema.validators.clear()
+    generate = mocker.patch("src.cli.schema.validator_source")
+    validator = schema.compiled_validator(create.PRE_CONFIG_SCHEMA)
+
+    assert validator(read_pre_config())
+    generate.assert_not_called()
+
+
+def test_corrupt_cache_is_rebuilt():
+    schema.validators.clear()
+    digest = schema.schema_digest(create.PRE_CONFIG_SCHEMA)
+    cache_path = schema.cache_path(digest)
+    cache_path.write_bytes(b"not marshal")
+
+    assert schema.compiled_validator(create.PRE_CONFIG_SCHEMA)(read_pre_config())
+    assert cache_path.read_bytes() != b"not marshal"
+
+
+def test_unusable_data_dir_compiles_in_memory(monkeypatch, tmp_path):
+    data_file = tmp_path / "not-a-directory"
+    data_file.write_text("")
+    monkeypatch.setenv("MEASURESOFTGRAM_HOME", str(data_file))
+    schema.validators.clear()
+
+    assert schema.compiled_validator(create.PRE_CONFIG_SCHEMA)(read_pre_config())
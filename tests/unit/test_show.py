@@ -1,3 +1,4 @@
+import json
 from io import StringIO
 from src.cli.show import parse_show
 
@@ -11,39 +12,40 @@ class DummyResponse:
         return self.res
 
 
-def test_pre_configs_show(mocker):
-    mocked_pre_config = {
-        "_id": "62656d15f354349ee4abfc7b",
-        "name": "TESTa essa joça",
-        "characteristics": {
-            "reliability": {
-                "expected_value": 70,
-                "weight": 50,
-                "subcharacteristics": ["testing_status"],
-                "weights": {"testing_status": 100.0},
-            },
-            "maintainability": {
-                "expected_value": 30,
-                "weight": 50,
-                "subcharacteristics": ["modifiability"],
-                "weights": {"modifiability": 100.0},
-            },
+MOCKED_PRE_CONFIG = {
+    "_id": "62656d15f354349ee4abfc7b",
+    "name": "TESTa essa joça",
+    "characteristics": {
+        "reliability": {
+            "expected_value": 70,
+            "weight": 50,
+            "subcharacteristics": ["testing_status"],
+            "weights": {"testing_status": 100.0},
+        },
+        "maintainability": {
+            "expected_value": 30,
+            "weight": 50,
+            "subcharacteristics": ["modifiability"],
+            "weights": {"modifiability": 100.0},
         },
-        "subcharacteristics": {
-            "testing_status": {
-                "weights": {"passed_tests": 100.0},
-                "measures": ["passed_tests"],
-            },
-            "modifiability": {
-                "weights": {"non_complex_file_density": 100.0},
-                "measures": ["non_complex_file_density"],
-            },
+    },
+    "subcharacteristics": {
+        "testing_status": {
+            "weights": {"passed_tests": 100.0},
+            "measures": ["passed_tests"],
         },
-        "measures": ["passed_tests", "non_complex_file_density"],
-        "created_at": "2022-04-24 15:30:29+00:00",
-    }
+        "modifiability": {
+            "weights": {"non_complex_file_density": 100.0},
+            "measures": ["non_complex_file_density"],
+        },
+    },
+    "measures": ["passed_tests", "non_complex_file_density"],
+    "created_at": "2022-04-24 15:30:29+00:00",
+}
+
 
-    mocker.patch("requests.get", return_value=DummyResponse(200, mocked_pre_config))
+def test_pre_configs_show(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(200, MOCKED_PRE_CONFIG))
 
     with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
         parse_show("abcd")
@@ -73,3 +75,26 @@ def test_error_in_pre_config_list(mocker):
         parse_show("abcd")
 
         assert error_res["error"] in fake_out.getvalue()
+
+
+def test_pre_configs_show_csv(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(200, MOCKED_PRE_CONFIG))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_show("abcd", "csv")
+
+        assert fake_out.getvalue().splitlines() == [
+            "characteristic,characteristic_weight,subcharacteristic,"
+            + "subcharacteristic_weight,measure,measure_weight",
+            "reliability,50,testing_status,100.0,passed_tests,100.0",
+            "maintainability,50,modifiability,100.0,non_complex_file_density,100.0",
+        ]
+
+
+def test_pre_configs_show_json(mocker):
+    mocker.patch("requests.get", return_value=DummyResponse(200, MOCKED_PRE_CONFIG))
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_show("abcd", "json")
+
+        assert json.loads(fake_out.getvalue()) == MOCKED_PRE_CONFIG
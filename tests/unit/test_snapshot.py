@@ -0,0 +1,131 @@
+import json
+from io import StringIO
+import pytest
+from src.cli import convert, exceptions, snapshot
+from src.cli.convert import convert_file, parse_convert
+from src.cli.jsonReader import build_component_filter, file_reader
+from tests.test_helpers import read_json
+
+SONAR_PATH = "tests/unit/data/sonar.json"
+
+
+def test_round_trip(tmp_path):
+    snapshot_path = str(tmp_path / "sonar.msgsnap")
+    json_path = str(tmp_path / "sonar.json")
+
+    convert_file(SONAR_PATH, snapshot_path)
+    convert_file(snapshot_path, json_path)
+
+    original = read_json(SONAR_PATH)
+    converted = read_json(json_path)
+
+    assert converted == original
+    assert [list(c) for c in converted["components"]] == [
+        list(c) for c in original["components"]
+    ]
+
+
+def test_round_trip_of_uncommon_shapes(tmp_path):
+    json_data = read_json(SONAR_PATH)
+    components = json_data["components"]
+    components[0]["measures"][0]["periods"] = [{"index": 1, "value": "2.0"}]
+    components[0]["measures"][2]["periods"] = [{"index": 1, "value": "2.0"}]
+    components[0]["measures"][1]["bestValue"] = False
+    components[1]["measures"][0]["value"] = 0
+    components[1]["measures"][1]["value"] = 0.0
+    components[1]["extra"] = {"nested": [1, "a", None]}
+    del components[2]["name"]
+
+    snapshot_path = str(tmp_path / "sonar.msgsnap")
+    snapshot.write_snapshot(json_data, snapshot_path)
+    loaded, values_valid = snapshot.load_snapshot(snapshot_path)
+
+    assert loaded == json_data
+    assert values_valid
+    assert type(loaded["components"][1]["measures"][0]["value"]) is int
+    assert (
+        loaded["components"][0]["measures"][0]["periods"]
+        is not loaded["components"][0]["measures"][2]["periods"]
+    )
+
+
+def test_file_reader_reads_snapshots(tmp_path):
+    snapshot_path = str(tmp_path / "sonar.msgsnap")
+    convert_file(SONAR_PATH, snapshot_path)
+    component_filter = build_component_filter(include_qualifiers=["FIL"])
+
+    assert file_reader(snapshot_path) == file_reader(SONAR_PATH)
+    assert file_reader(snapshot_path, component_filter) == file_reader(
+        SONAR_PATH, component_filter
+    )
+
+
+def test_invalid_values_give_the_json_errors(tmp_path):
+    json_data = read_json(SONAR_PATH)
+    json_data["components"][3]["measures"][2]["value"] = "not a number"
+    json_path = tmp_path / "invalid.json"
+    json_path.write_text(json.dumps(json_data))
+    snapshot_path = str(tmp_path / "invalid.msgsnap")
+    snapshot.write_snapshot(json_data, snapshot_path)
+
+    with pytest.raises(exceptions.InvalidMetricException) as json_error:
+        file_reader(str(json_path))
+
+    with pytest.raises(exceptions.InvalidMetricException) as snapshot_error:
+        file_reader(snapshot_path)
+
+    assert str(snapshot_error.value) == str(json_error.value)
+
+
+def test_invalid_files_are_not_converted(tmp_path):
+    with pytest.raises(exceptions.InvalidMetricsJsonFile):
+        convert_file("tests/unit/data/invalid_json.json", str(tmp_path / "x.msgsnap"))
+
+
+def test_convert_parses_the_file_once(tmp_path, mocker):
+    open_json_file = mocker.spy(convert, "open_json_file")
+
+    convert_file(SONAR_PATH, str(tmp_path / "sonar.msgsnap"))
+
+    assert open_json_file.call_count == 1
+
+
+def test_corrupted_snapshot(tmp_path):
+    snapshot_path = tmp_path / "sonar.msgsnap"
+    convert_file(SONAR_PATH, str(snapshot_path))
+
+    data = bytearray(snapshot_path.read_bytes())
+    data[-10] ^= 0xFF
+    snapshot_path.write_bytes(bytes(data))
+
+    with pytest.raises(exceptions.InvalidMetricsJsonFile) as error:
+        file_reader(str(snapshot_path))
+
+    assert "checksum" in str(error.value)
+
+
+def test_not_a_snapshot(tmp_path):
+    snapshot_path = tmp_path / "sonar.msgsnap"
+    snapshot_path.write_bytes(b"{}" * 20)
+
+    with pytest.raises(exceptions.InvalidMetricsJsonFile) as error:
+        file_reader(str(snapshot_path))
+
+    assert str(error.value) == "Invalid snapshot file. Unknown file format"
+
+    with pytest.raises(exceptions.FileNotFound):
+        file_reader(str(tmp_path / "missing.msgsnap"))
+
+
+def test_parse_convert(mocker, tmp_path):
+    json_path = tmp_path / "sonar.json"
+    json_path.write_text(open(SONAR_PATH).read())
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        parse_convert(json_path)
+        parse_convert(tmp_path / "missing.json")
+        output = fake_out.getvalue()
+
+    assert (tmp_path / "sonar.msgsnap").exists()
+    assert f"converted to {tmp_path / 'sonar.msgsnap'}" in output
+    assert "Error:  The file was not found" in output
@@ -0,0 +1,84 @@
+import json
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+import pytest
+from src.cli import cancellation, validate
+from src.cli.exceptions import Cancelled
+from tests.test_helpers import read_json
+
+SONAR_PATH = "tests/unit/data/sonar.json"
+
+PRE_CONFIG_PATH = "tests/unit/data/measuresoftgramPreConfig.json"
+
+AVAILABLE_PATH = "tests/unit/data/measuresoftgramCoreFormat.json"
+
+
+@pytest.fixture
+def files(tmp_path):
+    pre_config = read_json(PRE_CONFIG_PATH)
+    pre_config["characteristics"][0]["weight"] = 1000
+    invalid_pre_config_path = tmp_path / "configs" / "invalid_pre_config.json"
+    invalid_pre_config_path.parent.mkdir()
+    invalid_pre_config_path.write_text(json.dumps(pre_config))
+
+    return [SONAR_PATH, PRE_CONFIG_PATH, str(invalid_pre_config_path)]
+
+
+@pytest.mark.parametrize(
+    "file_path, kind",
+    [(SONAR_PATH, "metrics"), (PRE_CONFIG_PATH, "pre-config")],
+)
+def test_detect_kind(file_path, kind):
+    assert validate.detect_kind(file_path) == kind
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validate_files(files, workers):
+    results = validate.validate_files(files, workers=workers)
+
+    assert [result["status"] for result in results] == ["ok", "ok", "invalid"]
+    assert results[2]["kind"] == "pre-config"
+    assert "weight value inside parameters" in results[2]["error"]
+
+
+def test_workers_ignore_sigint():
+    with ProcessPoolExecutor(max_workers=1, initializer=validate.ignore_sigint) as executor:
+        assert executor.submit(signal.getsignal, signal.SIGINT).result() == signal.SIG_IGN
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cancelled_validation_stops(files, workers, monkeypatch):
+    monkeypatch.setattr(cancellation, "GRACE_SECONDS", 60.0)
+    cancellation.cancel()
+
+    try:
+        with pytest.raises(Cancelled):
+            validate.validate_files(files, workers=workers)
+    finally:
+        cancellation.reset()
+
+
+def test_parse_validate_report(files, tmp_path, mocker):
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        valid = validate.parse_validate(
+            [SONAR_PATH, str(tmp_path / "configs")], available_path=AVAILABLE_PATH
+        )
+
+        assert "2 files validated, 1 invalid" in fake_out.getvalue()
+        assert "invalid_pre_config.json (pre-config)" in fake_out.getvalue()
+
+    assert valid is False
+
+
+def test_parse_validate_unknown_file(tmp_path, mocker):
+    unknown_path = tmp_path / "unknown.json"
+    unknown_path.write_text('{"name": "x"}')
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        valid = validate.parse_validate([str(unknown_path)], output_format="jsonl")
+        result = json.loads(fake_out.getvalue())
+
+    assert valid is False
+    assert result["status"] == "invalid"
+    assert "neither a Sonar metrics file nor a pre configuration" in result["error"]
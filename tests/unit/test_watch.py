@@ -0,0 +1,121 @@
+import json
+import os
+import shutil
+import threading
+import time
+from io import StringIO
+from src.cli import watch
+
+SONAR_PATH = "tests/unit/data/sonar.json"
+
+
+class DummyResponse:
+    def __init__(self, status_code, mocked_data):
+        self.status_code = status_code
+        self.text = json.dumps(mocked_data)
+
+
+def test_scan_waits_for_files_to_settle(tmp_path):
+    file_path = tmp_path / "sonar.json"
+    file_path.write_text("{")
+    pending = {}
+
+    assert watch.scan_ready_files(tmp_path, {}, pending, 2.0, now=0.0) == []
+
+    file_path.write_text('{"paging": {}}')
+    os.utime(file_path, ns=(1, 1))
+
+    assert watch.scan_ready_files(tmp_path, {}, pending, 2.0, now=1.0) == []
+    assert watch.scan_ready_files(tmp_path, {}, pending, 2.0, now=2.5) == []
+
+    ready = watch.scan_ready_files(tmp_path, {}, pending, 2.0, now=3.0)
+
+    assert [file_path for file_path, _ in ready] == [file_path]
+
+
+def test_scan_skips_indexed_and_hidden_files(tmp_path):
+    file_path = tmp_path / "sonar.json"
+    file_path.write_text("{}")
+    (tmp_path / ".sonar.json.tmp.json").write_text("{")
+    stat = file_path.stat()
+    index = {str(file_path): {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}}
+    pending = {}
+
+    watch.scan_ready_files(tmp_path, index, pending, 0.0, now=0.0)
+
+    assert watch.scan_ready_files(tmp_path, index, pending, 0.0, now=1.0) == []
+
+
+def run_watch(directory, stop):
+    thread = threading.Thread(
+        target=watch.watch_directory,
+        args=(directory, "abc", "py"),
+        kwargs={"interval": 0.01, "settle": 0.0, "all_metrics": True, "stop": stop},
+    )
+    thread.start()
+
+    return thread
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    return condition()
+
+
+def test_watch_imports_new_files_once(tmp_path, mocker):
+    post = mocker.patch("requests.post", return_value=DummyResponse(201, {}))
+    (tmp_path / "invalid.json").write_text("{")
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        stop = threading.Event()
+        thread = run_watch(tmp_path, stop)
+        shutil.copy(SONAR_PATH, tmp_path / "release-1.json")
+
+        assert wait_for(lambda: post.call_count == 1)
+        assert wait_for(lambda: "Error in invalid.json" in fake_out.getvalue())
+
+        stop.set()
+        thread.join()
+
+        assert "Imported release-1.json" in fake_out.getvalue()
+
+    # A restarted watch only imports the files added in the meantime
+    shutil.copy(SONAR_PATH, tmp_path / "release-2.json")
+
+    with mocker.patch("sys.stdout", new=StringIO()):
+        stop = threading.Event()
+        thread = run_watch(tmp_path, stop)
+
+        assert wait_for(lambda: post.call_count == 2)
+
+        time.sleep(0.1)
+        stop.set()
+        thread.join()
+
+    assert post.call_count == 2
+
+
+class HtmlResponse:
+    status_code = 502
+    text = "<html><body>502 Bad Gateway</body></html>"
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def test_service_errors_are_imported_again(tmp_path, mocker):
+    file_path = tmp_path / "release-1.json"
+    shutil.copy(SONAR_PATH, file_path)
+    mocker.patch("requests.get", return_value=DummyResponse(503, {}))
+    mocker.patch("requests.post", return_value=HtmlResponse())
+
+    with mocker.patch("sys.stdout", new=StringIO()) as fake_out:
+        assert watch.import_watched_file(file_path, "abc", "py", False, None) is None
+        assert "HTTP 503, it will be imported again" in fake_out.getvalue()
+
+        assert watch.import_watched_file(file_path, "abc", "py", True, None) is None
+        assert "invalid response" in fake_out.getvalue()